@@ -0,0 +1,255 @@
+"""
+ASGI serving mode.
+
+    uvicorn --factory app.asgi:create_asgi_app --workers 4
+
+Every existing blueprint keeps working through asgiref's WSGI adapter, which runs
+the Flask app in a thread pool. The kitchen endpoints below are native coroutines
+on an async SQLAlchemy engine, so a display waiting on a long poll or holding an
+event stream open costs a coroutine instead of a worker thread:
+
+    GET /kitchen/orders?branch_id=3&after=120&timeout=25   long poll
+    GET /kitchen/stream?branch_id=3                        server-sent events
+"""
+import asyncio
+import time
+from collections import deque
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import decode_token
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import create_app
+from app.extensions import blacklist, db
+from app.models.order import Order
+from app.utils.decorators import branch_allowed
+from app.utils.serialization import dumps
+from app.utils.sqlite import register_sqlite_pragmas
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+ORDER_COLUMNS = (Order.id, Order.branch_id, Order.user_id, Order.status, Order.payment_status,
+                 Order.total_amount, Order.created_at)
+FEED_BUFFER = 500
+BATCH_LIMIT = 100
+
+
+def async_database_url(url):
+    """``url`` (a SQLAlchemy ``URL``) with the async driver of its backend."""
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def order_row(row):
+    return {
+        "id": row.id, "branch_id": row.branch_id, "user_id": row.user_id, "status": row.status,
+        "payment_status": row.payment_status, "total_amount": row.total_amount,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+
+class OrderFeed:
+    """
+    New orders of one branch. A single poller task queries the database while
+    anyone is waiting, however many displays are connected to the branch.
+    """
+
+    def __init__(self, api, branch_id):
+        self.api = api
+        self.branch_id = branch_id
+        self.recent = deque(maxlen=FEED_BUFFER)
+        self.last_id = None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+        self.task = None
+
+    async def since(self, after, timeout):
+        """Orders with ``id > after``, waiting up to ``timeout`` seconds for the first one."""
+        rows = await self.api.fetch_orders(self.branch_id, after)
+        if rows or timeout <= 0:
+            return rows
+        self.waiters += 1
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.poll())
+        try:
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                changed = self.changed
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                rows = [row for row in self.recent if row["id"] > after]
+                if rows:
+                    return rows[:BATCH_LIMIT]
+            return []
+        finally:
+            self.waiters -= 1
+
+    async def poll(self):
+        if self.last_id is None:
+            self.last_id = await self.api.latest_order_id(self.branch_id)
+        while self.waiters:
+            await asyncio.sleep(self.api.poll_interval)
+            rows = await self.api.fetch_orders(self.branch_id, self.last_id)
+            if rows:
+                self.recent.extend(rows)
+                self.last_id = rows[-1]["id"]
+                changed, self.changed = self.changed, asyncio.Event()
+                changed.set()
+
+
+class AsyncAPI:
+    """ASGI application: kitchen endpoints served natively, everything else by Flask."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = None
+        self.feeds = {}
+        config = flask_app.config
+        if config["ASYNC_DATABASE_URI"]:
+            self.database_url = config["ASYNC_DATABASE_URI"]
+        else:
+            # The bound engine's URL, which has relative SQLite paths resolved to the instance folder.
+            with flask_app.app_context():
+                self.database_url = async_database_url(db.engine.url)
+        self.poll_interval = config["KITCHEN_POLL_INTERVAL_MS"] / 1000
+        self.max_wait = config["KITCHEN_LONG_POLL_SECONDS"]
+        self.routes = {
+            "/kitchen/orders": self.kitchen_orders,
+            "/kitchen/stream": self.kitchen_stream,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        handler = self.routes.get(scope["path"].rstrip("/")) if scope["type"] == "http" else None
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+        if scope["method"] != "GET":
+            return await send_json(send, 405, {"error": "Method Not Allowed"})
+        try:
+            await handler(scope, receive, send)
+        except HTTPError as error:
+            await send_json(send, error.status, error.payload)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.connect()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.engine is not None:
+                    await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def connect(self):
+        if self.engine is None:
+            self.engine = create_async_engine(self.database_url)
+            register_sqlite_pragmas(self.engine.sync_engine, self.flask_app.config["SQLITE_PRAGMAS"])
+        return self.engine
+
+    async def fetch_orders(self, branch_id, after):
+        statement = (
+            select(*ORDER_COLUMNS)
+            .where(Order.branch_id == branch_id, Order.id > after)
+            .order_by(Order.id)
+            .limit(BATCH_LIMIT)
+        )
+        async with self.connect().connect() as connection:
+            return [order_row(row) for row in await connection.execute(statement)]
+
+    async def latest_order_id(self, branch_id):
+        async with self.connect().connect() as connection:
+            return await connection.scalar(select(func.coalesce(func.max(Order.id), 0))
+                                           .where(Order.branch_id == branch_id)) or 0
+
+    def feed(self, branch_id):
+        feed = self.feeds.get(branch_id)
+        if feed is None:
+            feed = self.feeds[branch_id] = OrderFeed(self, branch_id)
+        return feed
+
+    def authenticate(self, scope):
+        """Claims of the request's bearer token, with the same checks as ``login_required``."""
+        header = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        if not header.startswith("Bearer "):
+            raise HTTPError(401, {"msg": "Missing Authorization Header"})
+        with self.flask_app.app_context():
+            try:
+                claims = decode_token(header[len("Bearer "):])
+            except Exception:
+                raise HTTPError(401, {"msg": "Invalid or expired token"}) from None
+        if claims.get("jti") in blacklist:
+            raise HTTPError(401, {"msg": "Token has been revoked"})
+        return claims
+
+    def parse(self, scope):
+        """``(branch_id, after, timeout)`` for a staff member of that branch or an admin."""
+        claims = self.authenticate(scope)
+        query = {key: values[-1] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+        headers = dict(scope["headers"])
+        try:
+            branch_id = int(query["branch_id"])
+            after = int(query.get("after") or headers.get(b"last-event-id", b"0").decode() or 0)
+            timeout = min(float(query.get("timeout", self.max_wait)), self.max_wait)
+        except (KeyError, ValueError):
+            raise HTTPError(400, {"error": "branch_id is required; after and timeout must be numbers"}) from None
+        if claims.get("role") not in ("admin", "staff"):
+            raise HTTPError(403, {"error": "Access Forbidden"})
+        if not branch_allowed(claims, branch_id):
+            raise HTTPError(403, {"error": "Access Forbidden: other branch"})
+        return branch_id, after, timeout
+
+    async def kitchen_orders(self, scope, receive, send):
+        branch_id, after, timeout = self.parse(scope)
+        rows = await self.feed(branch_id).since(after, timeout)
+        await send_json(send, 200, {"orders": rows, "last_id": rows[-1]["id"] if rows else after})
+
+    async def kitchen_stream(self, scope, receive, send):
+        branch_id, after, _ = self.parse(scope)
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no"),
+        ]})
+        disconnected = asyncio.create_task(wait_for_disconnect(receive))
+        feed = self.feed(branch_id)
+        try:
+            while not disconnected.done():
+                rows = await feed.since(after, self.max_wait)
+                if rows:
+                    after = rows[-1]["id"]
+                    body = b"id: %d\nevent: orders\ndata: %s\n\n" % (after, dumps(rows))
+                else:
+                    body = b": keep-alive\n\n"
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        except OSError:
+            pass
+        finally:
+            disconnected.cancel()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def send_json(send, status, payload):
+    body = dumps(payload)
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(config_class=None):
+    return AsyncAPI(create_app(config_class))
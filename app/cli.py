@@ -0,0 +1,157 @@
+import os
+import pstats
+import signal
+from datetime import date
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_migrate import stamp
+from app.extensions import db
+from app.models.branch import Branch
+from app.utils.datagen import DEFAULT_PASSWORD, SCALES, generate
+from app.utils.invoicing import generate_invoices, reconcile_invoice_payment_status
+from app.utils.jobs import Worker, parse_queues, queue_depths
+from app.utils.payments import rollup_payment_totals
+from app.utils.slow_queries import build_report, index_ddl, read_entries
+
+
+@click.command("init-db")
+@click.option("--drop", is_flag=True, help="Drop all tables first.")
+@with_appcontext
+def init_db_command(drop):
+    """Create all tables that do not exist yet and mark the schema as fully migrated."""
+    if drop:
+        db.drop_all()
+    db.create_all()
+    # create_all() builds the latest schema, so later `flask db upgrade` runs start from head.
+    stamp()
+    click.echo("Database tables created.")
+
+
+@click.command("profiles")
+@click.argument("name", required=False)
+@click.option("--limit", default=25, show_default=True, help="Functions to print.")
+@with_appcontext
+def profiles_command(name, limit):
+    """List captured slow-request profiles, or print the hottest functions of NAME."""
+    directory = current_app.config["PROFILE_DIR"] or os.path.join(current_app.instance_path, "profiles")
+    if name is None:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".prof")) if os.path.isdir(directory) else []
+        for profile in names:
+            click.echo(profile)
+        if not names:
+            click.echo(f"No profiles in {directory}")
+        return
+    stats = pstats.Stats(os.path.join(directory, name))
+    stats.sort_stats("cumulative").print_stats(limit)
+
+
+@click.command("slow-queries")
+@click.option("--log", "path", help="Slow query log to read (default: SLOW_QUERY_LOG).")
+@click.option("--limit", default=10, show_default=True, help="Statements and suggestions to print.")
+@with_appcontext
+def slow_queries_command(path, limit):
+    """Rank slow statements and suggest indexes for the tables they scan."""
+    path = path or current_app.config["SLOW_QUERY_LOG"] or os.path.join(current_app.instance_path, "slow_queries.log")
+    statements, suggestions = build_report(read_entries(path))
+    if not statements:
+        click.echo(f"No slow queries logged in {path}")
+        return
+
+    click.echo("Slowest statements by cumulative time:")
+    for statement, stats in statements[:limit]:
+        scans = f"  full scan: {', '.join(sorted(stats['full_scans']))}" if stats["full_scans"] else ""
+        click.echo(f"  {stats['ms']:10.1f} ms  {stats['count']:6}x  max {stats['max_ms']:8.1f} ms{scans}")
+        click.echo(f"      {statement[:200]}")
+
+    click.echo("\nSuggested indexes:")
+    for (table, columns), stats in suggestions[:limit]:
+        click.echo(f"  {stats['ms']:10.1f} ms  {stats['count']:6}x  {index_ddl(table, columns)}")
+    if not suggestions:
+        click.echo("  none: no logged statement filters a fully scanned table")
+
+
+@click.command("seed")
+@click.option("--scale", type=click.Choice(sorted(SCALES)), default="small", show_default=True)
+@click.option("--seed", "seed_value", default=42, show_default=True, help="Random seed; same seed, same data.")
+@click.option("--days", default=90, show_default=True, help="Days of order history to generate.")
+@click.option("--orders", type=int, help="Override the number of orders of the scale.")
+@click.option("--reservations", type=int, help="Override the number of reservations of the scale.")
+@with_appcontext
+def seed_command(scale, seed_value, days, orders, reservations):
+    """Fill an empty database with deterministic synthetic data."""
+    overrides = {name: value for name, value in (("orders", orders), ("reservations", reservations))
+                 if value is not None}
+    try:
+        counts = generate(scale, seed=seed_value, days=days, **overrides)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from None
+    for table, count in counts.items():
+        click.echo(f"{table:<14} {count:>10}")
+    click.echo(f"Accounts use the password {DEFAULT_PASSWORD!r}; the admin user is 'admin'.")
+
+
+@click.group("jobs")
+def jobs_cli():
+    """Background job queue."""
+
+
+@jobs_cli.command("work")
+@click.option("--queues", help='Queues and concurrency limits, e.g. "invoices=4,exports=1" (default: JOBS_QUEUES).')
+@click.option("--burst", is_flag=True, help="Exit once no job is due or running.")
+@with_appcontext
+def work_command(queues, burst):
+    """Run jobs until interrupted; SIGTERM finishes the running jobs first."""
+    worker = Worker(current_app._get_current_object(), parse_queues(queues) if queues else None)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    click.echo(f"Worker {worker.id} on {', '.join(f'{q}={n}' for q, n in worker.queues.items())}")
+    try:
+        worker.run(burst=burst)
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+@jobs_cli.command("status")
+@with_appcontext
+def status_command():
+    """Queued and running jobs per queue."""
+    depths = queue_depths()
+    for (queue, status), count in sorted(depths.items()):
+        click.echo(f"{queue:<20} {status:<10} {count:>8}")
+    if not depths:
+        click.echo("No queued or running jobs")
+
+
+@click.command("invoice-batch")
+@click.option("--branch-id", type=int, multiple=True, help="Branch to invoice; repeat for several (default: all).")
+@click.option("--from", "date_from", type=click.DateTime(("%Y-%m-%d",)), help="First order date (default: today).")
+@click.option("--to", "date_to", type=click.DateTime(("%Y-%m-%d",)), help="Last order date (default: --from).")
+@with_appcontext
+def invoice_batch_command(branch_id, date_from, date_to):
+    """Invoice the completed, uninvoiced orders of a date range, one transaction per branch."""
+    date_from = date_from.date() if date_from else date.today()
+    date_to = date_to.date() if date_to else date_from
+    branch_ids = branch_id or db.session.scalars(db.select(Branch.id).order_by(Branch.id)).all()
+    for branch in branch_ids:
+        totals = generate_invoices(branch, date_from, date_to)
+        db.session.commit()
+        click.echo(f"branch {branch:>6}: {totals['invoices']:>7} invoices {totals['total_amount']:>14.2f}")
+
+
+@click.command("invoice-reconcile")
+@click.option("--batch-size", default=1000, show_default=True, help="Invoices fixed per transaction.")
+@with_appcontext
+def invoice_reconcile_command(batch_size):
+    """Copy each order's payment status onto invoices that drifted from it."""
+    corrected = reconcile_invoice_payment_status(batch_size)
+    for status, count in sorted(corrected.items()):
+        click.echo(f"{status:<12} {count:>8}")
+    click.echo(f"{sum(corrected.values())} invoices corrected")
+
+
+@click.command("payments-rollup")
+@with_appcontext
+def payments_rollup_command():
+    """Fold pending payment events into the per-branch, per-day, per-method totals."""
+    click.echo(f"{rollup_payment_totals()} payment events folded")
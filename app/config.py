@@ -1,7 +1,150 @@
+import os
+
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return value.lower() in ("1", "true", "yes", "on") if value else default
+
+
+def database_url(default):
+    url = os.environ.get("DATABASE_URL", default)
+    # Some hosting providers still hand out the pre-SQLAlchemy-1.4 scheme.
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def engine_options(url, statement_timeout_ms):
+    """
+    Pool settings for ``url``; every knob can be overridden with a ``DB_*`` variable.
+
+    PostgreSQL gets a server-side ``statement_timeout``; SQLite has no such thing, so
+    the timeout is used as the time a connection waits for the write lock instead.
+    """
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"timeout": statement_timeout_ms / 1000, "check_same_thread": False}}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            return options
+    else:
+        options = {"pool_recycle": env_int("DB_POOL_RECYCLE", 1800),
+                   "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True)}
+        if url.startswith("postgresql"):
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    options.update(
+        pool_size=env_int("DB_POOL_SIZE", 10),
+        max_overflow=env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=env_int("DB_POOL_TIMEOUT", 30),
+    )
+    return options
+
+
 class Config:
-    SECRET_KEY = "supersecretkey"
-    SQLALCHEMY_DATABASE_URI = "sqlite:///restaurant.db"
+    SECRET_KEY = os.environ.get("SECRET_KEY", "supersecretkey")
+    SQLALCHEMY_DATABASE_URI = database_url("sqlite:///restaurant.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_SECRET_KEY = "jwt-secret-key"
+    JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt-secret-key")
     JWT_BLACKLIST_ENABLED = True
-    JWT_BLACKLIST_TOKEN_CHECKS = ['access']
\ No newline at end of file
+    JWT_BLACKLIST_TOKEN_CHECKS = ['access']
+    SQLITE_PRAGMAS = {}
+    DB_STATEMENT_TIMEOUT_MS = env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+    # Comma-separated read replica URLs; GET requests are routed to them.
+    SQLALCHEMY_REPLICA_URIS = [url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url]
+    REPLICA_STICKY_SECONDS = env_int("REPLICA_STICKY_SECONDS", 5)
+    API_DOCS_ENABLED = env_bool("API_DOCS_ENABLED", False)
+    COMPRESS_ENABLED = env_bool("COMPRESS_ENABLED", True)
+    COMPRESS_MIN_SIZE = env_int("COMPRESS_MIN_SIZE", 1024)
+    COMPRESS_LEVEL = env_int("COMPRESS_LEVEL", 6)
+    COMPRESS_CACHE_ENTRIES = env_int("COMPRESS_CACHE_ENTRIES", 256)
+    BATCH_MAX_REQUESTS = env_int("BATCH_MAX_REQUESTS", 50)
+    BATCH_MAX_WORKERS = env_int("BATCH_MAX_WORKERS", 4)
+    PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+    PROFILE_SLOW_MS = env_int("PROFILE_SLOW_MS", 500)
+    # Slow-request log and cProfile dumps; defaults to <instance>/profiles.
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")
+    PROFILE_MAX_FILES = env_int("PROFILE_MAX_FILES", 50)
+    SLOW_QUERY_ENABLED = env_bool("SLOW_QUERY_ENABLED", False)
+    SLOW_QUERY_MS = env_int("SLOW_QUERY_MS", 100)
+    # Defaults to <instance>/slow_queries.log.
+    SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG")
+    METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+    # When set, /metrics requires "Authorization: Bearer <token>".
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    # Shared directory for multi-worker servers (e.g. gunicorn); each worker flushes its
+    # metrics there every METRICS_FLUSH_SECONDS and a scrape merges them.
+    METRICS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = env_int("METRICS_FLUSH_SECONDS", 5)
+    # ASGI mode (app.asgi); the async URL defaults to the sync one with an async driver.
+    ASYNC_DATABASE_URI = os.environ.get("ASYNC_DATABASE_URL")
+    KITCHEN_POLL_INTERVAL_MS = env_int("KITCHEN_POLL_INTERVAL_MS", 500)
+    KITCHEN_LONG_POLL_SECONDS = env_int("KITCHEN_LONG_POLL_SECONDS", 25)
+    # Production launcher (app.server); 0 workers/threads means sized from CPUs and backend.
+    SERVER_BIND = os.environ.get("SERVER_BIND", "0.0.0.0:8000")
+    SERVER_WORKERS = env_int("SERVER_WORKERS", 0)
+    SERVER_THREADS = env_int("SERVER_THREADS", 0)
+    SERVER_MAX_REQUESTS = env_int("SERVER_MAX_REQUESTS", 10000)
+    SERVER_MAX_REQUESTS_JITTER = env_int("SERVER_MAX_REQUESTS_JITTER", 1000)
+    SERVER_TIMEOUT = env_int("SERVER_TIMEOUT", 60)
+    SERVER_GRACEFUL_TIMEOUT = env_int("SERVER_GRACEFUL_TIMEOUT", 30)
+    SERVER_KEEPALIVE = env_int("SERVER_KEEPALIVE", 5)
+    # Background jobs: "queue=limit" pairs; on SQLite and PostgreSQL a limit holds across all worker processes.
+    JOBS_QUEUES = os.environ.get("JOBS_QUEUES", "default=2,invoices=2,exports=1")
+    JOBS_POLL_INTERVAL_MS = env_int("JOBS_POLL_INTERVAL_MS", 1000)
+    JOBS_LEASE_SECONDS = env_int("JOBS_LEASE_SECONDS", 60)
+    JOBS_BACKOFF_SECONDS = env_int("JOBS_BACKOFF_SECONDS", 5)
+    JOBS_BACKOFF_MAX_SECONDS = env_int("JOBS_BACKOFF_MAX_SECONDS", 600)
+    JOBS_RETENTION_HOURS = env_int("JOBS_RETENTION_HOURS", 168)
+    # Run a worker thread inside each app process instead of `flask jobs work`.
+    JOBS_EMBEDDED_WORKER = env_bool("JOBS_EMBEDDED_WORKER", False)
+    # Invoice numbers run per branch and fiscal year; each process reserves them in blocks.
+    INVOICE_NUMBER_FORMAT = os.environ.get("INVOICE_NUMBER_FORMAT", "INV-{branch_id}-{year}-{number:06d}")
+    INVOICE_NUMBER_BLOCK = env_int("INVOICE_NUMBER_BLOCK", 20)
+    INVOICE_FISCAL_YEAR_START_MONTH = env_int("INVOICE_FISCAL_YEAR_START_MONTH", 1)
+    # Payments ledger: per-method totals are folded in by a job queued this long after a checkout.
+    PAYMENTS_ROLLUP_DELAY_SECONDS = env_int("PAYMENTS_ROLLUP_DELAY_SECONDS", 10)
+    # Streaming exports: rows fetched per round trip and rows per Parquet row group.
+    EXPORT_BATCH_ROWS = env_int("EXPORT_BATCH_ROWS", 5000)
+    EXPORT_ROW_GROUP_ROWS = env_int("EXPORT_ROW_GROUP_ROWS", 65536)
+    COMPRESS_MIMETYPES = ["application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"]
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    JOBS_EMBEDDED_WORKER = env_bool("JOBS_EMBEDDED_WORKER", True)
+    API_DOCS_ENABLED = env_bool("API_DOCS_ENABLED", True)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+
+
+class ProductionConfig(Config):
+    # No fallbacks: create_app() refuses to start without real keys.
+    SECRET_KEY = os.environ.get("SECRET_KEY")
+    JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
+    # The same lock wait as the driver's connect timeout, also for the ASGI engine.
+    SQLITE_PRAGMAS = {**PRODUCTION_PRAGMAS, "busy_timeout": Config.DB_STATEMENT_TIMEOUT_MS}
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI, Config.DB_STATEMENT_TIMEOUT_MS)
+
+
+CONFIGS = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for ``name``, defaulting to the ``APP_CONFIG`` environment variable."""
+    name = name or os.environ.get("APP_CONFIG", "development")
+    try:
+        return CONFIGS[name]
+    except KeyError:
+        raise ValueError(f"Unknown APP_CONFIG {name!r}, expected one of {sorted(CONFIGS)}") from None
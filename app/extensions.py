@@ -2,11 +2,13 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from app.utils.replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 ma = Marshmallow()
 jwt = JWTManager()
-migrate = Migrate()
+# SQLite cannot ALTER constraints in place, so migrations use batch mode.
+migrate = Migrate(render_as_batch=True)
 
 blacklist = set()
 
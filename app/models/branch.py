@@ -1,4 +1,5 @@
 from app.extensions import db
+from datetime import datetime
 
 class Branch(db.Model):
     __tablename__ = "branches"
@@ -6,7 +7,8 @@ class Branch(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     address = db.Column(db.String(255), nullable=False)
     city = db.Column(db.String(100), nullable=False)
-    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<Branch {self.city} - {self.address}>"
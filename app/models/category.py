@@ -1,11 +1,13 @@
 from app.extensions import db
+from datetime import datetime
 
 class Category(db.Model):
     __tablename__ = "categories"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    menu_id = db.Column(db.Integer, db.ForeignKey("menus.id"), nullable=False)
+    menu_id = db.Column(db.Integer, db.ForeignKey("menus.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     items = db.relationship("Item", backref="category", cascade="all, delete", lazy=True)
 
@@ -0,0 +1,12 @@
+from app.extensions import db
+from datetime import datetime
+
+class CollectionVersion(db.Model):
+    __tablename__ = "collection_versions"
+
+    name = db.Column(db.String(50), primary_key=True)  # table name of the collection
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CollectionVersion {self.name} v{self.version}>"
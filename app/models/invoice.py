@@ -3,6 +3,11 @@ from datetime import datetime
 
 class Invoice(db.Model):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Keyset pages of one payment status (the unpaid screen) and of all invoices, newest first.
+        db.Index("ix_invoices_payment_status_issue_date", "payment_status", "issue_date"),
+        db.Index("ix_invoices_issue_date", "issue_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), unique=True, nullable=False)
@@ -0,0 +1,13 @@
+from app.extensions import db
+from datetime import datetime
+
+class InvoiceSequence(db.Model):
+    __tablename__ = "invoice_sequences"
+
+    branch_id = db.Column(db.Integer, db.ForeignKey("branches.id"), primary_key=True)
+    fiscal_year = db.Column(db.Integer, primary_key=True)
+    next_number = db.Column(db.Integer, nullable=False, default=1)  # first number not yet reserved
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<InvoiceSequence branch {self.branch_id} FY{self.fiscal_year} next {self.next_number}>"
@@ -1,4 +1,5 @@
 from app.extensions import db
+from datetime import datetime
 
 class Item(db.Model):
     __tablename__ = "items"
@@ -7,7 +8,8 @@ class Item(db.Model):
     name = db.Column(db.String(100), nullable=False)
     price = db.Column(db.Float, nullable=False)
     description = db.Column(db.String(255))
-    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<Item {self.name} - ₹{self.price}>"
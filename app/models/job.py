@@ -0,0 +1,26 @@
+from app.extensions import db
+from datetime import datetime
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    # Workers claim the oldest due job of a queue; the index answers that without a scan.
+    __table_args__ = (db.Index("ix_jobs_queue_status_run_at", "queue", "status", "run_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    queue = db.Column(db.String(50), nullable=False, default="default")
+    task = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")  # JSON keyword arguments of the task
+    key = db.Column(db.String(200), index=True)  # deduplicates jobs that are queued or running
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    lease_expires_at = db.Column(db.DateTime)
+    result = db.Column(db.Text)  # JSON return value of the task
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.task} [{self.status}]>"
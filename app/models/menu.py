@@ -1,4 +1,5 @@
 from app.extensions import db
+from datetime import datetime
 
 class Menu(db.Model):
     __tablename__ = "menus"
@@ -7,7 +8,8 @@ class Menu(db.Model):
     name = db.Column(db.String(100), nullable=False)
     price = db.Column(db.Float, nullable=False)
     category = db.Column(db.String(50))
-    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<Menu {self.name} - ${self.price}>"
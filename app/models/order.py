@@ -3,15 +3,20 @@ from datetime import datetime
 
 class Order(db.Model):
     __tablename__ = "orders"
+    __table_args__ = (
+        db.Index("ix_orders_branch_id_created_at", "branch_id", "created_at"),
+        # The outstanding-balance list reads only unpaid and partially paid orders.
+        db.Index("ix_orders_payment_status_created_at", "payment_status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)
     branch_id = db.Column(db.Integer, db.ForeignKey("branches.id"), nullable=False)
     total_amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), default="pending")
+    status = db.Column(db.String(20), default="pending", index=True)
     payment_status = db.Column(db.String(20), default="unpaid") 
     payment_method = db.Column(db.String(50))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     order_items = db.relationship("OrderItem", backref="order", lazy=True, cascade="all, delete-orphan")
     invoice = db.relationship("Invoice", backref="order", uselist=False)
@@ -21,6 +26,6 @@ class Order(db.Model):
 class OrderItem(db.Model):
     __tablename__ = "order_items"
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False)
-    item_id = db.Column(db.Integer, db.ForeignKey("items.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True)
+    item_id = db.Column(db.Integer, db.ForeignKey("items.id"), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
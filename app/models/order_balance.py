@@ -0,0 +1,16 @@
+from app.extensions import db
+from datetime import datetime
+
+class OrderBalance(db.Model):
+    # Running totals of an order's payment events, updated in the transaction that records each one.
+    __tablename__ = "order_balances"
+
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), primary_key=True)
+    paid_amount = db.Column(db.Float, nullable=False, default=0)  # payments minus refunds
+    refunded_amount = db.Column(db.Float, nullable=False, default=0)
+    tip_amount = db.Column(db.Float, nullable=False, default=0)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OrderBalance Order {self.order_id} paid {self.paid_amount}>"
@@ -0,0 +1,26 @@
+from app.extensions import db
+from datetime import datetime
+from sqlalchemy import event
+
+class PaymentEvent(db.Model):
+    # One money movement on an order. Rows are only ever inserted: corrections are new events.
+    __tablename__ = "payment_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # payment, refund, tip
+    method = db.Column(db.String(50), nullable=False)
+    amount = db.Column(db.Float, nullable=False)  # always positive; kind gives the direction
+    reference = db.Column(db.String(100))  # e.g. the card terminal's transaction id
+    # Client-chosen; a retried checkout with the same key gets the original event back.
+    idempotency_key = db.Column(db.String(100), unique=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PaymentEvent {self.id} {self.kind} {self.amount} on Order {self.order_id}>"
+
+
+@event.listens_for(PaymentEvent, "before_update")
+@event.listens_for(PaymentEvent, "before_delete")
+def _append_only(mapper, connection, target):
+    raise ValueError("Payment events are append-only; record a refund instead")
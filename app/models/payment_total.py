@@ -0,0 +1,16 @@
+from app.extensions import db
+
+class PaymentTotal(db.Model):
+    # Payment events summed per branch, day and method; folded in by the "payments.rollup" job.
+    __tablename__ = "payment_totals"
+
+    branch_id = db.Column(db.Integer, db.ForeignKey("branches.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    method = db.Column(db.String(50), primary_key=True)
+    payments = db.Column(db.Float, nullable=False, default=0)
+    refunds = db.Column(db.Float, nullable=False, default=0)
+    tips = db.Column(db.Float, nullable=False, default=0)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PaymentTotal branch {self.branch_id} {self.day} {self.method}>"
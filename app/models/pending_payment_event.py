@@ -0,0 +1,11 @@
+from app.extensions import db
+
+class PendingPaymentEvent(db.Model):
+    # Payment events not yet folded into payment_totals. Written with the event; the rollup
+    # deletes the row in the transaction that folds the event in, so each one counts once.
+    __tablename__ = "pending_payment_events"
+
+    event_id = db.Column(db.Integer, db.ForeignKey("payment_events.id"), primary_key=True)
+
+    def __repr__(self):
+        return f"<PendingPaymentEvent {self.event_id}>"
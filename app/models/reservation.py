@@ -3,9 +3,10 @@ from datetime import datetime
 
 class Reservation(db.Model):
     __tablename__ = "reservations"
+    __table_args__ = (db.Index("ix_reservations_table_id_reservation_time", "table_id", "reservation_time"),)
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
     table_id = db.Column(db.Integer, db.ForeignKey("tables.id"), nullable=False)
 
     reservation_time = db.Column(db.DateTime, nullable=False)
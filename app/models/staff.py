@@ -10,6 +10,7 @@ class Staff(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), nullable=False, default="staff")  # 'admin' or 'staff'
+    branch_id = db.Column(db.Integer, db.ForeignKey("branches.id"))  # None = no branch-scoped access unless admin
 
     def set_password(self, password: str):
         self.password_hash = hash_password(password)
@@ -1,7 +1,10 @@
 from app.extensions import db
+from datetime import datetime
 
 class Table(db.Model):
     __tablename__ = "tables"
+    # Also serves as the index on branch_id.
+    __table_args__ = (db.UniqueConstraint("branch_id", "table_number", name="uq_tables_branch_id_table_number"),)
 
     id = db.Column(db.Integer, primary_key=True)
     table_number = db.Column(db.String(10), nullable=False)
@@ -9,6 +12,7 @@ class Table(db.Model):
     is_available = db.Column(db.Boolean, default=True)
     location = db.Column(db.String(100))  # e.g., Window, Outdoor, etc.
     branch_id = db.Column(db.Integer, db.ForeignKey("branches.id"), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<Table {self.table_number} - {self.seats} seats>"
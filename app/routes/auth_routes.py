@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import create_access_token
 from app.models.staff import Staff
 from app.schemas.staff_schema import StaffSchema
 from app.extensions import db
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, current_claims, admin_required
+from app.utils.metrics import inc
 from app.extensions import blacklist
 
 staff_schema = StaffSchema()
@@ -13,8 +14,7 @@ auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 staffs_schema = StaffSchema(many=True)
 
 @auth_bp.route("/register", methods=["POST"])
-@jwt_required() # Ensure only admins can register new staff
-@admin_required # Custom decorator to check if the user is an admin
+@admin_required
 def register():
     """
     Register a new staff user
@@ -43,6 +43,9 @@ def register():
             role:
               type: string
               enum: [admin, staff, customer]
+            branch_id:
+              type: integer
+              description: Branch a staff member works at; staff without one cannot use branch-scoped endpoints
     responses:
       201:
         description: Staff registered successfully
@@ -62,7 +65,8 @@ def register():
     staff = Staff(
         username=data["username"],
         email=data["email"],
-        role=data.get("role", "staff")
+        role=data.get("role", "staff"),
+        branch_id=data.get("branch_id")
     )
     staff.set_password(data["password"])
     db.session.add(staff)
@@ -105,23 +109,25 @@ def login():
 
     staff = Staff.query.filter_by(username=data["username"]).first()
     if not staff or not staff.check_password(data["password"]):
+        inc("auth_login_failures_total")
         return jsonify({"msg": "Invalid username or password"}), 401
 
     access_token = create_access_token(
         identity=str(staff.id),
-        additional_claims={"username": staff.username, "role": staff.role}
+        additional_claims={"username": staff.username, "role": staff.role, "branch_id": staff.branch_id}
     )
     return jsonify({
         "access_token": access_token,
         "user": {
             "id": staff.id,
             "username": staff.username,
-            "role": staff.role
+            "role": staff.role,
+            "branch_id": staff.branch_id
         }
     }), 200
 
 @auth_bp.route("/me", methods=["GET"])
-@jwt_required()
+@login_required
 def get_current_user():
     """
     Get current logged-in user details
@@ -134,14 +140,15 @@ def get_current_user():
       200:
         description: Current user info
     """
-    jwt_data = get_jwt()
+    jwt_data = current_claims()
     return jsonify({
         "username": jwt_data["username"],
-        "role": jwt_data["role"]
+        "role": jwt_data["role"],
+        "branch_id": jwt_data.get("branch_id")
     }), 200
 
 @auth_bp.route("/protected", methods=["GET"])
-@jwt_required()
+@login_required
 def protected():
     """
     Protected route example
@@ -154,7 +161,7 @@ def protected():
       200:
         description: Success message
     """
-    jwt_data = get_jwt()
+    jwt_data = current_claims()
     return jsonify({"msg": f"Hello {jwt_data['username']}! You are a {jwt_data['role']}"}), 200
 
 @auth_bp.route("/admin-only", methods=["GET"])
@@ -177,7 +184,7 @@ def admin_only():
 
 
 @auth_bp.route("/logout", methods=["POST"])
-@jwt_required()
+@login_required
 def logout():
     """
     Logout user (JWT revocation logic to be implemented)
@@ -190,6 +197,6 @@ def logout():
       200:
         description: User logged out
     """
-    jti = get_jwt()["jti"]
+    jti = current_claims()["jti"]
     blacklist.add(jti)
     return jsonify({"msg": "Successfully logged out"}), 200
\ No newline at end of file
@@ -0,0 +1,172 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from flask import Blueprint, current_app, g, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+from app.extensions import db
+from app.utils.decorators import current_claims, login_required
+
+batch_bp = Blueprint("batch", __name__, url_prefix="/batch")
+
+READ_METHODS = frozenset(("GET", "HEAD"))
+METHODS = READ_METHODS | {"POST", "PUT", "PATCH", "DELETE"}
+# Headers a sub-request may set itself; everything else comes from the batch request.
+FORWARDED_HEADERS = frozenset(("if-none-match", "if-modified-since", "accept"))
+
+
+def build_environ(item):
+    headers = {name: value for name, value in (item.get("headers") or {}).items()
+               if name.lower() in FORWARDED_HEADERS}
+    if "Authorization" in request.headers:
+        headers["Authorization"] = request.headers["Authorization"]
+    builder = EnvironBuilder(
+        path=item["path"],
+        base_url=request.host_url,
+        method=item.get("method", "GET").upper(),
+        headers=headers,
+        json=item.get("body"),
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def dispatch(app, environ):
+    """Run one sub-request through the normal request pipeline of ``app``."""
+    with app.request_context(environ):
+        try:
+            return app.full_dispatch_request()
+        except Exception:
+            app.logger.exception("Batch sub-request %s failed", environ.get("PATH_INFO"))
+            db.session.rollback()
+            return app.response_class(b'{"error":"Internal Server Error"}', status=500,
+                                      mimetype="application/json")
+
+
+def dispatch_in_thread(app, claims, primary, environ):
+    # A worker thread gets its own app context and DB session; the claims already
+    # verified for the batch are reused instead of decoding the token again.
+    with app.app_context():
+        g.jwt_claims = claims
+        g.db_primary = primary
+        return dispatch(app, environ)
+
+
+def encode_result(response):
+    body = response.get_data()
+    if not response.is_json:
+        body = json.dumps(body.decode("utf-8", "replace")).encode()
+    elif not body:
+        body = b"null"
+    return b'{"status":%d,"body":%s}' % (response.status_code, body)
+
+
+def validate(payload, limit):
+    items = payload.get("requests") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return "'requests' must be a non-empty list"
+    if len(items) > limit:
+        return f"At most {limit} requests per batch"
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str) or not item["path"].startswith("/"):
+            return "Every request needs an absolute 'path'"
+        if item["path"].split("?", 1)[0].rstrip("/") == batch_bp.url_prefix:
+            return "Batch requests cannot be nested"
+        method = item.get("method", "GET")
+        if not isinstance(method, str) or method.upper() not in METHODS:
+            return f"'method' must be one of {', '.join(sorted(METHODS))}"
+        headers = item.get("headers")
+        if headers is not None and (not isinstance(headers, dict)
+                                    or not all(isinstance(value, str) for value in headers.values())):
+            return "'headers' must be an object of strings"
+        if item.get("body") is not None and not isinstance(item["body"], (dict, list)):
+            return "'body' must be a JSON object or array"
+    return None
+
+
+@batch_bp.route("", methods=["POST"])
+@login_required
+def run_batch():
+    """
+    Execute several API requests in one round trip
+    ---
+    tags:
+      - Batch
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - requests
+          properties:
+            parallel:
+              type: boolean
+              description: Run consecutive GET requests concurrently
+            requests:
+              type: array
+              items:
+                type: object
+                required:
+                  - path
+                properties:
+                  method:
+                    type: string
+                    enum: [GET, HEAD, POST, PUT, PATCH, DELETE]
+                    example: GET
+                  path:
+                    type: string
+                    example: /tables/
+                  body:
+                    type: object
+                    description: JSON object or array sent as the request body
+                  headers:
+                    type: object
+                    description: Only If-None-Match, If-Modified-Since and Accept are used
+    responses:
+      200:
+        description: One {status, body} entry per request, in request order
+      400:
+        description: Invalid batch
+    """
+    payload = request.get_json(silent=True)
+    error = validate(payload, current_app.config["BATCH_MAX_REQUESTS"])
+    if error:
+        return jsonify({"error": error}), 400
+
+    app = current_app._get_current_object()
+    items = payload["requests"]
+    environs = [build_environ(item) for item in items]
+    claims = current_claims()
+    workers = current_app.config["BATCH_MAX_WORKERS"] if payload.get("parallel") else 1
+
+    results = [None] * len(items)
+    index = 0
+    with ThreadPoolExecutor(workers) if workers > 1 else nullcontext() as executor:
+        while index < len(items):
+            reads = index
+            while executor and reads < len(items) and environs[reads]["REQUEST_METHOD"] in READ_METHODS:
+                reads += 1
+            if reads - index > 1:
+                # A run of reads has no ordering constraints between its members.
+                # Reads after a write in this batch must see it, so they skip the replicas.
+                primary = bool(db.session.info.get("primary"))
+                futures = [executor.submit(dispatch_in_thread, app, claims, primary, environs[i])
+                           for i in range(index, reads)]
+                for i, future in zip(range(index, reads), futures):
+                    results[i] = encode_result(future.result())
+                index = reads
+            else:
+                # Writes (and lone reads) run in order on the batch's own session.
+                results[index] = encode_result(dispatch(app, environs[index]))
+                index += 1
+
+    body = b'{"responses":[' + b",".join(results) + b"]}"
+    return current_app.response_class(body, mimetype="application/json"), 200
+
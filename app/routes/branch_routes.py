@@ -2,15 +2,17 @@ from flask import Blueprint, request, jsonify
 from app.models.branch import Branch
 from app.extensions import db
 from app.schemas.branch_schema import BranchSchema
-from flask_jwt_extended import jwt_required
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields, sparse
+from app.utils.versioning import conditional
 
 branch_bp = Blueprint("branches", __name__, url_prefix="/branches")
 branch_schema = BranchSchema()
 branches_schema = BranchSchema(many=True)
+branches_serializer = CompiledSerializer(branches_schema, Branch)
 
 @branch_bp.route("/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_branch():
     """
@@ -58,7 +60,8 @@ def create_branch():
     return jsonify(branch_schema.dump(branch)), 201
 
 @branch_bp.route("/", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("branches")
 def get_branches():
     """
     Get all branches
@@ -67,15 +70,21 @@ def get_branches():
       - Branch
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of branches
     """
-    branches = Branch.query.all()
-    return jsonify(branches_schema.dump(branches)), 200
+    return json_response(branches_serializer.only(requested_fields(branches_schema)).dump()), 200
 
 @branch_bp.route("/<int:branch_id>", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("branches", model=Branch, id_arg="branch_id")
 def get_branch(branch_id):
     """
     Get a single branch by ID
@@ -89,17 +98,22 @@ def get_branch(branch_id):
         in: path
         type: integer
         required: true
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: Branch data
       404:
         description: Branch not found
     """
-    branch = Branch.query.get_or_404(branch_id)
-    return jsonify(branch_schema.dump(branch)), 200
+    schema, options = sparse(branch_schema, Branch)
+    branch = Branch.query.options(*options).get_or_404(branch_id)
+    return jsonify(schema.dump(branch)), 200
 
 @branch_bp.route("/<int:branch_id>", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_branch(branch_id):
     """
@@ -147,7 +161,6 @@ def update_branch(branch_id):
     return jsonify(branch_schema.dump(branch)), 200
 
 @branch_bp.route("/<int:branch_id>", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_branch(branch_id):
     """
@@ -1,20 +1,23 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
 from app.models.category import Category
 from app.models.item import Item
 from app.schemas.category_schema import CategorySchema
 from app.schemas.item_schema import ItemSchema
 from app.extensions import db
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields
+from app.utils.versioning import conditional
 
 category_bp = Blueprint("category_bp", __name__)
 category_schema = CategorySchema()
 item_schema = ItemSchema()
 categories_schema = CategorySchema(many=True)
 items_schema = ItemSchema(many=True)
+categories_serializer = CompiledSerializer(categories_schema, Category)
+items_serializer = CompiledSerializer(items_schema, Item)
 
 @category_bp.route("/categories/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_category():
     """
@@ -49,7 +52,8 @@ def create_category():
 
 
 @category_bp.route("/categories/", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("categories")
 def get_categories():
     """
     Get all categories
@@ -58,16 +62,20 @@ def get_categories():
       - Category
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of categories
     """
-    categories = Category.query.all()
-    return categories_schema.dump(categories), 200
+    return json_response(categories_serializer.only(requested_fields(categories_schema)).dump()), 200
 
 
 @category_bp.route("/categories/<int:category_id>/", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_category(category_id):
     """
@@ -104,7 +112,6 @@ def update_category(category_id):
 
 
 @category_bp.route("/categories/<int:category_id>/", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_category(category_id):
     """
@@ -136,7 +143,6 @@ def delete_category(category_id):
 
 
 @category_bp.route("/categories/<int:category_id>/items/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_item(category_id):
     """
@@ -181,7 +187,8 @@ def create_item(category_id):
 
 
 @category_bp.route("/categories/<int:category_id>/items/", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("items")
 def get_items(category_id):
     """
     Get all items under a category
@@ -195,18 +202,22 @@ def get_items(category_id):
         in: path
         type: integer
         required: true
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of items
       404:
         description: Category not found
     """
-    items = Item.query.filter_by(category_id=category_id).all()
-    return items_schema.dump(items), 200
+    serializer = items_serializer.only(requested_fields(items_schema))
+    return json_response(serializer.dump(Item.category_id == category_id)), 200
 
 
 @category_bp.route("/categories/<int:category_id>/items/<int:item_id>/", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_item(category_id, item_id):
     """
@@ -253,7 +264,6 @@ def update_item(category_id, item_id):
 
 
 @category_bp.route("/categories/<int:category_id>/items/<int:item_id>/", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_item(category_id, item_id):
     """
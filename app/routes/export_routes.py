@@ -0,0 +1,117 @@
+from datetime import date
+
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+from marshmallow import ValidationError
+
+from app.schemas.export_schema import ExportQuerySchema
+from app.utils.decorators import admin_required
+from app.utils.exports import FORMATS, gzip_stream, invoice_export, order_export, stream
+
+export_bp = Blueprint("exports", __name__, url_prefix="/exports")
+export_query_schema = ExportQuerySchema()
+
+
+def export_response(build):
+    try:
+        args = export_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    fmt = args.pop("format")
+    export = build(**args)
+    config = current_app.config
+    chunks = stream(export, fmt, config["EXPORT_BATCH_ROWS"], config["EXPORT_ROW_GROUP_ROWS"])
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export.name}-{date.today().isoformat()}.{fmt}"',
+        # Keep proxies from holding the stream back until it ends.
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    # Parquet pages are compressed already.
+    if fmt != "parquet" and config["COMPRESS_ENABLED"] and request.accept_encodings["gzip"]:
+        chunks = gzip_stream(chunks, config["COMPRESS_LEVEL"])
+        headers["Content-Encoding"] = "gzip"
+    return current_app.response_class(stream_with_context(chunks), mimetype=FORMATS[fmt], headers=headers)
+
+
+@export_bp.route("/invoices", methods=["GET"])
+@admin_required
+def export_invoices():
+    """
+    Stream every invoice (optionally of one branch and issue date range)
+    ---
+    tags:
+      - Exports
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson, parquet]
+        default: csv
+        description: parquet needs the "exports" extra (pyarrow)
+      - name: branch_id
+        in: query
+        type: integer
+        required: false
+      - name: date_from
+        in: query
+        type: string
+        format: date
+        required: false
+      - name: date_to
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Inclusive
+    responses:
+      200:
+        description: The invoices, sent as they are read
+      400:
+        description: Validation error
+    """
+    return export_response(invoice_export)
+
+
+@export_bp.route("/orders", methods=["GET"])
+@admin_required
+def export_orders():
+    """
+    Stream orders with their line items (optionally of one branch and date range)
+    ---
+    tags:
+      - Exports
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson, parquet]
+        default: csv
+        description: parquet needs the "exports" extra (pyarrow)
+      - name: branch_id
+        in: query
+        type: integer
+        required: false
+      - name: date_from
+        in: query
+        type: string
+        format: date
+        required: false
+      - name: date_to
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Inclusive
+    responses:
+      200:
+        description: The orders, sent as they are read; one row per line item in csv and parquet
+      400:
+        description: Validation error
+    """
+    return export_response(order_export)
+
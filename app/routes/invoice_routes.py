@@ -1,20 +1,30 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from app.models.invoice import Invoice
 from app.models.order import Order
-from app.schemas.invoice_schema import InvoiceSchema
+from app.schemas.invoice_schema import InvoiceBatchSchema, InvoiceListQuerySchema, InvoiceSchema
+from app.schemas.job_schema import JobSchema
 from app.extensions import db
 from app.utils.decorators import admin_required
-from datetime import datetime
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields
+from app.utils.invoicing import invoice_page
+from app.utils.jobs import enqueue
+from app.utils.pagination import InvalidCursor
+from marshmallow import ValidationError
 
 invoice_bp = Blueprint("invoices", __name__, url_prefix="/invoices")
 invoice_schema = InvoiceSchema()
 invoices_schema = InvoiceSchema(many=True)
+invoices_serializer = CompiledSerializer(invoices_schema, Invoice)
+job_schema = JobSchema()
+invoice_batch_schema = InvoiceBatchSchema()
+invoice_list_query_schema = InvoiceListQuerySchema()
 
 @invoice_bp.route("/<int:order_id>", methods=["POST"])
 @admin_required
 def generate_invoice(order_id):
     """
-    Generate an invoice for a completed order
+    Queue invoice generation for a completed order
     ---
     tags:
       - Invoice
@@ -27,8 +37,8 @@ def generate_invoice(order_id):
         required: true
         description: ID of the completed order
     responses:
-      201:
-        description: Invoice generated successfully
+      202:
+        description: Invoice generation queued; poll the job at the Location header for the invoice
       400:
         description: Invoice already exists or order not completed
       404:
@@ -42,30 +52,148 @@ def generate_invoice(order_id):
     if order.invoice:
         return jsonify({"error": "Invoice already exists"}), 400
 
-    invoice = Invoice(
-        order_id=order.id,
-        invoice_number=f"INV-{order.id}-{int(datetime.utcnow().timestamp())}",
-        total_amount=order.total_amount,
-        payment_status=order.payment_status
-    )
-    db.session.add(invoice)
+    # The invoice itself is built by the "invoices.generate" job (app/tasks.py).
+    job = enqueue("invoices.generate", key=f"invoice:{order.id}", order_id=order.id)
     db.session.commit()
 
-    return jsonify(invoice_schema.dump(invoice)), 201
+    return jsonify(job_schema.dump(job)), 202, {"Location": url_for("jobs.get_job", job_id=job.id)}
+
+@invoice_bp.route("/batch", methods=["POST"])
+@admin_required
+def generate_invoice_batch():
+    """
+    Queue invoicing of every completed, uninvoiced order of a branch in a date range
+    ---
+    tags:
+      - Invoice
+    security:
+      - BearerAuth: []
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - branch_id
+              - date_from
+            properties:
+              branch_id:
+                type: integer
+              date_from:
+                type: string
+                format: date
+              date_to:
+                type: string
+                format: date
+                description: Inclusive; defaults to date_from
+    responses:
+      202:
+        description: Batch queued; the job result has the number of invoices and their total
+      400:
+        description: Validation error
+    """
+    try:
+        data = invoice_batch_schema.load(request.get_json() or {})
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    date_from = data["date_from"].isoformat()
+    date_to = (data.get("date_to") or data["date_from"]).isoformat()
+    job = enqueue("invoices.generate_batch", key=f"invoice-batch:{data['branch_id']}:{date_from}:{date_to}",
+                  branch_id=data["branch_id"], date_from=date_from, date_to=date_to)
+    db.session.commit()
+
+    return jsonify(job_schema.dump(job)), 202, {"Location": url_for("jobs.get_job", job_id=job.id)}
+
+@invoice_bp.route("/reconcile", methods=["POST"])
+@admin_required
+def reconcile_invoices():
+    """
+    Queue a pass that copies each order's payment status onto invoices that drifted from it
+    ---
+    tags:
+      - Invoice
+    security:
+      - BearerAuth: []
+    responses:
+      202:
+        description: Reconciliation queued; the job result has the number of invoices corrected per status
+    """
+    job = enqueue("invoices.reconcile_payment_status", key="invoice-reconcile")
+    db.session.commit()
+
+    return jsonify(job_schema.dump(job)), 202, {"Location": url_for("jobs.get_job", job_id=job.id)}
 
 @invoice_bp.route("/", methods=["GET"])
 @admin_required
 def list_invoices():
     """
-    List all invoices
+    List invoices newest first, one page at a time
     ---
     tags:
       - Invoice
     security:
       - BearerAuth: []
+    parameters:
+      - name: payment_status
+        in: query
+        type: string
+        required: false
+        description: e.g. unpaid
+      - name: branch_id
+        in: query
+        type: integer
+        required: false
+      - name: date_from
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Issue date, inclusive
+      - name: date_to
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Issue date, inclusive
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size, 1 to 500 (default 50)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: next_cursor of the previous page
+      - name: summary
+        in: query
+        type: boolean
+        required: false
+        description: Include the count and total of all matching invoices (default true)
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
-        description: A list of invoices
+        description: A page of invoices, the cursor of the next page (null on the last) and the summary
+      400:
+        description: Validation error or invalid cursor
     """
-    invoices = Invoice.query.all()
-    return jsonify(invoices_schema.dump(invoices)), 200
+    try:
+        args = invoice_list_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    serializer = invoices_serializer.only(requested_fields(invoices_schema))
+    try:
+        rows, next_cursor, summary = invoice_page(serializer.select(), **args)
+    except InvalidCursor as err:
+        return jsonify({"error": str(err)}), 400
+    body = {"invoices": serializer.dump_rows(rows), "next_cursor": next_cursor}
+    if summary is not None:
+        body["summary"] = summary
+    return json_response(body), 200
@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify
+from app.models.job import Job
+from app.schemas.job_schema import JobListQuerySchema, JobSchema
+from app.extensions import db
+from app.utils.decorators import admin_required, staff_required
+from app.utils.replicas import use_primary
+from datetime import datetime
+from marshmallow import ValidationError
+
+job_bp = Blueprint("jobs", __name__, url_prefix="/jobs")
+job_schema = JobSchema()
+jobs_schema = JobSchema(many=True, exclude=("payload", "result", "error"))
+job_list_query_schema = JobListQuerySchema()
+
+@job_bp.route("/", methods=["GET"])
+@admin_required
+@use_primary
+def list_jobs():
+    """
+    List recent background jobs, newest first
+    ---
+    tags:
+      - Jobs
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: queue
+        in: query
+        type: string
+        required: false
+      - name: status
+        in: query
+        type: string
+        required: false
+        description: queued, running, succeeded or failed
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: 1 to 500, default 100
+    responses:
+      200:
+        description: A list of jobs
+      400:
+        description: Validation error
+    """
+    try:
+        args = job_list_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    query = Job.query.order_by(Job.id.desc())
+    if args.get("queue"):
+        query = query.filter(Job.queue == args["queue"])
+    if args.get("status"):
+        query = query.filter(Job.status == args["status"])
+    return jsonify(jobs_schema.dump(query.limit(args["limit"]).all())), 200
+
+@job_bp.route("/<int:job_id>", methods=["GET"])
+@staff_required
+@use_primary
+def get_job(job_id):
+    """
+    Get the status and result of a background job
+    ---
+    tags:
+      - Jobs
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job status, with the result once it succeeded or the error once it failed
+      404:
+        description: Job not found
+    """
+    job = Job.query.get_or_404(job_id)
+    return jsonify(job_schema.dump(job)), 200
+
+@job_bp.route("/<int:job_id>/retry", methods=["POST"])
+@admin_required
+def retry_job(job_id):
+    """
+    Queue a failed job again with a fresh set of attempts
+    ---
+    tags:
+      - Jobs
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      202:
+        description: Job queued
+      400:
+        description: Only failed jobs can be retried
+      404:
+        description: Job not found
+    """
+    job = Job.query.get_or_404(job_id)
+    if job.status != "failed":
+        return jsonify({"error": "Only failed jobs can be retried"}), 400
+
+    job.status = "queued"
+    job.attempts = 0
+    job.run_at = datetime.utcnow()
+    job.finished_at = None
+    db.session.commit()
+    return jsonify(job_schema.dump(job)), 202
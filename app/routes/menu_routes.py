@@ -2,15 +2,17 @@ from flask import Blueprint, request, jsonify
 from app.models.menu import Menu
 from app.extensions import db
 from app.schemas.menu_schema import MenuSchema
-from flask_jwt_extended import jwt_required
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields, sparse
+from app.utils.versioning import conditional
 
 menu_bp = Blueprint("menu", __name__, url_prefix="/menus")
 menu_schema = MenuSchema()
 menus_schema = MenuSchema(many=True)
+menus_serializer = CompiledSerializer(menus_schema, Menu)
 
 @menu_bp.route("/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_menu():
     """
@@ -58,7 +60,8 @@ def create_menu():
     return jsonify(menu_schema.dump(menu)), 201
 
 @menu_bp.route("/", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("menus")
 def get_menus():
     """
     Get all menu items
@@ -67,15 +70,21 @@ def get_menus():
       - Menu
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: A list of all menu items
     """
-    menus = Menu.query.all()
-    return jsonify(menus_schema.dump(menus)), 200
+    return json_response(menus_serializer.only(requested_fields(menus_schema)).dump()), 200
 
 @menu_bp.route("/<int:menu_id>", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("menus", model=Menu, id_arg="menu_id")
 def get_menu(menu_id):
     """
     Get a specific menu item by ID
@@ -91,17 +100,22 @@ def get_menu(menu_id):
         schema:
           type: integer
         description: The ID of the menu item
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: Menu item data
       404:
         description: Menu item not found
     """
-    menu = Menu.query.get_or_404(menu_id)
-    return jsonify(menu_schema.dump(menu)), 200
+    schema, options = sparse(menu_schema, Menu)
+    menu = Menu.query.options(*options).get_or_404(menu_id)
+    return jsonify(schema.dump(menu)), 200
 
 @menu_bp.route("/<int:menu_id>", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_menu(menu_id):
     """
@@ -148,7 +162,6 @@ def update_menu(menu_id):
     return jsonify(menu_schema.dump(menu)), 200
 
 @menu_bp.route("/<int:menu_id>", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_menu(menu_id):
     """
@@ -0,0 +1,31 @@
+import hmac
+
+from flask import Blueprint, abort, current_app, request
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus metrics
+    ---
+    tags:
+      - Monitoring
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text exposition format
+      401:
+        description: METRICS_TOKEN is set and the bearer token does not match
+      404:
+        description: Metrics are disabled
+    """
+    registry = current_app.extensions.get("metrics")
+    if registry is None:
+        abort(404)
+    token = current_app.config["METRICS_TOKEN"]
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return {"error": "Unauthorized"}, 401
+    return current_app.response_class(registry.exposition(), mimetype="text/plain; version=0.0.4")
@@ -1,14 +1,24 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify
 from app.models.order import Order, OrderItem
+from app.models.order_balance import OrderBalance
+from app.models.payment_event import PaymentEvent
 from app.schemas.order_schema import OrderSchema
-from app.schemas.payment_schema import PaymentUpdateSchema
+from app.schemas.payment_schema import PaymentEventSchema, PaymentUpdateSchema
 from app.extensions import db
 from app.utils.decorators import admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields, sparse
+from app.utils.metrics import inc
+from app.utils.payments import PaymentRejected, balance_of, locked_order, record_payment, settle
+from marshmallow import ValidationError
 
 order_bp = Blueprint("orders", __name__, url_prefix="/orders")
 order_schema = OrderSchema()
 orders_schema = OrderSchema(many=True)
 payment_update_schema = PaymentUpdateSchema()
+payment_event_schema = PaymentEventSchema()
+payment_events_schema = PaymentEventSchema(many=True)
+orders_serializer = CompiledSerializer(orders_schema, Order)
 
 @order_bp.route("/", methods=["POST"])
 @admin_required
@@ -75,6 +85,7 @@ def create_order():
         db.session.add(order_item)
 
     db.session.commit()
+    inc("orders_created_total", str(order.branch_id))
     return jsonify(order_schema.dump(order)), 201
 
 @order_bp.route("/", methods=["GET"])
@@ -87,12 +98,17 @@ def get_orders():
       - Orders
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: A list of orders
     """
-    orders = Order.query.all()
-    return jsonify(orders_schema.dump(orders)), 200
+    return json_response(orders_serializer.only(requested_fields(orders_schema)).dump()), 200
 
 @order_bp.route("/<int:order_id>", methods=["GET"])
 @admin_required
@@ -110,14 +126,20 @@ def get_order(order_id):
         required: true
         schema:
           type: integer
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: Order details
       404:
         description: Order not found
     """
-    order = Order.query.get_or_404(order_id)
-    return jsonify(order_schema.dump(order)), 200
+    schema, options = sparse(order_schema, Order)
+    order = Order.query.options(*options).get_or_404(order_id)
+    return jsonify(schema.dump(order)), 200
 
 @order_bp.route("/<int:order_id>", methods=["DELETE"])
 @admin_required
@@ -142,6 +164,8 @@ def delete_order(order_id):
         description: Order not found
     """
     order = Order.query.get_or_404(order_id)
+    if db.session.get(OrderBalance, order.id) is not None:
+        return jsonify({"error": "Orders with payments cannot be deleted"}), 400
     db.session.delete(order)
     db.session.commit()
     return jsonify({"message": "Order deleted"}), 200
@@ -150,7 +174,7 @@ def delete_order(order_id):
 @admin_required
 def update_payment_status(order_id):
     """
-    Update the order status
+    Override the payment status of an order
     ---
     tags:
       - Orders
@@ -168,15 +192,23 @@ def update_payment_status(order_id):
         application/json:
           schema:
             type: object
+            required:
+              - payment_status
             properties:
-              status:
+              payment_status:
+                type: string
+                enum: [unpaid, partially_paid, paid, refunded]
+                description: >
+                  "paid" records the balance due as a payment and "refunded" refunds what
+                  was paid, so the ledger agrees; other changes need POST /payments
+              payment_method:
                 type: string
-                enum: [pending, confirmed, completed, cancelled]
+                description: Method of the recorded event; defaults to the order's last one
     responses:
       200:
-        description: Order status updated
+        description: Payment status updated
       400:
-        description: Invalid status value
+        description: Invalid status value, or a status no single ledger event reaches
       404:
         description: Order not found
     """
@@ -188,8 +220,14 @@ def update_payment_status(order_id):
     payment_status = data.get("payment_status")
     payment_method = data.get("payment_method")
 
-    order = Order.query.get_or_404(order_id)
-    order.payment_status = payment_status
+    order = locked_order(order_id)
+    if order is None:
+        abort(404)
+    try:
+        settle(order, payment_status, payment_method)
+    except PaymentRejected as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), 400
     if payment_method:
         order.payment_method = payment_method
 
@@ -199,6 +237,106 @@ def update_payment_status(order_id):
         "order": order_schema.dump(order)
     }), 200
 
+@order_bp.route("/<int:order_id>/payments", methods=["POST"])
+@admin_required
+def add_payment(order_id):
+    """
+    Record a payment, refund or tip on an order
+    ---
+    tags:
+      - Orders
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: path
+        name: order_id
+        required: true
+        schema:
+          type: integer
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - method
+              - amount
+            properties:
+              kind:
+                type: string
+                enum: [payment, refund, tip]
+                default: payment
+              method:
+                type: string
+                example: card
+              amount:
+                type: number
+                description: Positive; a refund takes money back
+              reference:
+                type: string
+              idempotency_key:
+                type: string
+                description: Send the same key when retrying; the first event is returned instead of a new one
+    responses:
+      201:
+        description: Event recorded; returns it with the order's balance and payment status
+      200:
+        description: Retry of an event already recorded with this idempotency key
+      400:
+        description: Validation error or refund larger than the amount paid
+      404:
+        description: Order not found
+    """
+    try:
+        data = payment_event_schema.load(request.get_json() or {})
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    order = locked_order(order_id)
+    if order is None:
+        abort(404)
+    try:
+        event, balance, created = record_payment(order, **data)
+    except PaymentRejected as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), 400
+    # Built before the commit expires the objects, which would reload them.
+    body = {"event": payment_event_schema.dump(event), "balance": balance, "payment_status": order.payment_status}
+    db.session.commit()
+
+    return jsonify(body), 201 if created else 200
+
+@order_bp.route("/<int:order_id>/payments", methods=["GET"])
+@admin_required
+def get_payments(order_id):
+    """
+    List an order's payment events, oldest first, with its balance
+    ---
+    tags:
+      - Orders
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: path
+        name: order_id
+        required: true
+        schema:
+          type: integer
+    responses:
+      200:
+        description: The events and the order's balance
+      404:
+        description: Order not found
+    """
+    order = Order.query.get_or_404(order_id)
+    events = PaymentEvent.query.filter_by(order_id=order.id).order_by(PaymentEvent.id).all()
+    return jsonify({
+        "events": payment_events_schema.dump(events),
+        "balance": balance_of(order.id),
+        "payment_status": order.payment_status,
+    }), 200
+
 @order_bp.route("/<int:order_id>/status", methods=["PUT"])
 @admin_required
 def update_order_status(order_id):
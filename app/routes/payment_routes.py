@@ -0,0 +1,79 @@
+from flask import Blueprint, request, jsonify
+from app.schemas.payment_schema import OutstandingQuerySchema, RevenueQuerySchema
+from app.utils.decorators import admin_required
+from app.utils.payments import outstanding_orders, revenue_by_method
+from marshmallow import ValidationError
+
+payment_bp = Blueprint("payments", __name__, url_prefix="/payments")
+revenue_query_schema = RevenueQuerySchema()
+outstanding_query_schema = OutstandingQuerySchema()
+
+@payment_bp.route("/outstanding", methods=["GET"])
+@admin_required
+def list_outstanding():
+    """
+    Unpaid and partially paid orders, oldest first, with the balance due
+    ---
+    tags:
+      - Payments
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: branch_id
+        in: query
+        type: integer
+        required: false
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: 1 to 500 (default 100)
+    responses:
+      200:
+        description: Orders with paid_amount and balance_due
+      400:
+        description: Validation error
+    """
+    try:
+        args = outstanding_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    return jsonify(outstanding_orders(**args)), 200
+
+@payment_bp.route("/revenue", methods=["GET"])
+@admin_required
+def revenue():
+    """
+    Payments, refunds, tips and net revenue per payment method
+    ---
+    tags:
+      - Payments
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: branch_id
+        in: query
+        type: integer
+        required: false
+      - name: date_from
+        in: query
+        type: string
+        format: date
+        required: false
+      - name: date_to
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Inclusive
+    responses:
+      200:
+        description: One entry per method
+      400:
+        description: Validation error
+    """
+    try:
+        args = revenue_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    return jsonify(revenue_by_method(**args)), 200
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify
 from app.models.order import Order
 from app.extensions import db
-from datetime import date
+from datetime import date, datetime, time, timedelta
 from sqlalchemy import func
 
 report_bp = Blueprint("reports", __name__, url_prefix="/reports")
@@ -34,9 +34,11 @@ def daily_sales_report():
               example: 12345.67
     """
     today = date.today()
+    # A range on the raw column (not date(created_at)) can use ix_orders_created_at.
+    start = datetime.combine(today, time.min)
     orders_today = (
         db.session.query(func.count(Order.id), func.sum(Order.total_amount))
-        .filter(func.date(Order.created_at) == today)
+        .filter(Order.created_at >= start, Order.created_at < start + timedelta(days=1))
         .first()
     )
 
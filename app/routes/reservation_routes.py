@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
+from marshmallow import ValidationError
 from app.extensions import db
 from app.models.reservation import Reservation
 from app.schemas.reservation_schema import ReservationSchema
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.table import Table
+from app.utils.fieldsets import sparse
+from app.utils.decorators import login_required, current_claims
 
 reservation_bp = Blueprint("reservations", __name__, url_prefix="/reservations")
 
@@ -12,7 +14,7 @@ reservations_schema = ReservationSchema(many=True)
 
 
 @reservation_bp.route("/", methods=["POST"])
-@jwt_required()
+@login_required
 def create_reservation():
     """
     Create a new reservation
@@ -33,13 +35,16 @@ def create_reservation():
         schema:
           $ref: '#/definitions/Reservation'
       400:
-        description: Table is not available
+        description: Validation failed or table is not available
     """
     data = request.get_json()
-    user_id = get_jwt_identity()
+    user_id = current_claims()["sub"]
     data["user_id"] = user_id
 
-    reservation = reservation_schema.load(data)
+    try:
+        reservation = Reservation(**reservation_schema.load(data))
+    except ValidationError as err:
+        return jsonify(err.messages), 400
 
     table = Table.query.get_or_404(reservation.table_id)
     if not table.is_available:
@@ -48,10 +53,10 @@ def create_reservation():
 
     db.session.add(reservation)
     db.session.commit()
-    return reservation_schema.jsonify(reservation), 201
+    return jsonify(reservation_schema.dump(reservation)), 201
 
 @reservation_bp.route("/", methods=["GET"])
-@jwt_required()
+@login_required
 def get_reservations():
     """
     Get all reservations for current user
@@ -60,6 +65,12 @@ def get_reservations():
       - Reservations
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of reservations
@@ -68,13 +79,14 @@ def get_reservations():
           items:
             $ref: '#/definitions/Reservation'
     """
-    user_id = get_jwt_identity()
-    reservations = Reservation.query.filter_by(user_id=user_id).all()
-    return reservations_schema.jsonify(reservations), 200
+    user_id = current_claims()["sub"]
+    schema, options = sparse(reservations_schema, Reservation)
+    reservations = Reservation.query.options(*options).filter_by(user_id=user_id).all()
+    return jsonify(schema.dump(reservations)), 200
 
 
 @reservation_bp.route("/<int:reservation_id>", methods=["GET"])
-@jwt_required()
+@login_required
 def get_reservation(reservation_id):
     """
     Get a reservation by ID
@@ -88,6 +100,11 @@ def get_reservation(reservation_id):
         in: path
         type: integer
         required: true
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: Reservation found
@@ -96,11 +113,12 @@ def get_reservation(reservation_id):
       404:
         description: Reservation not found
     """
-    reservation = Reservation.query.get_or_404(reservation_id)
-    return reservation_schema.jsonify(reservation), 200
+    schema, options = sparse(reservation_schema, Reservation)
+    reservation = Reservation.query.options(*options).get_or_404(reservation_id)
+    return jsonify(schema.dump(reservation)), 200
 
 @reservation_bp.route("/<int:reservation_id>", methods=["PUT"])
-@jwt_required()
+@login_required
 def update_reservation(reservation_id):
     """
     Update a reservation
@@ -125,21 +143,29 @@ def update_reservation(reservation_id):
         description: Updated reservation
         schema:
           $ref: '#/definitions/Reservation'
+      400:
+        description: Validation failed
       403:
         description: Unauthorized
     """
     reservation = Reservation.query.get_or_404(reservation_id)
-    user_id = get_jwt_identity()
-    if reservation.user_id != user_id:
+    user_id = current_claims()["sub"]
+    if str(reservation.user_id) != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     data = request.get_json()
-    updated_reservation = reservation_schema.load(data, instance=reservation, partial=True)
+    try:
+        data = reservation_schema.load(data, partial=True)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    data.pop("user_id", None)
+    for key, value in data.items():
+        setattr(reservation, key, value)
     db.session.commit()
-    return reservation_schema.jsonify(updated_reservation), 200
+    return jsonify(reservation_schema.dump(reservation)), 200
 
 @reservation_bp.route("/<int:reservation_id>", methods=["DELETE"])
-@jwt_required()
+@login_required
 def delete_reservation(reservation_id):
     """
     Delete a reservation
@@ -162,8 +188,8 @@ def delete_reservation(reservation_id):
         description: Reservation not found
     """
     reservation = Reservation.query.get_or_404(reservation_id)
-    user_id = get_jwt_identity()
-    if reservation.user_id != user_id:
+    user_id = current_claims()["sub"]
+    if str(reservation.user_id) != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     table = Table.query.get(reservation.table_id)
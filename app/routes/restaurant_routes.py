@@ -4,8 +4,10 @@ from app.models.branch import Branch
 from app.schemas.restaurant_schema import RestaurantSchema
 from app.schemas.branch_schema import BranchSchema
 from app.extensions import db
-from flask_jwt_extended import jwt_required
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields
+from app.utils.versioning import conditional
 
 restaurant_bp = Blueprint("restaurant", __name__, url_prefix="/restaurants")
 
@@ -13,9 +15,10 @@ restaurant_schema = RestaurantSchema()
 branch_schema = BranchSchema()
 restaurant_list_schema = RestaurantSchema(many=True)
 branch_list_schema = BranchSchema(many=True)
+restaurant_list_serializer = CompiledSerializer(restaurant_list_schema, Restaurant)
+branch_list_serializer = CompiledSerializer(branch_list_schema, Branch)
 
 @restaurant_bp.route("/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_restaurant():
     """
@@ -65,7 +68,7 @@ def create_restaurant():
 
 
 @restaurant_bp.route("/", methods=["GET"])
-@jwt_required()
+@login_required
 def get_restaurants():
     """
     Get all restaurants
@@ -74,6 +77,12 @@ def get_restaurants():
       - Restaurants
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of restaurants
@@ -82,12 +91,11 @@ def get_restaurants():
           items:
             $ref: '#/definitions/Restaurant'
     """
-    restaurants = Restaurant.query.all()
-    return restaurant_list_schema.dump(restaurants), 200
+    serializer = restaurant_list_serializer.only(requested_fields(restaurant_list_schema))
+    return json_response(serializer.dump()), 200
 
 
 @restaurant_bp.route("/<int:restaurant_id>", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_restaurant(restaurant_id):
     """
@@ -124,7 +132,6 @@ def update_restaurant(restaurant_id):
 
 
 @restaurant_bp.route("/<int:restaurant_id>", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_restaurant(restaurant_id):
     """
@@ -159,7 +166,6 @@ def delete_restaurant(restaurant_id):
 
 
 @restaurant_bp.route("/<int:restaurant_id>/branches", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_branch(restaurant_id):
     """
@@ -200,7 +206,8 @@ def create_branch(restaurant_id):
 
 
 @restaurant_bp.route("/<int:restaurant_id>/branches", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("branches")
 def get_branches(restaurant_id):
     """
     Get branches of a specific restaurant
@@ -214,6 +221,11 @@ def get_branches(restaurant_id):
         in: path
         type: integer
         required: true
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: List of branches
@@ -222,12 +234,11 @@ def get_branches(restaurant_id):
           items:
             $ref: '#/definitions/Branch'
     """
-    branches = Branch.query.filter_by(restaurant_id=restaurant_id).all()
-    return branch_list_schema.dump(branches), 200
+    serializer = branch_list_serializer.only(requested_fields(branch_list_schema))
+    return json_response(serializer.dump(Branch.restaurant_id == restaurant_id)), 200
 
 
 @restaurant_bp.route("/<int:restaurant_id>/branches/<int:branch_id>", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_branch(restaurant_id, branch_id):
     """
@@ -268,7 +279,6 @@ def update_branch(restaurant_id, branch_id):
 
 
 @restaurant_bp.route("/<int:restaurant_id>/branches/<int:branch_id>", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_branch(restaurant_id, branch_id):
     """
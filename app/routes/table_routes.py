@@ -1,17 +1,21 @@
 from flask import Blueprint, request, jsonify
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models.table import Table
 from app.schemas.table_schema import TableSchema
-from flask_jwt_extended import jwt_required
-from app.utils.decorators import admin_required
+from app.utils.decorators import login_required, admin_required
+from app.utils.serialization import CompiledSerializer, json_response
+from app.utils.fieldsets import requested_fields, sparse
+from app.utils.versioning import conditional
 
 table_bp = Blueprint("tables", __name__, url_prefix="/tables")
 
 table_schema = TableSchema()
 tables_schema = TableSchema(many=True)
+tables_serializer = CompiledSerializer(tables_schema, Table)
 
 @table_bp.route("/", methods=["POST"])
-@jwt_required()
 @admin_required
 def create_table():
     """
@@ -34,15 +38,25 @@ def create_table():
           $ref: '#/definitions/Table'
       400:
         description: Validation failed
+      409:
+        description: Table number already exists in this branch
     """
     data = request.get_json()
-    table = table_schema.load(data)
+    try:
+        table = Table(**table_schema.load(data))
+    except ValidationError as err:
+        return jsonify(err.messages), 400
     db.session.add(table)
-    db.session.commit()
-    return table_schema.jsonify(table), 201
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Table number already exists in this branch"}), 409
+    return jsonify(table_schema.dump(table)), 201
 
 @table_bp.route("/", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("tables")
 def get_tables():
     """
     Get all tables
@@ -51,6 +65,12 @@ def get_tables():
       - Tables
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: A list of all tables
@@ -59,11 +79,11 @@ def get_tables():
           items:
             $ref: '#/definitions/Table'
     """
-    tables = Table.query.all()
-    return tables_schema.jsonify(tables), 200
+    return json_response(tables_serializer.only(requested_fields(tables_schema)).dump()), 200
 
 @table_bp.route("/<int:table_id>", methods=["GET"])
-@jwt_required()
+@login_required
+@conditional("tables", model=Table, id_arg="table_id")
 def get_table(table_id):
     """
     Get a specific table by ID
@@ -78,6 +98,11 @@ def get_table(table_id):
         type: integer
         required: true
         description: ID of the table
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return, e.g. id,name
     responses:
       200:
         description: Table details
@@ -86,11 +111,11 @@ def get_table(table_id):
       404:
         description: Table not found
     """
-    table = Table.query.get_or_404(table_id)
-    return table_schema.jsonify(table), 200
+    schema, options = sparse(table_schema, Table)
+    table = Table.query.options(*options).get_or_404(table_id)
+    return jsonify(schema.dump(table)), 200
 
 @table_bp.route("/<int:table_id>", methods=["PUT"])
-@jwt_required()
 @admin_required
 def update_table(table_id):
     """
@@ -117,17 +142,29 @@ def update_table(table_id):
         description: Table updated
         schema:
           $ref: '#/definitions/Table'
+      400:
+        description: Validation failed
       404:
         description: Table not found
+      409:
+        description: Table number already exists in this branch
     """
     table = Table.query.get_or_404(table_id)
     data = request.get_json()
-    updated_table = table_schema.load(data, instance=table, partial=True)
-    db.session.commit()
-    return table_schema.jsonify(updated_table), 200
+    try:
+        data = table_schema.load(data, partial=True)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    for key, value in data.items():
+        setattr(table, key, value)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Table number already exists in this branch"}), 409
+    return jsonify(table_schema.dump(table)), 200
 
 @table_bp.route("/<int:table_id>", methods=["DELETE"])
-@jwt_required()
 @admin_required
 def delete_table(table_id):
     """
@@ -0,0 +1,11 @@
+from marshmallow import Schema, ValidationError, fields, validates_schema
+
+# Base for inputs with an inclusive date_from..date_to range; either end may be left open.
+class DateRangeSchema(Schema):
+    date_from = fields.Date()
+    date_to = fields.Date()
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        if data.get("date_to") and data.get("date_from") and data["date_to"] < data["date_from"]:
+            raise ValidationError("date_to must not be before date_from", "date_to")
@@ -0,0 +1,9 @@
+from marshmallow import fields, validate
+
+from app.schemas.date_range_schema import DateRangeSchema
+from app.utils.exports import FORMATS
+
+
+class ExportQuerySchema(DateRangeSchema):
+    format = fields.Str(load_default="csv", validate=validate.OneOf(sorted(FORMATS)))
+    branch_id = fields.Int()
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from marshmallow import EXCLUDE, Schema, fields, validate
+
+from app.schemas.date_range_schema import DateRangeSchema
 
 class InvoiceSchema(Schema):
     id = fields.Int(dump_only=True)
@@ -7,3 +9,19 @@ class InvoiceSchema(Schema):
     issue_date = fields.DateTime()
     total_amount = fields.Float()
     payment_status = fields.Str()
+
+
+class InvoiceBatchSchema(DateRangeSchema):
+    branch_id = fields.Int(required=True)
+    date_from = fields.Date(required=True)
+
+
+class InvoiceListQuerySchema(DateRangeSchema):
+    class Meta:
+        unknown = EXCLUDE  # ?fields= is read separately
+
+    payment_status = fields.Str()
+    branch_id = fields.Int()
+    limit = fields.Int(load_default=50, validate=validate.Range(min=1, max=500))
+    cursor = fields.Str()
+    summary = fields.Bool(load_default=True)
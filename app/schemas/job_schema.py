@@ -0,0 +1,29 @@
+import json
+
+from marshmallow import Schema, fields, validate
+
+class JobSchema(Schema):
+    id = fields.Int(dump_only=True)
+    queue = fields.Str()
+    task = fields.Str()
+    status = fields.Str()
+    attempts = fields.Int()
+    max_attempts = fields.Int()
+    payload = fields.Method("dump_payload")
+    result = fields.Method("dump_result")
+    error = fields.Str()
+    run_at = fields.DateTime()
+    created_at = fields.DateTime()
+    finished_at = fields.DateTime()
+
+    def dump_payload(self, job):
+        return json.loads(job.payload) if job.payload else {}
+
+    def dump_result(self, job):
+        return json.loads(job.result) if job.result else None
+
+
+class JobListQuerySchema(Schema):
+    queue = fields.Str()
+    status = fields.Str()
+    limit = fields.Int(load_default=100, validate=validate.Range(min=1, max=500))
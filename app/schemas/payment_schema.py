@@ -1,5 +1,28 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+
+from app.schemas.date_range_schema import DateRangeSchema
+from app.utils.payments import KINDS, STATUSES
 
 class PaymentUpdateSchema(Schema):
-    payment_status = fields.Str(required=True)
-    payment_method = fields.Str(required=False)
\ No newline at end of file
+    payment_status = fields.Str(required=True, validate=validate.OneOf(STATUSES))
+    payment_method = fields.Str(required=False, validate=validate.Length(min=1, max=50))
+
+
+class PaymentEventSchema(Schema):
+    id = fields.Int(dump_only=True)
+    order_id = fields.Int(dump_only=True)
+    kind = fields.Str(load_default="payment", validate=validate.OneOf(KINDS))
+    method = fields.Str(required=True, validate=validate.Length(min=1, max=50))
+    amount = fields.Float(required=True, validate=validate.Range(min=0, min_inclusive=False))
+    reference = fields.Str(validate=validate.Length(max=100))
+    idempotency_key = fields.Str(validate=validate.Length(min=1, max=100))
+    created_at = fields.DateTime(dump_only=True)
+
+
+class RevenueQuerySchema(DateRangeSchema):
+    branch_id = fields.Int()
+
+
+class OutstandingQuerySchema(Schema):
+    branch_id = fields.Int()
+    limit = fields.Int(load_default=100, validate=validate.Range(min=1, max=500))
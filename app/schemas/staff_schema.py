@@ -6,3 +6,4 @@ class StaffSchema(Schema):
     email = fields.Email(required=True)
     password = fields.Str(required=True, load_only=True, validate=validate.Length(min=6))
     role = fields.Str(validate=validate.OneOf(["admin", "staff"]))
+    branch_id = fields.Int(allow_none=True)
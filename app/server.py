@@ -0,0 +1,140 @@
+"""
+Production launcher: gunicorn with a preloaded app.
+
+    APP_CONFIG=production python -m app.server [--bind 0.0.0.0:8000] [--workers N] [--threads N] [--print-config]
+
+The app is built once in the master and forked into the workers. Worker and thread
+counts default to a size picked from the CPU count and the database backend
+(``SERVER_WORKERS`` / ``SERVER_THREADS`` or the flags override it). Workers are
+recycled after ``SERVER_MAX_REQUESTS`` requests (plus jitter) to cap memory growth.
+
+Signals go to the master: HUP starts fresh workers and retires the old ones
+gracefully; since the app is preloaded, deploying new code needs USR2 (start a new
+master) followed by TERM to the old one.
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from app.config import get_config
+from app.extensions import db
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # optional: pip install restaurant-management[server]
+    BaseApplication = None
+
+
+def auto_size(backend, cpus, pool_limit):
+    """
+    ``(workers, threads)`` for a database backend on ``cpus`` cores.
+
+    SQLite allows one writer at a time, so a single process whose threads share the
+    file beats processes fighting over its lock. Other backends get the usual
+    ``2 * cpus + 1`` processes with a few threads each. Threads never exceed the
+    connections one worker's pool can hand out.
+    """
+    if backend == "sqlite":
+        workers, threads = 1, 2 * cpus + 2
+    else:
+        workers, threads = 2 * cpus + 1, 4
+    return workers, max(1, min(threads, pool_limit))
+
+
+def cpu_count():
+    """CPUs this process may run on, which inside a container can be fewer than the host has."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def server_options(app, bind=None, workers=None, threads=None):
+    config = app.config
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    engine_options = config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    pool_limit = engine_options.get("pool_size", 5) + engine_options.get("max_overflow", 10)
+    auto_workers, auto_threads = auto_size(url.get_backend_name(), cpu_count(), pool_limit)
+    workers = workers or config["SERVER_WORKERS"] or auto_workers
+    threads = threads or config["SERVER_THREADS"] or auto_threads
+    options = {
+        "bind": bind or config["SERVER_BIND"],
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "preload_app": True,
+        "max_requests": config["SERVER_MAX_REQUESTS"],
+        "max_requests_jitter": config["SERVER_MAX_REQUESTS_JITTER"],
+        "timeout": config["SERVER_TIMEOUT"],
+        "graceful_timeout": config["SERVER_GRACEFUL_TIMEOUT"],
+        "keepalive": config["SERVER_KEEPALIVE"],
+        "post_fork": post_fork,
+    }
+    if os.path.isdir("/dev/shm"):
+        # Worker heartbeats on tmpfs, so a slow disk cannot get workers killed.
+        options["worker_tmp_dir"] = "/dev/shm"
+    return options
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while preloading must not be shared with workers.
+    app = server.app.application
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+if BaseApplication is not None:
+    class Server(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+
+def run(app, **options):
+    if BaseApplication is None:
+        raise SystemExit("gunicorn is not installed: pip install restaurant-management[server]")
+    Server(app, server_options(app, **options)).run()
+
+
+def build_app(config_name=None):
+    config_class = get_config(config_name)
+    if not config_class.METRICS_MULTIPROC_DIR:
+        # Let /metrics add up every worker's numbers, including workers already recycled.
+        config_class = type("ServerConfig", (config_class,), {
+            "METRICS_MULTIPROC_DIR": tempfile.mkdtemp(prefix="restaurant-metrics-"),
+        })
+    return create_app(config_class)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", help="host:port or unix:/path (default: SERVER_BIND).")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--config", help="Config name (default: APP_CONFIG).")
+    parser.add_argument("--print-config", action="store_true", help="Show the chosen settings and exit.")
+    args = parser.parse_args(argv)
+
+    app = build_app(args.config)
+    if args.print_config:
+        options = server_options(app, args.bind, args.workers, args.threads)
+        for key, value in sorted(options.items()):
+            if not callable(value):
+                print(f"{key} = {value}")
+        return
+    run(app, bind=args.bind, workers=args.workers, threads=args.threads)
+
+
+if __name__ == "__main__":
+    main()
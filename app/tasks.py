@@ -0,0 +1,55 @@
+"""Background tasks run by the job workers (app.utils.jobs)."""
+from datetime import date, datetime
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.schemas.invoice_schema import InvoiceSchema
+from app.utils.invoice_numbers import allocator
+from app.utils.invoicing import generate_invoices, reconcile_invoice_payment_status
+from app.utils.jobs import PermanentFailure, task
+from app.utils.payments import rollup_payment_totals
+
+invoice_schema = InvoiceSchema()
+
+
+@task("invoices.generate", queue="invoices")
+def generate_invoice(order_id):
+    order = db.session.get(Order, order_id)
+    if order is None:
+        raise PermanentFailure(f"Order {order_id} not found")
+    if order.status != "completed":
+        raise PermanentFailure("Invoice can only be generated for completed orders")
+    # A retried or duplicate job finds the invoice of an earlier run.
+    invoice = order.invoice
+    if invoice is None:
+        issued = datetime.utcnow()
+        invoice = Invoice(
+            order_id=order.id,
+            invoice_number=allocator().next(order.branch_id, issued),
+            issue_date=issued,
+            total_amount=order.total_amount,
+            payment_status=order.payment_status
+        )
+        db.session.add(invoice)
+        db.session.flush()
+    return invoice_schema.dump(invoice)
+
+
+@task("invoices.generate_batch", queue="invoices")
+def generate_invoice_batch(branch_id, date_from, date_to):
+    # Orders invoiced by an earlier, interrupted run are skipped by the anti-join.
+    totals = generate_invoices(branch_id, date.fromisoformat(date_from), date.fromisoformat(date_to))
+    return {"branch_id": branch_id, "date_from": date_from, "date_to": date_to, **totals}
+
+
+@task("invoices.reconcile_payment_status", queue="invoices")
+def reconcile_payment_status(batch_size=1000):
+    # Commits per batch; a retry picks up whatever is still mismatched.
+    corrected = reconcile_invoice_payment_status(batch_size)
+    return {"corrected": sum(corrected.values()), "by_status": corrected}
+
+
+@task("payments.rollup")
+def rollup_payments():
+    return {"events": rollup_payment_totals()}
@@ -0,0 +1,115 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip from the stdlib is always available
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class PrecompressedCache:
+    """Small thread-safe LRU of compressed bodies keyed by ``(etag, encoding)``."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def negotiate_encoding():
+    return request.accept_encodings.best_match(ENCODINGS) if request.accept_encodings else None
+
+
+def etag_variants(etag):
+    """The plain ETag and the per-encoding ETags a client may have been sent."""
+    return (etag, *(f"{etag}-{encoding}" for encoding in ENCODINGS))
+
+
+def precompressed_response(etag):
+    """A ready response from the cached compressed body for ``etag``, or ``None``."""
+    cache = current_app.extensions.get("precompressed")
+    encoding = negotiate_encoding() if cache is not None else None
+    entry = cache.get((etag, encoding)) if encoding else None
+    if entry is None:
+        return None
+    body, mimetype = entry
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app):
+    """
+    Compress responses above ``COMPRESS_MIN_SIZE`` bytes whose type is in
+    ``COMPRESS_MIMETYPES``. Bodies that carry a strong ETag are kept compressed in an
+    LRU so the next request for the same version is served without recompressing.
+    """
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+    cache = app.extensions["precompressed"] = PrecompressedCache(app.config["COMPRESS_CACHE_ENTRIES"])
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    mimetypes = frozenset(app.config["COMPRESS_MIMETYPES"])
+    level = app.config["COMPRESS_LEVEL"]
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in mimetypes
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding()
+        if encoding is None or (response.content_length or 0) < min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        entry = cache.get(key) if key else None
+        if entry is None:
+            entry = (compress(response.get_data(), encoding, level), response.mimetype)
+            if key:
+                cache.put(key, entry)
+        response.set_data(entry[0])
+        response.headers["Content-Encoding"] = encoding
+        if key:
+            response.set_etag(f"{etag}-{encoding}")
+        return response
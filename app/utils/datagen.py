@@ -0,0 +1,194 @@
+import random
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func, select, text
+
+from app.extensions import db
+from app.models.branch import Branch
+from app.models.category import Category
+from app.models.invoice import Invoice
+from app.models.item import Item
+from app.models.menu import Menu
+from app.models.order import Order, OrderItem
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant
+from app.models.staff import Staff
+from app.models.table import Table
+from app.utils.password import hash_password
+
+# Row counts per preset; any of them can be overridden when generating.
+SCALES = {
+    "small": {
+        "restaurants": 1, "branches_per_restaurant": 3, "tables_per_branch": 10, "menus_per_restaurant": 2,
+        "categories_per_menu": 5, "items_per_category": 8, "staff_per_branch": 3, "customers": 200,
+        "orders": 2_000, "reservations": 1_000,
+    },
+    "medium": {
+        "restaurants": 5, "branches_per_restaurant": 10, "tables_per_branch": 25, "menus_per_restaurant": 4,
+        "categories_per_menu": 8, "items_per_category": 12, "staff_per_branch": 8, "customers": 20_000,
+        "orders": 200_000, "reservations": 100_000,
+    },
+    "large": {
+        "restaurants": 20, "branches_per_restaurant": 20, "tables_per_branch": 30, "menus_per_restaurant": 4,
+        "categories_per_menu": 10, "items_per_category": 15, "staff_per_branch": 10, "customers": 200_000,
+        "orders": 2_000_000, "reservations": 1_000_000,
+    },
+}
+
+# Hour of day -> relative order volume: a lunch and a dinner peak.
+HOURLY_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 1, 2, 2, 3, 6, 10, 9, 4, 2, 2, 3, 6, 9, 10, 7, 3, 1]
+ORDER_STATUSES = (("completed", 80), ("confirmed", 6), ("pending", 6), ("cancelled", 8))
+PAYMENT_METHODS = ("card", "cash", "wallet")
+DEFAULT_PASSWORD = "password"
+
+
+class Inserter:
+    """
+    Buffers rows per table and writes them with executemany INSERTs once a buffer
+    reaches ``chunk_size``. Buffers are flushed together in the order their tables
+    were first seen, so parents always reach the database before their children.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for model, rows in self.buffers.items():
+            if rows:
+                db.session.execute(model.__table__.insert(), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                self.buffers[model] = []
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def generate(scale="small", seed=42, days=90, end=None, chunk_size=10_000, **overrides):
+    """
+    Fill an empty database with a deterministic restaurant dataset and return the
+    row count per table. The same ``scale``, ``seed`` and ``end`` always produce
+    the same rows; orders cluster around lunch and dinner over the last ``days``.
+    """
+    if db.session.scalar(select(func.count()).select_from(Restaurant)):
+        raise ValueError("The database already contains restaurants; generate into an empty one")
+    sizes = {**SCALES[scale], **overrides}
+    rng = random.Random(seed)
+    end = end or datetime.combine(datetime.utcnow().date(), time(23, 59))
+    start = end - timedelta(days=days)
+    rows = Inserter(chunk_size)
+
+    branch_ids, menu_ids = [], []
+    item_prices = {}
+    for r in range(1, sizes["restaurants"] + 1):
+        rows.add(Restaurant, {"id": r, "name": f"Restaurant {r}", "location": f"City {r}",
+                              "contact_number": f"+1-555-{r:04d}", "description": None})
+        for b in range(sizes["branches_per_restaurant"]):
+            branch_id = len(branch_ids) + 1
+            branch_ids.append(branch_id)
+            rows.add(Branch, {"id": branch_id, "address": f"{rng.randint(1, 999)} Main St",
+                              "city": f"City {r}", "restaurant_id": r, "updated_at": start})
+        for _ in range(sizes["menus_per_restaurant"]):
+            menu_id = len(menu_ids) + 1
+            menu_ids.append(menu_id)
+            rows.add(Menu, {"id": menu_id, "name": f"Menu {menu_id}", "price": round(rng.uniform(10, 60), 2),
+                            "category": rng.choice(("lunch", "dinner", "drinks", "desserts")),
+                            "restaurant_id": r, "updated_at": start})
+
+    category_id = 0
+    for menu_id in menu_ids:
+        for _ in range(sizes["categories_per_menu"]):
+            category_id += 1
+            rows.add(Category, {"id": category_id, "name": f"Category {category_id}", "menu_id": menu_id,
+                                "updated_at": start})
+            for _ in range(sizes["items_per_category"]):
+                item_id = len(item_prices) + 1
+                item_prices[item_id] = round(rng.uniform(2, 40), 2)
+                rows.add(Item, {"id": item_id, "name": f"Item {item_id}", "price": item_prices[item_id],
+                                "description": None, "category_id": category_id, "updated_at": start})
+
+    table_ids = []
+    for branch_id in branch_ids:
+        for t in range(1, sizes["tables_per_branch"] + 1):
+            table_ids.append(len(table_ids) + 1)
+            rows.add(Table, {"id": table_ids[-1], "table_number": f"T{t}", "seats": rng.choice((2, 2, 4, 4, 6, 8)),
+                             "is_available": rng.random() < 0.9, "location": rng.choice(("Window", "Patio", "Main")),
+                             "branch_id": branch_id, "updated_at": start})
+
+    # Hashing is deliberately slow, so every generated account shares one hash.
+    password_hash = hash_password(DEFAULT_PASSWORD)
+    rows.add(Staff, {"id": 1, "username": "admin", "email": "admin@example.com", "password_hash": password_hash,
+                     "role": "admin", "branch_id": None})
+    staff_id = 1
+    for branch_id in branch_ids:
+        for _ in range(sizes["staff_per_branch"]):
+            staff_id += 1
+            rows.add(Staff, {"id": staff_id, "username": f"staff{staff_id}", "email": f"staff{staff_id}@example.com",
+                             "password_hash": password_hash, "role": "staff", "branch_id": branch_id})
+    customer_ids = range(staff_id + 1, staff_id + sizes["customers"] + 1)
+    for customer_id in customer_ids:
+        rows.add(Staff, {"id": customer_id, "username": f"customer{customer_id}",
+                         "email": f"customer{customer_id}@example.com", "password_hash": password_hash,
+                         "role": "customer", "branch_id": None})
+    rows.flush()
+
+    item_ids = list(item_prices)
+    hours = list(range(24))
+    order_item_id = invoice_id = 0
+    for order_id in range(1, sizes["orders"] + 1):
+        created = datetime.combine(start.date() + timedelta(days=rng.randrange(days + 1)), time(0)) + timedelta(
+            hours=rng.choices(hours, HOURLY_WEIGHTS)[0], minutes=rng.randrange(60), seconds=rng.randrange(60))
+        created = min(created, end)
+        status = weighted(rng, ORDER_STATUSES)
+        paid = status == "completed" or (status == "confirmed" and rng.random() < 0.5)
+        lines = [(rng.choice(item_ids), rng.randint(1, 3)) for _ in range(rng.randint(1, 5))]
+        total = sum(item_prices[item_id] * quantity for item_id, quantity in lines)
+        rows.add(Order, {"id": order_id, "user_id": rng.choice(customer_ids), "branch_id": rng.choice(branch_ids),
+                         "total_amount": round(total, 2), "status": status,
+                         "payment_status": "paid" if paid else "unpaid",
+                         "payment_method": rng.choice(PAYMENT_METHODS) if paid else None, "created_at": created})
+        for item_id, quantity in lines:
+            order_item_id += 1
+            rows.add(OrderItem, {"id": order_item_id, "order_id": order_id, "item_id": item_id, "quantity": quantity})
+        if status == "completed" and rng.random() < 0.9:
+            invoice_id += 1
+            issued = created + timedelta(minutes=rng.randint(20, 90))
+            rows.add(Invoice, {"id": invoice_id, "order_id": order_id,
+                               "invoice_number": f"INV-{order_id}-{int((issued - datetime(1970, 1, 1)).total_seconds())}",
+                               "issue_date": issued, "total_amount": round(total, 2), "payment_status": "paid"})
+
+    horizon = days + 14
+    for reservation_id in range(1, sizes["reservations"] + 1):
+        when = datetime.combine(start.date() + timedelta(days=rng.randrange(horizon)), time(rng.choice((12, 13, 19, 20, 21))))
+        if when > end:
+            status = weighted(rng, (("booked", 92), ("cancelled", 8)))
+        else:
+            status = weighted(rng, (("completed", 85), ("cancelled", 15)))
+        rows.add(Reservation, {"id": reservation_id, "user_id": rng.choice(customer_ids),
+                               "table_id": rng.choice(table_ids), "reservation_time": when,
+                               "guests_count": rng.randint(1, 8), "special_requests": None, "status": status,
+                               "created_at": when - timedelta(days=rng.randint(0, 14))})
+    rows.flush()
+    reset_sequences(rows.buffers)
+    db.session.commit()
+    return rows.counts
+
+
+def reset_sequences(models):
+    """Explicit ids leave PostgreSQL sequences behind; move them past the generated rows."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
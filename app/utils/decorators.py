@@ -1,39 +1,49 @@
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
 from functools import wraps
-from flask import jsonify
+from flask import g, jsonify
 
-def admin_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("role") != "admin":
-            return jsonify({"msg": "Access forbidden: Admins only"}), 403
-        return fn(*args, **kwargs)
-    return wrapper
 
-def staff_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
+def current_claims():
+    """Return the JWT claims of the current request, decoding the token at most once."""
+    claims = g.get("jwt_claims")
+    if claims is None:
         verify_jwt_in_request()
-        identity = get_jwt_identity()
-        if identity.get("role") not in ["admin", "staff"]:
-            return jsonify({"msg": "Staff access required"}), 403
-        return fn(*args, **kwargs)
-    return wrapper
+        claims = g.jwt_claims = get_jwt()
+    return claims
+
+
+def branch_allowed(claims, branch_id):
+    """Admins reach every branch; anyone else only the one in their ``branch_id`` claim, none without it."""
+    if claims.get("role") == "admin":
+        return True
+    return claims.get("branch_id") is not None and claims.get("branch_id") == branch_id
+
+
+def role_required(*roles, branch_arg=None, denied=None):
+    """
+    Allow the view only for tokens whose role is in ``roles`` (any role when empty),
+    answering 403 with ``denied`` (``{"error": "Access Forbidden"}`` by default) otherwise.
+
+    When ``branch_arg`` names a view argument, non-admin users are also limited to
+    the branch carried in their token's ``branch_id`` claim (see ``branch_allowed``).
+    """
+    allowed = frozenset(roles)
+    denied = denied or {"error": "Access Forbidden"}
 
-def role_required(role):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
-            if claims.get("role") != role:
-                return jsonify({"error": "Access Forbidden"}), 403
+            claims = current_claims()
+            role = claims.get("role")
+            if allowed and role not in allowed:
+                return jsonify(denied), 403
+            if branch_arg is not None and not branch_allowed(claims, kwargs.get(branch_arg)):
+                return jsonify({"error": "Access Forbidden: other branch"}), 403
             return fn(*args, **kwargs)
         return decorator
     return wrapper
 
-admin_required = role_required("admin")
-staff_required = role_required("staff")
-customer_required = role_required("customer")
\ No newline at end of file
+login_required = role_required()
+admin_required = role_required("admin", denied={"msg": "Access forbidden: Admins only"})
+staff_required = role_required("admin", "staff")
+customer_required = role_required("customer")
@@ -0,0 +1,247 @@
+"""
+Streaming exports of invoices and orders as CSV, NDJSON or Parquet.
+
+Rows come off the cursor in partitions of ``EXPORT_BATCH_ROWS`` (``yield_per``:
+a server-side cursor on PostgreSQL, ``fetchmany`` elsewhere) and each partition
+is written out before the next one is fetched, so memory stays flat however
+many rows there are, and the first bytes leave before the query has finished.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order, OrderItem
+from app.utils.serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for the Parquet format
+    pa = pq = None
+
+
+class Export:
+    """
+    A query to stream and its output columns as ``(name, kind)`` pairs, kind being
+    one of "int", "float", "str" or "datetime".
+
+    With ``nested=(key, width, names)`` the NDJSON format folds consecutive rows
+    that share their first ``width`` columns into one object whose remaining
+    columns, called ``names``, become a list under ``key`` (orders with their line
+    items); CSV and Parquet stay flat, one row per line item.
+    """
+
+    def __init__(self, name, columns, statement, nested=None):
+        self.name = name
+        self.columns = columns
+        self.statement = statement
+        self.nested = nested
+
+    @property
+    def names(self):
+        return [name for name, _ in self.columns]
+
+    def partitions(self, batch_rows):
+        result = db.session.execute(self.statement.execution_options(yield_per=batch_rows))
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+
+
+def _date_range(statement, column, date_from, date_to):
+    if date_from:
+        statement = statement.where(column >= datetime.combine(date_from, time.min))
+    if date_to:
+        statement = statement.where(column < datetime.combine(date_to, time.min) + timedelta(days=1))
+    return statement
+
+
+def invoice_export(branch_id=None, date_from=None, date_to=None):
+    """
+    Invoices with the branch of their order, in the order their orders were placed
+    (the same index-delivered ordering as ``order_export``); dates filter
+    ``issue_date`` (inclusive).
+    """
+    columns = (
+        ("id", "int"), ("invoice_number", "str"), ("order_id", "int"), ("branch_id", "int"),
+        ("issue_date", "datetime"), ("total_amount", "float"), ("payment_status", "str"),
+    )
+    statement = (
+        select(Invoice.id, Invoice.invoice_number, Invoice.order_id, Order.branch_id, Invoice.issue_date,
+               Invoice.total_amount, Invoice.payment_status)
+        .join(Order, Order.id == Invoice.order_id)
+        .order_by(Order.created_at, Order.id)
+    )
+    if branch_id is not None:
+        statement = statement.where(Order.branch_id == branch_id)
+    return Export("invoices", columns, _date_range(statement, Invoice.issue_date, date_from, date_to))
+
+
+def order_export(branch_id=None, date_from=None, date_to=None):
+    """
+    Orders with their line items, oldest first; dates filter ``created_at``
+    (inclusive). Ordering by ``(created_at, id)`` lets ix_orders_branch_id_created_at
+    or ix_orders_created_at deliver the rows sorted, so no filter makes the
+    database sort the whole result before the first row comes back.
+    """
+    columns = (
+        ("id", "int"), ("user_id", "int"), ("branch_id", "int"), ("total_amount", "float"), ("status", "str"),
+        ("payment_status", "str"), ("payment_method", "str"), ("created_at", "datetime"),
+        ("order_item_id", "int"), ("item_id", "int"), ("quantity", "int"),
+    )
+    statement = (
+        select(Order.id, Order.user_id, Order.branch_id, Order.total_amount, Order.status, Order.payment_status,
+               Order.payment_method, Order.created_at, OrderItem.id, OrderItem.item_id, OrderItem.quantity)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+    )
+    if branch_id is not None:
+        statement = statement.where(Order.branch_id == branch_id)
+    return Export("orders", columns, _date_range(statement, Order.created_at, date_from, date_to),
+                  nested=("order_items", 8, ("id", "item_id", "quantity")))
+
+
+def _datetime_indexes(columns):
+    return [index for index, (_, kind) in enumerate(columns) if kind == "datetime"]
+
+
+def _with_isoformat(rows, indexes):
+    """Rows as lists with their datetime columns in ISO 8601 (what the JSON API returns)."""
+    for row in rows:
+        row = list(row)
+        for index in indexes:
+            if row[index] is not None:
+                row[index] = row[index].isoformat()
+        yield row
+
+
+def write_csv(export, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export.names)
+    # The header goes out before the query runs.
+    yield buffer.getvalue().encode()
+    indexes = _datetime_indexes(export.columns)
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_with_isoformat(rows, indexes) if indexes else rows)
+        yield buffer.getvalue().encode()
+
+
+def write_ndjson(export, partitions):
+    names = export.names
+    indexes = _datetime_indexes(export.columns)
+    if export.nested is None:
+        for rows in partitions:
+            yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in _with_isoformat(rows, indexes))
+        return
+
+    key, width, child_names = export.nested
+    parent_names = names[:width]
+    current = None  # the open object; its rows may continue in the next partition
+    for rows in partitions:
+        lines = []
+        for row in _with_isoformat(rows, indexes):
+            if current is None or current["id"] != row[0]:
+                if current is not None:
+                    lines.append(dumps(current) + b"\n")
+                current = dict(zip(parent_names, row[:width]))
+                current[key] = []
+            if row[width] is not None:
+                current[key].append(dict(zip(child_names, row[width:])))
+        yield b"".join(lines)
+    if current is not None:
+        yield dumps(current) + b"\n"
+
+
+class _Sink(io.RawIOBase):
+    """A write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def write_parquet(export, partitions, row_group_rows=65536):
+    """
+    Parquet with one row group per ``row_group_rows`` rows. Partitions are turned
+    into Arrow record batches as they arrive, so a pending row group is held in
+    compact columnar form; strings are dictionary-encoded and pages zstd-compressed.
+    """
+    kinds = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "datetime": pa.timestamp("us")}
+    schema = pa.schema([(name, kinds[kind]) for name, kind in export.columns])
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    yield sink.drain()
+    pending, pending_rows = [], 0
+    try:
+        for rows in partitions:
+            values = list(zip(*rows))
+            pending.append(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(values, schema)], schema=schema))
+            pending_rows += len(rows)
+            if pending_rows >= row_group_rows:
+                writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=pending_rows)
+                pending, pending_rows = [], 0
+                yield sink.drain()
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=pending_rows)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# Format name -> mimetype.
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+if pq is not None:
+    FORMATS["parquet"] = "application/vnd.apache.parquet"
+
+
+def stream(export, fmt, batch_rows=5000, row_group_rows=65536):
+    """The export in ``fmt`` as a generator of byte chunks."""
+    partitions = export.partitions(batch_rows)
+    if fmt == "parquet":
+        return write_parquet(export, partitions, row_group_rows)
+    if fmt == "ndjson":
+        return write_ndjson(export, partitions)
+    return write_csv(export, partitions)
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Gzip a stream of chunks as it goes. The first chunk is flushed through so
+    the client sees bytes straight away instead of after the compressor's window.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
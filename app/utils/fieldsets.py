@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+import sqlalchemy as sa
+from flask import abort, jsonify, make_response, request
+from marshmallow import fields
+from sqlalchemy.orm import load_only
+
+
+def nested_schema(field):
+    """The schema a ``Nested`` (or ``List`` of ``Nested``) field dumps with, else ``None``."""
+    if isinstance(field, fields.List) and isinstance(field.inner, fields.Nested):
+        return field.inner.schema
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
+
+
+def _is_field(schema, name):
+    head, _, rest = name.partition(".")
+    field = schema.dump_fields.get(head)
+    if field is None or not rest:
+        return field is not None
+    nested = nested_schema(field)
+    return nested is not None and _is_field(nested, rest)
+
+
+def requested_fields(schema):
+    """
+    Field names asked for with ``?fields=id,name`` (dotted names reach into nested
+    schemas), or ``None`` when the client wants everything. Unknown names are a 400.
+    """
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    names = tuple(sorted({name.strip() for name in raw.split(",") if name.strip()}))
+    unknown = [name for name in names if not _is_field(schema, name)]
+    if unknown or not names:
+        abort(make_response(jsonify({"error": f"Unknown fields: {', '.join(unknown) or raw}"}), 400))
+    return names
+
+
+@lru_cache(maxsize=256)
+def schema_variant(schema_class, only, many=False):
+    return schema_class(only=only, many=many)
+
+
+def sparse(schema, model):
+    """
+    Schema and query options for this request's ``?fields=``.
+
+    The options narrow the SELECT to the requested columns (plus the primary key);
+    relationships that were not asked for are never dumped, so never loaded.
+    """
+    only = requested_fields(schema)
+    if only is None:
+        return schema, ()
+    variant = schema_variant(type(schema), only, schema.many)
+    mapper = sa.inspect(model)
+    columns = [getattr(model, name) for name in variant.dump_fields if name in mapper.columns]
+    return variant, (load_only(*columns or [getattr(model, mapper.primary_key[0].key)]),)
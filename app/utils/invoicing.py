@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func, insert, select, true, tuple_, update
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.utils.invoice_numbers import allocator
+from app.utils.metrics import inc
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def uninvoiced_orders(branch_id, date_from, date_to):
+    """
+    Completed orders of a branch created between two dates (inclusive) that have no
+    invoice yet: one anti-join, driven by ix_orders_branch_id_created_at.
+    """
+    start = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to, time.min) + timedelta(days=1)
+    return (
+        select(Order.id, Order.total_amount, Order.payment_status)
+        .outerjoin(Invoice, Invoice.order_id == Order.id)
+        .where(
+            Order.branch_id == branch_id,
+            Order.created_at >= start,
+            Order.created_at < end,
+            Order.status == "completed",
+            Invoice.id.is_(None),
+        )
+        .order_by(Order.id)
+    )
+
+
+def generate_invoices(branch_id, date_from, date_to, chunk_size=1000):
+    """
+    Invoice every completed, uninvoiced order of a branch in a date range with bulk
+    INSERTs in the caller's transaction (commit to keep them). The block of numbers
+    is reserved in one round trip before anything is written. Returns the number of
+    invoices and their total.
+    """
+    orders = db.session.execute(uninvoiced_orders(branch_id, date_from, date_to)).all()
+    issued = datetime.utcnow()
+    numbers = allocator().take(branch_id, issued, len(orders))
+    rows = [
+        {"order_id": order.id, "invoice_number": number, "issue_date": issued,
+         "total_amount": order.total_amount, "payment_status": order.payment_status}
+        for order, number in zip(orders, numbers)
+    ]
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(insert(Invoice), rows[start:start + chunk_size])
+    return {"invoices": len(rows), "total_amount": round(sum(row["total_amount"] for row in rows), 2)}
+
+
+def invoice_filters(payment_status=None, branch_id=None, date_from=None, date_to=None):
+    """WHERE criteria for invoices; the branch is the order's, dates are inclusive on ``issue_date``."""
+    criteria = []
+    if payment_status is not None:
+        criteria.append(Invoice.payment_status == payment_status)
+    if branch_id is not None:
+        # Correlated, so only the invoices a page reads look up their order.
+        criteria.append(select(Order.id).where(Order.id == Invoice.order_id, Order.branch_id == branch_id).exists())
+    if date_from is not None:
+        criteria.append(Invoice.issue_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        criteria.append(Invoice.issue_date < datetime.combine(date_to, time.min) + timedelta(days=1))
+    return criteria
+
+
+def invoice_page(columns, limit, cursor=None, summary=True, **filters):
+    """
+    One page of ``columns`` (a ``select()`` of invoice columns), newest first by
+    ``(issue_date, id)``, starting after ``cursor``.
+
+    Returns the rows, the cursor of the next page (``None`` on the last one) and,
+    with ``summary``, the count and total of every invoice matching the filters,
+    computed in the same statement. Reading a page walks
+    ix_invoices_payment_status_issue_date (or ix_invoices_issue_date) from the
+    cursor, so it costs the same on the first page as on the last, and the summary
+    of a payment status only reads that status's entries. Raises
+    ``InvalidCursor`` for a cursor this function did not produce.
+    """
+    criteria = invoice_filters(**filters)
+    width = len(columns.selected_columns)
+    page = columns.add_columns(Invoice.issue_date.label("page_issued"), Invoice.id.label("page_id")).where(*criteria)
+    if cursor is not None:
+        page = page.where(tuple_(Invoice.issue_date, Invoice.id) < decode_cursor(cursor))
+    page = page.order_by(Invoice.issue_date.desc(), Invoice.id.desc()).limit(limit + 1)
+
+    totals = None
+    if summary:
+        page = page.subquery()
+        summary_row = select(
+            func.count().label("summary_count"),
+            func.coalesce(func.sum(Invoice.total_amount), 0).label("summary_total"),
+        ).where(*criteria).subquery()
+        # The summary is the left side, so an empty page still brings back its one row.
+        rows = db.session.execute(
+            select(page, summary_row)
+            .select_from(summary_row.outerjoin(page, true()))
+            .order_by(page.c.page_issued.desc(), page.c.page_id.desc())
+        ).all()
+        totals = {"count": rows[0][width + 2], "total_amount": round(float(rows[0][width + 3]), 2)}
+        rows = [row for row in rows if row[width + 1] is not None]
+    else:
+        rows = db.session.execute(page).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][width], rows[-1][width + 1])
+    return rows, next_cursor, totals
+
+
+def sync_invoice_payment_status(order_id, payment_status):
+    """
+    Write an order's new payment status through to its invoice, in the caller's
+    transaction. Returns whether the invoice had to change.
+    """
+    corrected = db.session.execute(
+        update(Invoice)
+        .where(Invoice.order_id == order_id, Invoice.payment_status != payment_status)
+        .values(payment_status=payment_status)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if corrected:
+        inc("invoice_payment_status_corrected_total", "payment_update", payment_status, amount=corrected)
+    return bool(corrected)
+
+
+def mismatched_invoices(after_id, limit):
+    """Ids of invoices whose payment status differs from their order's, by id: one join."""
+    return (
+        select(Invoice.id)
+        .join(Order, Order.id == Invoice.order_id)
+        .where(Invoice.id > after_id, Invoice.payment_status != Order.payment_status)
+        .order_by(Invoice.id)
+        .limit(limit)
+    )
+
+
+def reconcile_invoice_payment_status(batch_size=1000):
+    """
+    Copy the order's payment status onto every invoice that drifted from it, one
+    committed batch of ``batch_size`` invoices at a time so writers are never held
+    up for long. Each batch re-reads the order's status in its UPDATE, so a payment
+    recorded mid-run is not overwritten with a stale value. Returns the number of
+    invoices corrected per new status.
+    """
+    current = select(Order.payment_status).where(Order.id == Invoice.order_id).scalar_subquery()
+    corrected = {}
+    after_id = 0
+    while True:
+        ids = db.session.scalars(mismatched_invoices(after_id, batch_size)).all()
+        if not ids:
+            return corrected
+        statuses = db.session.scalars(
+            update(Invoice)
+            .where(Invoice.id.in_(ids), Invoice.payment_status != current)
+            .values(payment_status=current)
+            .returning(Invoice.payment_status)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        for status in set(statuses):
+            count = statuses.count(status)
+            corrected[status] = corrected.get(status, 0) + count
+            inc("invoice_payment_status_corrected_total", "reconciliation", status, amount=count)
+        after_id = ids[-1]
@@ -0,0 +1,310 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, func, or_, select, update
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.metrics import inc
+
+ACTIVE = ("queued", "running")
+TASKS = {}
+
+
+class Task:
+    def __init__(self, name, fn, queue, max_attempts):
+        self.name = name
+        self.fn = fn
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+
+class PermanentFailure(Exception):
+    """Raised by a task when retrying cannot help; the job fails without further attempts."""
+
+
+def task(name, queue="default", max_attempts=5):
+    """Register ``fn(**payload)`` as task ``name``; its return value is stored as the job's JSON result."""
+    def register(fn):
+        TASKS[name] = Task(name, fn, queue, max_attempts)
+        return fn
+    return register
+
+
+def enqueue(name, key=None, delay=0, **payload):
+    """
+    Add a job for task ``name`` to the current session. It becomes visible to workers
+    when the caller commits, together with the caller's own writes. While a job with
+    the same ``key`` is queued or running, that job is returned instead.
+    """
+    task = TASKS[name]
+    if key is not None:
+        existing = db.session.scalar(select(Job).where(Job.key == key, Job.status.in_(ACTIVE)).limit(1))
+        if existing is not None:
+            return existing
+    job = Job(queue=task.queue, task=name, payload=json.dumps(payload), key=key, status="queued",
+              max_attempts=task.max_attempts, run_at=datetime.utcnow() + timedelta(seconds=delay))
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def parse_queues(spec):
+    """``"default=2,invoices=1"`` -> ``{"default": 2, "invoices": 1}``."""
+    queues = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limit = part.partition("=")
+        queues[name.strip()] = int(limit or 1)
+    return queues
+
+
+def claim(queue, worker_id, lease_seconds, limit):
+    """
+    Lease the next due job of ``queue`` to ``worker_id`` and return its id, or ``None``.
+
+    Jobs whose lease ran out (their worker died) are claimable again. The claim is
+    a conditional UPDATE, so two workers racing for a job cannot both win it, and it
+    only succeeds while fewer than ``limit`` jobs of the queue hold a live lease
+    across all workers: claims on a queue take turns (see :func:`lock_queue`), so
+    each one counts the leases the others committed.
+    """
+    now = datetime.utcnow()
+    claimable = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        and_(Job.status == "running", Job.lease_expires_at < now),
+    )
+    candidates = db.session.scalars(
+        select(Job.id).where(Job.queue == queue, claimable).order_by(Job.run_at, Job.id).limit(5)
+    ).all()
+    running = (
+        select(func.count()).select_from(Job)
+        .where(Job.queue == queue, Job.status == "running", Job.lease_expires_at >= now)
+        .scalar_subquery()
+    )
+    for job_id in candidates:
+        lock_queue(queue)
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, claimable, running < limit)
+            .values(status="running", locked_by=worker_id, attempts=Job.attempts + 1,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def lock_queue(queue):
+    """
+    Hold the claim lock of ``queue`` until the transaction ends. On PostgreSQL this is
+    a transaction-level advisory lock; SQLite writers already take turns, which does
+    the same. Other databases would need one before queue limits hold across workers.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(select(func.pg_advisory_xact_lock(zlib.crc32(f"jobs:{queue}".encode()))))
+
+
+def backoff(attempts, base, cap):
+    """Seconds before retry number ``attempts``: exponential, capped, with +-20% jitter."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+class Worker:
+    """
+    Runs jobs from the ``jobs`` table on one thread pool per queue.
+
+    ``queues`` maps queue names to concurrency limits (default ``JOBS_QUEUES``); a
+    limit holds across every worker process sharing the database. Leases of running
+    jobs are renewed while they run, so only a dead worker's jobs are taken over.
+    """
+
+    def __init__(self, app, queues=None):
+        config = app.config
+        self.app = app
+        self.queues = queues or parse_queues(config["JOBS_QUEUES"])
+        self.poll_interval = config["JOBS_POLL_INTERVAL_MS"] / 1000
+        self.lease_seconds = config["JOBS_LEASE_SECONDS"]
+        self.backoff_base = config["JOBS_BACKOFF_SECONDS"]
+        self.backoff_cap = config["JOBS_BACKOFF_MAX_SECONDS"]
+        self.retention = timedelta(hours=config["JOBS_RETENTION_HOURS"])
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.pools = {queue: ThreadPoolExecutor(limit, thread_name_prefix=f"jobs-{queue}")
+                      for queue, limit in self.queues.items()}
+        self.active = {queue: set() for queue in self.queues}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+
+    def run(self, burst=False):
+        """
+        Process jobs until :meth:`stop`; with ``burst``, return once nothing is due or running.
+
+        A failed poll (e.g. "database is locked") is logged and retried with a growing
+        pause, up to a third of the lease so running jobs keep their leases.
+        """
+        renewed = pruned = time.monotonic()
+        errors = 0
+        try:
+            while not self.stopping.is_set():
+                with self.app.app_context():
+                    try:
+                        claimed = self.fill()
+                        if time.monotonic() - renewed > self.lease_seconds / 3:
+                            self.renew()
+                            renewed = time.monotonic()
+                        if time.monotonic() - pruned > 600:
+                            self.prune()
+                            pruned = time.monotonic()
+                        errors = 0
+                    except Exception:
+                        errors += 1
+                        claimed = 0
+                        self.app.logger.exception("Job worker %s failed to poll (%d in a row)", self.id, errors)
+                    finally:
+                        db.session.remove()
+                if errors:
+                    self.wake.wait(backoff(errors, self.poll_interval, self.lease_seconds / 3))
+                    self.wake.clear()
+                    continue
+                with self.lock:
+                    busy = any(self.active.values())
+                if burst and not claimed and not busy:
+                    break
+                if not claimed:
+                    self.wake.wait(self.poll_interval)
+                    self.wake.clear()
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown(wait=True)
+
+    def stop(self):
+        self.stopping.set()
+        self.wake.set()
+
+    def fill(self):
+        """Claim jobs for every free slot; returns how many were claimed."""
+        claimed = 0
+        for queue, limit in self.queues.items():
+            with self.lock:
+                free = limit - len(self.active[queue])
+            for _ in range(free):
+                job_id = claim(queue, self.id, self.lease_seconds, limit)
+                if job_id is None:
+                    break
+                with self.lock:
+                    self.active[queue].add(job_id)
+                self.pools[queue].submit(self.execute, queue, job_id)
+                claimed += 1
+        return claimed
+
+    def execute(self, queue, job_id):
+        with self.app.app_context():
+            try:
+                job = db.session.get(Job, job_id)
+                name = job.task
+                task = TASKS.get(name)
+                try:
+                    if task is None:
+                        raise PermanentFailure(f"Unknown task {name!r}")
+                    if job.attempts > job.max_attempts:
+                        raise PermanentFailure("Lease expired on the last attempt")
+                    result = task.fn(**json.loads(job.payload))
+                    # The ack commits with the task's own writes; a lost lease rolls both back.
+                    if not self.finish(job_id, status="succeeded", result=json.dumps(result), error=None,
+                                       finished_at=datetime.utcnow()):
+                        raise RuntimeError("Lease lost while the job was running")
+                    db.session.commit()
+                    inc("jobs_processed_total", queue, name, "succeeded")
+                except Exception as error:
+                    db.session.rollback()
+                    self.fail(job_id, queue, name, error)
+            finally:
+                db.session.remove()
+                with self.lock:
+                    self.active[queue].discard(job_id)
+                self.wake.set()
+
+    def finish(self, job_id, **values):
+        return db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == self.id, Job.status == "running")
+            .values(locked_by=None, lease_expires_at=None, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def fail(self, job_id, queue, name, error):
+        job = db.session.get(Job, job_id)
+        message = "".join(traceback.format_exception(error))[-4000:]
+        if isinstance(error, PermanentFailure) or job.attempts >= job.max_attempts:
+            outcome = "failed"
+            self.finish(job_id, status="failed", error=message, finished_at=datetime.utcnow())
+        else:
+            outcome = "retried"
+            delay = backoff(job.attempts, self.backoff_base, self.backoff_cap)
+            self.finish(job_id, status="queued", error=message, run_at=datetime.utcnow() + timedelta(seconds=delay))
+        db.session.commit()
+        inc("jobs_processed_total", queue, name, outcome)
+
+    def renew(self):
+        with self.lock:
+            running = [job_id for jobs in self.active.values() for job_id in jobs]
+        if running:
+            db.session.execute(
+                update(Job)
+                .where(Job.id.in_(running), Job.locked_by == self.id, Job.status == "running")
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+
+    def prune(self):
+        """Drop succeeded jobs older than ``JOBS_RETENTION_HOURS``; failed ones stay for inspection."""
+        db.session.execute(delete(Job).where(
+            Job.status == "succeeded", Job.finished_at < datetime.utcnow() - self.retention))
+        db.session.commit()
+
+
+def queue_depths():
+    return {(queue, status): count for queue, status, count in db.session.execute(
+        select(Job.queue, Job.status, func.count()).where(Job.status.in_(ACTIVE)).group_by(Job.queue, Job.status)
+    )}
+
+
+def init_jobs(app):
+    """Load the task registry; with ``JOBS_EMBEDDED_WORKER`` also run a worker thread in this process."""
+    from app import tasks  # noqa: F401 - registers the tasks
+
+    registry = app.extensions.get("metrics")
+    if registry is not None:
+        def depths():
+            with app.app_context():
+                return queue_depths()
+
+        registry.gauge_callback("jobs", "Queued and running background jobs.", depths, ("queue", "status"))
+
+    if not app.config["JOBS_EMBEDDED_WORKER"]:
+        return None
+    worker = app.extensions["jobs"] = Worker(app)
+    thread = threading.Thread(target=worker.run, name="jobs-worker", daemon=True)
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_worker():
+        # Started on the first request, so forked server workers each get their own.
+        if not thread.is_alive() and not worker.stopping.is_set():
+            with lock:
+                if thread.ident is None:
+                    thread.start()
+
+    return worker
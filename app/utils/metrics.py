@@ -0,0 +1,444 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where the multi-process servers do not run either
+    fcntl = None
+
+from flask import current_app, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+START_KEY = "app.metrics_started"
+
+
+class _ShardOwner:
+    # Lives only in one thread's locals, so it is collected when that thread exits.
+    __slots__ = ("__weakref__",)
+
+
+class Metric:
+    """
+    Base for metrics whose writes never take a lock: every thread adds into its own
+    shard and a scrape sums the shards. When a thread exits its shard is folded into
+    ``_retired``, so short-lived threads (parallel ``/batch``, job pools) do not grow
+    the shard list.
+    """
+
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._retire, shard)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards = [other for other in self._shards if other is not shard]
+            for labels, value in shard.items():
+                self._retired[labels] = self._add(self._retired.get(labels), value)
+
+    @staticmethod
+    def _add(total, value):
+        """``total + value`` as a new object; ``total`` is ``None`` for a new label set."""
+        raise NotImplementedError
+
+    def collect(self):
+        totals = {}
+        for copy in self._copies():
+            for labels, value in copy.items():
+                totals[labels] = self._add(totals.get(labels), value)
+        return totals
+
+    def _copies(self):
+        with self._lock:
+            shards = list(self._shards)
+            copies = [dict(self._retired)]
+        for shard in shards:
+            while True:
+                try:
+                    copies.append(dict(shard))
+                    break
+                except RuntimeError:  # resized by its owning thread mid-copy
+                    continue
+        return copies
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    @staticmethod
+    def _add(total, value):
+        return value if total is None else total + value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket plus +Inf, then the running sum.
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @staticmethod
+    def _add(total, counts):
+        counts = list(counts)
+        return counts if total is None else [a + b for a, b in zip(total, counts)]
+
+
+class CallbackMetric:
+    """A gauge or counter read from ``callback() -> {labels: value}`` at scrape time."""
+
+    def __init__(self, name, help, callback, labelnames=(), kind="gauge"):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def collect(self):
+        return self.callback()
+
+
+class Registry:
+    """
+    Metrics of this process. With ``multiproc_dir`` set, every process also writes
+    its snapshot there and a scrape merges all of them: counters and histograms from
+    every process that ever ran, gauges only from processes still alive.
+
+    The snapshots of processes that have exited are folded into one aggregate file
+    and deleted, so recycled workers do not make scrapes slower and a new process
+    reusing a PID does not overwrite a dead one's totals.
+    """
+
+    def __init__(self, multiproc_dir=None, flush_seconds=5):
+        self.metrics = {}
+        self.multiproc_dir = multiproc_dir
+        self.flush_seconds = flush_seconds
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge_callback(self, name, help, callback, labelnames=(), kind="gauge"):
+        return self.register(CallbackMetric(name, help, callback, labelnames, kind))
+
+    def snapshot(self):
+        return {
+            name: {"kind": metric.kind, "help": metric.help, "labelnames": metric.labelnames,
+                   "buckets": getattr(metric, "buckets", None), "values": metric.collect()}
+            for name, metric in self.metrics.items()
+        }
+
+    def snapshot_path(self, pid):
+        return os.path.join(self.multiproc_dir, f"metrics-{pid}.json")
+
+    def flush(self):
+        data = {
+            name: {**entry, "values": [[list(labels), value] for labels, value in entry["values"].items()]}
+            for name, entry in self.snapshot().items()
+        }
+        write_json(self.snapshot_path(os.getpid()), data)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the directory lock that serializes folding (and the reads that must not overlap it)."""
+        with open(os.path.join(self.multiproc_dir, "aggregate.lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _fold_dead(self, own=False):
+        """
+        Move the counters and histograms of exited processes (and with ``own``, a file
+        left under this process's PID by an earlier one) into ``aggregate.json``.
+
+        Each snapshot is first renamed to a unique ``folding-*`` name, and the names
+        folded are recorded in the aggregate before the files are deleted, so a crash
+        at any point neither loses nor double-counts a snapshot. Call under the lock.
+        """
+        if fcntl is None:
+            return
+        mine = os.path.basename(self.snapshot_path(os.getpid()))
+        for name in os.listdir(self.multiproc_dir):
+            pid = snapshot_pid(name)
+            if pid is not None and (not pid_alive(pid) or (own and name == mine)):
+                folding = f"folding-{pid}-{uuid.uuid4().hex}.json"
+                os.replace(os.path.join(self.multiproc_dir, name), os.path.join(self.multiproc_dir, folding))
+        pending = sorted(name for name in os.listdir(self.multiproc_dir)
+                         if name.startswith("folding-") and name.endswith(".json"))
+        if not pending:
+            return
+        path = os.path.join(self.multiproc_dir, "aggregate.json")
+        aggregate = read_json(path) or {"folded": [], "metrics": {}}
+        done = set(aggregate["folded"])
+        for name in pending:
+            if name not in done:
+                merge_snapshot(aggregate["metrics"], read_json(os.path.join(self.multiproc_dir, name)) or {},
+                               gauges=False)
+        aggregate["folded"] = pending
+        write_json(path, aggregate)
+        for name in pending:
+            os.unlink(os.path.join(self.multiproc_dir, name))
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def start_flusher(self):
+        if not self.multiproc_dir:
+            return
+
+        def start():
+            with self._locked():
+                self._fold_dead(own=True)
+            threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True).start()
+
+        start()
+        # Workers forked from a preloaded app need their own flusher and file.
+        os.register_at_fork(after_in_child=start)
+        atexit.register(self.flush)
+
+    def merged(self):
+        """This process's live snapshot plus the snapshots other processes flushed."""
+        merged = self.snapshot()
+        if not self.multiproc_dir:
+            return merged
+        own = os.getpid()
+        with self._locked():
+            self._fold_dead()
+            aggregate = read_json(os.path.join(self.multiproc_dir, "aggregate.json"))
+            if aggregate:
+                merge_values(merged, aggregate["metrics"], gauges=False)
+            for name in os.listdir(self.multiproc_dir):
+                pid = snapshot_pid(name)
+                if pid is None or pid == own:
+                    continue
+                data = read_json(os.path.join(self.multiproc_dir, name))
+                if data:
+                    merge_values(merged, data, gauges=pid_alive(pid))
+        return merged
+
+    def exposition(self):
+        lines = []
+        for name, entry in self.merged().items():
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['kind']}")
+            labelnames = entry["labelnames"]
+            for labels, value in sorted(entry["values"].items()):
+                pairs = list(zip(labelnames, labels))
+                if entry["kind"] != "histogram":
+                    lines.append(f"{name}{format_labels(pairs)} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*entry["buckets"], "+Inf"), value[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else format_value(bound)
+                    lines.append(f"{name}_bucket{format_labels([*pairs, ('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(pairs)} {format_value(value[-1])}")
+                lines.append(f"{name}_count{format_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def snapshot_pid(name):
+    """The PID of a ``metrics-<pid>.json`` snapshot file name, else ``None``."""
+    if name.startswith("metrics-") and name.endswith(".json"):
+        pid = name[len("metrics-"):-len(".json")]
+        if pid.isdigit():
+            return int(pid)
+    return None
+
+
+def read_json(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    with open(f"{path}.tmp", "w") as handle:
+        json.dump(data, handle)
+    os.replace(f"{path}.tmp", path)
+
+
+def add_value(values, labels, value):
+    current = values.get(labels)
+    if isinstance(value, list):
+        values[labels] = [a + b for a, b in zip(current, value)] if current else list(value)
+    else:
+        values[labels] = (current or 0) + value
+
+
+def merge_values(merged, data, gauges):
+    """Add a flushed snapshot's values into ``merged`` (metrics this process does not know are skipped)."""
+    for metric_name, entry in data.items():
+        target = merged.get(metric_name)
+        if target is None or (entry["kind"] == "gauge" and not gauges):
+            continue
+        for labels, value in entry["values"]:
+            add_value(target["values"], tuple(labels), value)
+
+
+def merge_snapshot(aggregate, data, gauges):
+    """Add a flushed snapshot into another one in the flushed format, keeping unknown metrics."""
+    for metric_name, entry in data.items():
+        if entry["kind"] == "gauge" and not gauges:
+            continue
+        target = aggregate.setdefault(metric_name, {**entry, "values": []})
+        values = {tuple(labels): value for labels, value in target["values"]}
+        for labels, value in entry["values"]:
+            add_value(values, tuple(labels), value)
+        target["values"] = [[list(labels), value] for labels, value in values.items()]
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def inc(name, *labels, amount=1):
+    """Increment counter ``name`` of the current app, if metrics are enabled."""
+    registry = current_app.extensions.get("metrics")
+    if registry is not None:
+        registry.metrics[name].inc(*labels, amount=amount)
+
+
+def pool_usage():
+    values = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        bind = bind or "default"
+        for state in ("checkedout", "checkedin", "overflow", "size"):
+            reader = getattr(pool, state, None)
+            if reader is not None:
+                values[(bind, state)] = reader()
+    return values
+
+
+def init_metrics(app):
+    """Request, SQL, pool, cache and business metrics served at ``/metrics``."""
+    if not app.config["METRICS_ENABLED"]:
+        return None
+    registry = app.extensions["metrics"] = Registry(app.config["METRICS_MULTIPROC_DIR"],
+                                                    app.config["METRICS_FLUSH_SECONDS"])
+    requests_total = registry.counter("http_requests_total", "HTTP requests handled.",
+                                      ("endpoint", "method", "status"))
+    latency = registry.histogram("http_request_duration_seconds", "Time spent handling a request.",
+                                 ("endpoint", "method"))
+    queries = registry.histogram("db_query_duration_seconds", "Time spent executing SQL statements.",
+                                 ("bind",), buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+    registry.counter("auth_login_failures_total", "Rejected login attempts.")
+    registry.counter("orders_created_total", "Orders created, per branch.", ("branch_id",))
+    registry.counter("jobs_processed_total", "Background job attempts by outcome.", ("queue", "task", "outcome"))
+    registry.counter("payment_events_total", "Payment events recorded, by kind.", ("kind",))
+    registry.counter("invoice_payment_status_corrected_total",
+                     "Invoices whose payment status was brought back in line with their order.",
+                     ("source", "payment_status"))
+
+    def pool():
+        with app.app_context():
+            return pool_usage()
+
+    registry.gauge_callback("db_pool_connections", "Connection pool usage per bind.", pool, ("bind", "state"))
+
+    def precompressed():
+        cache = app.extensions.get("precompressed")
+        return {("hit",): cache.hits, ("miss",): cache.misses} if cache is not None else {}
+
+    registry.gauge_callback("precompressed_cache_requests_total", "Lookups in the compressed body cache.",
+                            precompressed, ("result",), kind="counter")
+
+    @app.before_request
+    def start_timer():
+        request.environ[START_KEY] = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = request.environ.pop(START_KEY, None)
+        if started is not None:
+            endpoint = request.endpoint or "<unmatched>"
+            latency.observe(time.perf_counter() - started, endpoint, request.method)
+            requests_total.inc(endpoint, request.method, str(response.status_code))
+        return response
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            def after_cursor_execute(conn, cursor, statement, parameters, context, executemany, bind=bind or "default"):
+                started = getattr(context, "_metrics_started", None)
+                if started is not None:
+                    queries.observe(time.perf_counter() - started, bind)
+
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    registry.start_flusher()
+    return registry
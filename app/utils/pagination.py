@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(issued, row_id):
+    """Opaque cursor for the position just after ``(issued, row_id)`` in a newest-first keyset."""
+    raw = json.dumps([issued.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        issued, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(issued), int(row_id)
+    except (ValueError, TypeError) as error:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from error
@@ -0,0 +1,313 @@
+"""
+The payments ledger: append-only events per order plus two materializations.
+
+- ``order_balances`` is updated in the same transaction as each event, one row
+  per order, so it only ever contends with payments on that same order. The
+  order's ``payment_status`` (and its invoice's) follows from it.
+- ``payment_totals`` (per branch, day and method) is what every checkout of a
+  branch would fight over, so it is not touched at checkout. Each event is
+  listed in ``pending_payment_events`` instead (a row of its own, so no
+  contention); the "payments.rollup" job folds pending events in and deletes
+  their rows in the same transaction, and readers add the events still pending
+  themselves, so totals are exact either way, whatever order events commit in.
+"""
+import time as time_module
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import case, delete, func, insert, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.order import Order
+from app.models.order_balance import OrderBalance
+from app.models.payment_event import PaymentEvent
+from app.models.payment_total import PaymentTotal
+from app.models.pending_payment_event import PendingPaymentEvent
+from app.utils.invoicing import sync_invoice_payment_status
+from app.utils.jobs import enqueue
+from app.utils.metrics import inc
+
+KINDS = ("payment", "refund", "tip")
+OUTSTANDING = ("unpaid", "partially_paid")
+STATUSES = ("unpaid", "partially_paid", "paid", "refunded")
+MANUAL_METHOD = "manual"
+
+
+class PaymentRejected(ValueError):
+    pass
+
+
+def payment_status(total_amount, paid_amount, refunded_amount):
+    if paid_amount > 0 and round(paid_amount - total_amount, 2) >= 0:
+        return "paid"
+    if paid_amount > 0:
+        return "partially_paid"
+    return "refunded" if refunded_amount > 0 else "unpaid"
+
+
+def _apply(order_id, kind, amount, now):
+    """Add one event to the order's balance row and return its new amounts."""
+    balance = OrderBalance.__table__
+    deltas = {
+        "paid_amount": amount if kind == "payment" else -amount if kind == "refund" else 0.0,
+        "refunded_amount": amount if kind == "refund" else 0.0,
+        "tip_amount": amount if kind == "tip" else 0.0,
+    }
+    returning = (balance.c.paid_amount, balance.c.refunded_amount, balance.c.tip_amount)
+    row = db.session.execute(
+        update(balance).where(balance.c.order_id == order_id)
+        .values(event_count=balance.c.event_count + 1, updated_at=now,
+                **{column: balance.c[column] + delta for column, delta in deltas.items()})
+        .returning(*returning)
+    ).first()
+    if row is None:
+        # The order row lock taken by record_payment() keeps a second first event out.
+        row = db.session.execute(
+            insert(balance).values(order_id=order_id, event_count=1, updated_at=now, **deltas).returning(*returning)
+        ).first()
+    return row
+
+
+def _amounts(paid, refunded, tips):
+    return {"paid_amount": round(float(paid), 2), "refunded_amount": round(float(refunded), 2),
+            "tip_amount": round(float(tips), 2)}
+
+
+def balance_of(order_id):
+    row = db.session.execute(
+        select(OrderBalance.paid_amount, OrderBalance.refunded_amount, OrderBalance.tip_amount)
+        .where(OrderBalance.order_id == order_id)
+    ).first()
+    return _amounts(*(row or (0.0, 0.0, 0.0)))
+
+
+def locked_order(order_id):
+    """The order, locked until the transaction ends so payments on it take turns (SQLite writers already do)."""
+    return db.session.get(Order, order_id, with_for_update=True)
+
+
+def record_payment(order, kind, method, amount, reference=None, idempotency_key=None):
+    """
+    Append an event to ``order`` (loaded with :func:`locked_order`) in the caller's
+    transaction (commit to keep it) and bring the order's balance, payment status
+    and invoice up to date.
+
+    Returns ``(event, balance, created)``, ``balance`` being the order's amounts
+    after the event; with an ``idempotency_key`` seen before, the original event
+    comes back with ``created`` false and nothing is written. When a concurrent
+    retry with the same key commits first, the caller's transaction is rolled back
+    (it has written nothing else by then) and that retry's event comes back. Raises
+    ``PaymentRejected`` for a refund larger than what was paid; the caller must
+    roll back then.
+    """
+    order_id = order.id
+    if idempotency_key is not None:
+        replay = _replay(order_id, idempotency_key)
+        if replay is not None:
+            return replay
+
+    now = datetime.utcnow()
+    event = PaymentEvent(order_id=order_id, kind=kind, method=method, amount=amount, reference=reference,
+                         idempotency_key=idempotency_key, created_at=now)
+    db.session.add(event)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        if idempotency_key is None:
+            raise
+        # The order lock is a no-op on SQLite, where writers only take turns at the
+        # INSERT, so two retries can both pass the check above; the unique key decides.
+        db.session.rollback()
+        replay = _replay(order_id, idempotency_key)
+        if replay is None:
+            raise
+        return replay
+    db.session.execute(insert(PendingPaymentEvent).values(event_id=event.id))
+
+    paid, refunded, tips = _apply(order.id, kind, amount, now)
+    if round(paid, 2) < 0:
+        raise PaymentRejected("Refund exceeds the amount paid")
+    status = payment_status(order.total_amount, paid, refunded)
+    order.payment_status = status
+    if kind == "payment":
+        order.payment_method = method
+    sync_invoice_payment_status(order.id, status)
+    schedule_rollup()
+    inc("payment_events_total", kind)
+    return event, _amounts(paid, refunded, tips), True
+
+
+def settle(order, status, method=None):
+    """
+    Bring ``order`` (loaded with :func:`locked_order`) to payment ``status`` for a
+    manual override by recording the event that gets the ledger there, in the
+    caller's transaction: the balance due as a payment for "paid", what was paid as
+    a refund for "refunded". Returns the event, or ``None`` when the ledger is
+    already at ``status``. Raises ``PaymentRejected`` when no single event reaches
+    it (e.g. "partially_paid", or "unpaid" after money came in); the caller must
+    roll back then.
+    """
+    balance = balance_of(order.id)
+    method = method or order.payment_method or MANUAL_METHOD
+    due = round(order.total_amount - balance["paid_amount"], 2)
+    event = None
+    if status == "paid" and due > 0:
+        event, balance, _ = record_payment(order, "payment", method, due)
+    elif status == "refunded" and balance["paid_amount"] > 0:
+        event, balance, _ = record_payment(order, "refund", method, balance["paid_amount"])
+    reached = payment_status(order.total_amount, balance["paid_amount"], balance["refunded_amount"])
+    if reached != status:
+        raise PaymentRejected(f"The ledger cannot be brought to '{status}'; record payments or refunds instead")
+    if event is None:
+        # A status set before the ledger existed may disagree with it; the ledger wins.
+        order.payment_status = reached
+        sync_invoice_payment_status(order.id, reached)
+    return event
+
+
+def _replay(order_id, idempotency_key):
+    """``(event, balance, False)`` for an event already recorded under ``idempotency_key``, else ``None``."""
+    existing = db.session.scalar(select(PaymentEvent).where(PaymentEvent.idempotency_key == idempotency_key))
+    if existing is None:
+        return None
+    if existing.order_id != order_id:
+        raise PaymentRejected("Idempotency key already used for another order")
+    return existing, balance_of(order_id), False
+
+
+def schedule_rollup():
+    """
+    Make sure a rollup is queued. Events coalesce: while one is queued, later ones
+    ride along with it, and a process that queued it skips even the lookup until
+    it is due.
+    """
+    now = time_module.monotonic()
+    state = current_app.extensions.setdefault("payments_rollup", {"due": 0.0})
+    if now < state["due"]:
+        return
+    delay = current_app.config["PAYMENTS_ROLLUP_DELAY_SECONDS"]
+    enqueue("payments.rollup", key="payments-rollup", delay=delay)
+    state["due"] = now + delay
+
+
+def rollup_payment_totals(batch_size=5000):
+    """
+    Fold pending payment events into ``payment_totals``, ``batch_size`` events per
+    transaction, and return how many were folded.
+
+    Each batch deletes its pending rows first and folds exactly the events it
+    deleted, so a concurrent rollup cannot take the same events, and an event whose
+    transaction commits late is still pending whenever it becomes visible.
+
+    Events recorded while a rollup runs join the job it would have queued, so they
+    can wait for the next checkout to queue another; reads count them either way.
+    """
+    folded = 0
+    while True:
+        batch = select(PendingPaymentEvent.event_id).order_by(PendingPaymentEvent.event_id).limit(batch_size)
+        ids = db.session.execute(
+            delete(PendingPaymentEvent).where(PendingPaymentEvent.event_id.in_(batch))
+            .returning(PendingPaymentEvent.event_id)
+        ).scalars().all()
+        if not ids:
+            db.session.commit()
+            return folded
+        sums = defaultdict(lambda: {"payments": 0.0, "refunds": 0.0, "tips": 0.0, "event_count": 0})
+        rows = db.session.execute(
+            select(Order.branch_id, PaymentEvent.created_at, PaymentEvent.method, PaymentEvent.kind,
+                   PaymentEvent.amount)
+            .join(Order, Order.id == PaymentEvent.order_id)
+            .where(PaymentEvent.id.in_(ids))
+        )
+        for branch_id, created_at, method, kind, amount in rows:
+            totals = sums[branch_id, created_at.date(), method]
+            totals[f"{kind}s"] += amount
+            totals["event_count"] += 1
+        for (branch_id, day, method), totals in sums.items():
+            _add_totals(branch_id, day, method, totals)
+        db.session.commit()
+        folded += len(ids)
+
+
+def _add_totals(branch_id, day, method, totals):
+    table = PaymentTotal.__table__
+    key = (table.c.branch_id == branch_id, table.c.day == day, table.c.method == method)
+    updated = db.session.execute(
+        update(table).where(*key).values(**{column: table.c[column] + value for column, value in totals.items()})
+    ).rowcount
+    if not updated:
+        # Only the rollup writes this table. Should two rollups insert the same key, one
+        # batch fails and rolls back, its events staying pending for the next run.
+        db.session.execute(insert(table).values(branch_id=branch_id, day=day, method=method, **totals))
+
+
+def revenue_by_method(branch_id=None, date_from=None, date_to=None):
+    """
+    Payments, refunds, tips and net revenue per method: the rolled-up days plus
+    the pending events, without reading the rest of the ledger. Both are read in
+    one statement, so a rollup committing meanwhile is counted on one side only.
+    """
+    rolled = select(PaymentTotal.method, func.sum(PaymentTotal.payments), func.sum(PaymentTotal.refunds),
+                    func.sum(PaymentTotal.tips), func.sum(PaymentTotal.event_count)).group_by(PaymentTotal.method)
+    if branch_id is not None:
+        rolled = rolled.where(PaymentTotal.branch_id == branch_id)
+    if date_from is not None:
+        rolled = rolled.where(PaymentTotal.day >= date_from)
+    if date_to is not None:
+        rolled = rolled.where(PaymentTotal.day <= date_to)
+
+    def kind_sum(kind):
+        return func.sum(case((PaymentEvent.kind == kind, PaymentEvent.amount), else_=0))
+
+    recent = (
+        select(PaymentEvent.method, kind_sum("payment"), kind_sum("refund"), kind_sum("tip"), func.count())
+        .select_from(PendingPaymentEvent)
+        .join(PaymentEvent, PaymentEvent.id == PendingPaymentEvent.event_id)
+        .group_by(PaymentEvent.method)
+    )
+    if branch_id is not None:
+        recent = recent.join(Order, Order.id == PaymentEvent.order_id).where(Order.branch_id == branch_id)
+    if date_from is not None:
+        recent = recent.where(PaymentEvent.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        recent = recent.where(PaymentEvent.created_at < datetime.combine(date_to, time.min) + timedelta(days=1))
+
+    methods = defaultdict(lambda: [0.0, 0.0, 0.0, 0])
+    for method, payments, refunds, tips, count in db.session.execute(union_all(rolled, recent)):
+        totals = methods[method]
+        totals[0] += payments or 0
+        totals[1] += refunds or 0
+        totals[2] += tips or 0
+        totals[3] += count or 0
+    return [
+        {"method": method, "payments": round(payments, 2), "refunds": round(refunds, 2), "tips": round(tips, 2),
+         "revenue": round(payments - refunds, 2), "events": count}
+        for method, (payments, refunds, tips, count) in sorted(methods.items())
+    ]
+
+
+def outstanding_orders(branch_id=None, limit=100):
+    """
+    Unpaid and partially paid orders, oldest first, with what is still due; read
+    through ix_orders_payment_status_created_at and the balance rows, not the ledger.
+    """
+    paid = func.coalesce(OrderBalance.paid_amount, 0)
+    statement = (
+        select(Order.id, Order.branch_id, Order.status, Order.payment_status, Order.total_amount,
+               paid.label("paid_amount"), (Order.total_amount - paid).label("balance_due"), Order.created_at)
+        .outerjoin(OrderBalance, OrderBalance.order_id == Order.id)
+        .where(Order.payment_status.in_(OUTSTANDING), Order.status != "cancelled")
+        .order_by(Order.created_at, Order.id)
+        .limit(limit)
+    )
+    if branch_id is not None:
+        statement = statement.where(Order.branch_id == branch_id)
+    return [
+        {**row._asdict(), "paid_amount": round(row.paid_amount, 2), "balance_due": round(row.balance_due, 2),
+         "created_at": row.created_at.isoformat() if row.created_at else None}
+        for row in db.session.execute(statement)
+    ]
+
+
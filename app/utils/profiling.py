@@ -0,0 +1,165 @@
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import request
+from sqlalchemy import event
+
+from app.extensions import db
+
+# Statistics of the request running in this thread (or batch sub-request).
+_current = ContextVar("request_stats", default=None)
+
+STATS_KEY = "app.request_stats"
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db_seconds", "status", "profiler", "token")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.status = 500
+        self.profiler = None
+        self.token = None
+
+
+def current_request_stats():
+    return _current.get()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._profiling_started = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_profiling_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class RequestProfiler:
+    """
+    Per-endpoint timings plus capture of slow requests.
+
+    A request slower than ``PROFILE_SLOW_MS`` is written to ``slow_requests.log`` and
+    arms its endpoint: the next request to that endpoint runs under cProfile and, if
+    it is slow again, its stats are dumped next to the log. Only ``PROFILE_MAX_FILES``
+    dumps are kept.
+    """
+
+    def __init__(self, app):
+        self.slow_seconds = app.config["PROFILE_SLOW_MS"] / 1000
+        self.max_files = app.config["PROFILE_MAX_FILES"]
+        self.directory = app.config["PROFILE_DIR"] or os.path.join(app.instance_path, "profiles")
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.timings = {}
+        self._armed = set()
+        self._lock = threading.Lock()
+        # cProfile hooks into sys.monitoring, which allows a single active profiler.
+        self._profiling = threading.Lock()
+
+        self.log = logging.Logger("slow_requests")
+        self.log.addHandler(RotatingFileHandler(
+            os.path.join(self.directory, "slow_requests.log"), maxBytes=1 << 20, backupCount=5, delay=True,
+        ))
+
+    def start(self):
+        stats = RequestStats()
+        stats.token = _current.set(stats)
+        request.environ[STATS_KEY] = stats
+        if request.endpoint in self._armed and self._profiling.acquire(blocking=False):
+            stats.profiler = cProfile.Profile()
+            stats.profiler.enable()
+
+    def record_status(self, response):
+        stats = request.environ.get(STATS_KEY)
+        if stats is not None:
+            stats.status = response.status_code
+        return response
+
+    def finish(self, exc=None):
+        stats = request.environ.pop(STATS_KEY, None)
+        if stats is None:
+            return
+        elapsed = time.perf_counter() - stats.started
+        _current.reset(stats.token)
+        if stats.profiler is not None:
+            stats.profiler.disable()
+            self._profiling.release()
+
+        endpoint = request.endpoint or "<unmatched>"
+        with self._lock:
+            timing = self.timings.get(endpoint)
+            if timing is None:
+                timing = self.timings[endpoint] = {
+                    "blueprint": request.blueprint, "count": 0, "seconds": 0.0, "max_seconds": 0.0,
+                    "queries": 0, "db_seconds": 0.0,
+                }
+            timing["count"] += 1
+            timing["seconds"] += elapsed
+            timing["max_seconds"] = max(timing["max_seconds"], elapsed)
+            timing["queries"] += stats.queries
+            timing["db_seconds"] += stats.db_seconds
+
+        if elapsed < self.slow_seconds:
+            self._armed.discard(endpoint)
+            return
+        self._armed.add(endpoint)
+        self.capture(endpoint, elapsed, stats)
+
+    def capture(self, endpoint, elapsed, stats):
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        profile = None
+        if stats.profiler is not None:
+            profile = f"{stamp}-{endpoint.replace('.', '-')}.prof"
+            stats.profiler.dump_stats(os.path.join(self.directory, profile))
+            self.rotate()
+        self.log.warning(json.dumps({
+            "at": stamp, "method": request.method, "path": request.full_path.rstrip("?"),
+            "endpoint": endpoint, "status": stats.status, "ms": round(elapsed * 1000, 3),
+            "queries": stats.queries, "db_ms": round(stats.db_seconds * 1000, 3), "profile": profile,
+        }))
+
+    def rotate(self):
+        profiles = sorted(name for name in os.listdir(self.directory) if name.endswith(".prof"))
+        for name in profiles[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(timing) for endpoint, timing in self.timings.items()}
+
+
+def init_profiling(app):
+    """Time every request and count its SQL when ``PROFILING_ENABLED`` is set."""
+    if not app.config["PROFILING_ENABLED"]:
+        return None
+    profiler = app.extensions["profiler"] = RequestProfiler(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+    app.before_request(profiler.start)
+    app.after_request(profiler.record_status)
+    app.teardown_request(profiler.finish)
+    return profiler
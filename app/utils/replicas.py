@@ -0,0 +1,73 @@
+import random
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+REPLICA_PREFIX = "replica_"
+PRIMARY_COOKIE = "read_primary"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads of read-only requests to a replica engine.
+
+    Writes go to the primary, and once a session has flushed or executed DML every
+    later statement in it stays on the primary so the request reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get("primary"):
+            if self._flushing or isinstance(clause, sa.UpdateBase):
+                self.info["primary"] = True
+            elif has_request_context() and use_replica():
+                if "replica" not in self.info:
+                    self.info["replica"] = pick_replica(self._db.engines)
+                replica = self.info["replica"]
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_replica():
+    return (
+        request.method in READ_METHODS
+        and not g.get("db_primary")
+        and PRIMARY_COOKIE not in request.cookies
+    )
+
+
+def pick_replica(engines):
+    replicas = [engine for key, engine in engines.items() if key and key.startswith(REPLICA_PREFIX)]
+    return random.choice(replicas) if replicas else None
+
+
+def use_primary(fn):
+    """Opt a read-only route out of replica routing, e.g. when it must not see lag."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.db_primary = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def configure_replicas(app):
+    """Register ``SQLALCHEMY_REPLICA_URIS`` as ``replica_N`` binds; call before ``db.init_app``."""
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    if not uris:
+        return
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    binds.update((f"{REPLICA_PREFIX}{index}", uri) for index, uri in enumerate(uris))
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+    if sticky_seconds:
+        @app.after_request
+        def stick_to_primary_after_write(response):
+            # Keep the client on the primary until the replicas have caught up.
+            wrote = app.extensions["sqlalchemy"].session.info.get("primary")
+            if request.method not in READ_METHODS and response.status_code < 400 and wrote:
+                response.set_cookie(PRIMARY_COOKIE, "1", max_age=sticky_seconds, httponly=True)
+            return response
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+EXPLAINABLE = ("select", "with")
+IN_LIST = re.compile(r"IN \((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)", re.IGNORECASE)
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW|SUBQUERY)(\w+)\b(?! USING (?:COVERING )?INDEX)")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+CLAUSE_END = re.compile(r"\b(?:GROUP BY|ORDER BY|LIMIT|OFFSET|HAVING|UNION)\b", re.IGNORECASE)
+
+
+def normalize(statement):
+    """One line per statement shape; expanded ``IN`` lists collapse to ``IN (?)``."""
+    return IN_LIST.sub("IN (?)", " ".join(statement.split()))
+
+
+def explain(cursor, dialect, statement, parameters):
+    """The query plan of ``statement`` as a list of lines, or ``None`` if it cannot be explained."""
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    try:
+        raw = cursor.connection.cursor()
+        try:
+            raw.execute(prefix + statement, parameters)
+            rows = raw.fetchall()
+        finally:
+            raw.close()
+    except Exception:
+        return None
+    return [str(row[-1]) for row in rows]
+
+
+def full_scans(plan):
+    """Tables the plan reads without an index."""
+    tables = []
+    for line in plan or ():
+        match = SQLITE_SCAN.match(line.strip()) or POSTGRES_SCAN.search(line)
+        if match and match.group(1) not in tables:
+            tables.append(match.group(1))
+    return tables
+
+
+class SlowQueryLog:
+    """
+    Writes every statement slower than ``SLOW_QUERY_MS`` to a rotating JSON-lines
+    log together with its parameters, duration and query plan.
+    """
+
+    def __init__(self, app):
+        self.threshold = app.config["SLOW_QUERY_MS"] / 1000
+        path = app.config["SLOW_QUERY_LOG"] or os.path.join(app.instance_path, "slow_queries.log")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.log = logging.Logger("slow_queries")
+        self.log.addHandler(RotatingFileHandler(path, maxBytes=4 << 20, backupCount=5, delay=True))
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold:
+            return
+        plan = None
+        if not executemany and statement.lstrip()[:6].lower().startswith(EXPLAINABLE):
+            plan = explain(cursor, conn.dialect.name, statement, parameters)
+        self.log.warning(json.dumps({
+            "at": datetime.utcnow().isoformat(timespec="milliseconds"),
+            "ms": round(elapsed * 1000, 3),
+            "statement": normalize(statement),
+            "parameters": repr(parameters)[:500],
+            "plan": plan,
+            "full_scans": full_scans(plan),
+        }))
+
+    def instrument(self, engine):
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+
+def init_slow_query_log(app):
+    if not app.config["SLOW_QUERY_ENABLED"]:
+        return None
+    slow_log = app.extensions["slow_queries"] = SlowQueryLog(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            slow_log.instrument(engine)
+    return slow_log
+
+
+def filtered_columns(statement, table):
+    """
+    Columns of ``table`` used by the statement's WHERE clause (equality first, then
+    ranges) followed by its ORDER BY columns: the column order of a composite index.
+    """
+    where = re.split(r"\bWHERE\b", statement, maxsplit=1, flags=re.IGNORECASE)
+    equality, ranges, ordering = [], [], []
+    if len(where) == 2:
+        clause = CLAUSE_END.split(where[1], maxsplit=1)[0]
+        for column, operator in re.findall(
+            rf"\b{table}\.(\w+)\)?\s*(=|IN\b|IS\b|<=|>=|<|>|BETWEEN\b|LIKE\b)", clause, re.IGNORECASE
+        ):
+            (equality if operator.upper() in ("=", "IN", "IS") else ranges).append(column)
+    order = re.search(r"\bORDER BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|$)", statement, re.IGNORECASE)
+    if order:
+        ordering = re.findall(rf"\b{table}\.(\w+)", order.group(1))
+    columns = []
+    for column in (*equality, *ranges, *ordering):
+        if column not in columns:
+            columns.append(column)
+    return columns[:3]
+
+
+def read_entries(path):
+    entries = []
+    for name in (path, *(f"{path}.{n}" for n in range(1, 6))):
+        if not os.path.exists(name):
+            continue
+        with open(name) as handle:
+            for line in handle:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def build_report(entries):
+    """
+    ``(statements, suggestions)``: statement shapes and index suggestions, both
+    ranked by the cumulative time of the slow statements behind them.
+    """
+    statements = defaultdict(lambda: {"count": 0, "ms": 0.0, "max_ms": 0.0, "full_scans": set()})
+    for entry in entries:
+        stats = statements[entry["statement"]]
+        stats["count"] += 1
+        stats["ms"] += entry["ms"]
+        stats["max_ms"] = max(stats["max_ms"], entry["ms"])
+        stats["full_scans"].update(entry.get("full_scans") or ())
+
+    suggestions = defaultdict(lambda: {"ms": 0.0, "count": 0, "statements": 0})
+    for statement, stats in statements.items():
+        for table in stats["full_scans"]:
+            columns = filtered_columns(statement, table)
+            if columns:
+                suggestion = suggestions[(table, tuple(columns))]
+                suggestion["ms"] += stats["ms"]
+                suggestion["count"] += stats["count"]
+                suggestion["statements"] += 1
+
+    ranked_statements = sorted(statements.items(), key=lambda item: item[1]["ms"], reverse=True)
+    ranked_suggestions = sorted(suggestions.items(), key=lambda item: item[1]["ms"], reverse=True)
+    return ranked_statements, ranked_suggestions
+
+
+def index_ddl(table, columns):
+    return f"CREATE INDEX ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});"
@@ -0,0 +1,32 @@
+from sqlalchemy import event
+
+# Pragmas for a file-backed SQLite database shared by several workers:
+# WAL lets readers run alongside the single writer. busy_timeout, which makes
+# writers wait for the lock instead of failing with "database is locked", is
+# added by the config from DB_STATEMENT_TIMEOUT_MS.
+PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # negative = KiB, i.e. 64 MB of page cache
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def register_sqlite_pragmas(engine, pragmas):
+    """Run ``pragmas`` on every new DBAPI connection of a SQLite ``engine``."""
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
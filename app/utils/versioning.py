@@ -0,0 +1,106 @@
+import zlib
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models.collection_version import CollectionVersion
+from app.utils.compression import etag_variants, precompressed_response
+
+# Collections whose GET endpoints answer conditional requests.
+VERSIONED_TABLES = frozenset(("menus", "categories", "items", "branches", "tables"))
+# INSERT ... ON CONFLICT, so two first writes to a collection cannot both insert its counter.
+UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def bump_collection_versions(session, flush_context):
+    """Bump the version of every versioned collection touched by this flush."""
+    touched = {
+        obj.__tablename__
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__tablename__", None) in VERSIONED_TABLES
+    }
+    if not touched:
+        return
+    connection = session.connection()
+    now = datetime.utcnow()
+    upsert = UPSERTS.get(connection.dialect.name)
+    for name in sorted(touched):
+        if upsert is not None:
+            connection.execute(
+                upsert(CollectionVersion).values(name=name, version=1, updated_at=now)
+                .on_conflict_do_update(index_elements=[CollectionVersion.name],
+                                       set_={"version": CollectionVersion.version + 1, "updated_at": now})
+            )
+            continue
+        bumped = connection.execute(
+            update(CollectionVersion)
+            .where(CollectionVersion.name == name)
+            .values(version=CollectionVersion.version + 1, updated_at=now)
+        )
+        if bumped.rowcount == 0:
+            connection.execute(insert(CollectionVersion).values(name=name, version=1, updated_at=now))
+
+
+def init_versioning(session_class):
+    if not event.contains(session_class, "after_flush", bump_collection_versions):
+        event.listen(session_class, "after_flush", bump_collection_versions)
+
+
+def collection_version(name):
+    row = db.session.execute(
+        select(CollectionVersion.version, CollectionVersion.updated_at).where(CollectionVersion.name == name)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def make_etag(*parts):
+    # Path and query string (e.g. ?fields=) change the representation, so they are part of the tag.
+    return "-".join(str(part) for part in parts) + f"-{zlib.crc32(request.full_path.encode()):08x}"
+
+
+def conditional(collection, model=None, id_arg=None):
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` with 304 before running the view.
+
+    Collection endpoints are versioned by the ``collection_versions`` counter; with
+    ``model`` and ``id_arg`` a single row is versioned by its ``updated_at``.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if model is None:
+                version, last_modified = collection_version(collection)
+                etag = make_etag(collection, version)
+            else:
+                row = db.session.execute(select(model.updated_at).where(model.id == kwargs[id_arg])).first()
+                if row is None:
+                    return fn(*args, **kwargs)
+                last_modified = row.updated_at
+                stamp = last_modified.strftime("%Y%m%d%H%M%S%f") if last_modified else 0
+                etag = make_etag(collection, kwargs[id_arg], stamp)
+
+            matched = next((tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)), None)
+            if matched or (
+                not request.if_none_match and last_modified and request.if_modified_since
+                and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+            ):
+                response = current_app.response_class(status=304)
+                response.set_etag(matched or etag)
+            else:
+                response = precompressed_response(etag)
+                if response is None:
+                    response = make_response(fn(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return decorator
+    return wrapper
@@ -0,0 +1,47 @@
+"""Helpers shared by the benchmark scripts."""
+import statistics
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+
+
+def make_app(database_uri="sqlite://", **overrides):
+    """An app on its own database (in-memory by default) with all tables created."""
+    attributes = {"SQLALCHEMY_DATABASE_URI": database_uri, **overrides}
+    app = create_app(type("BenchConfig", (TestingConfig,), attributes))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def auth_headers(app, role="admin", identity="1", **claims):
+    with app.app_context():
+        token = create_access_token(identity=identity, additional_claims={"role": role, **claims})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def best_of(fn, repeat=5):
+    """Fastest wall time of ``repeat`` calls, in seconds, plus the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """``{p: value}`` for sorted ``samples`` using the nearest-rank method."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {point: float("nan") for point in points}
+    return {point: ordered[max(0, int(round(point / 100 * len(ordered))) - 1)] for point in points}
+
+
+def median(samples):
+    return statistics.median(samples) if samples else float("nan")
@@ -0,0 +1,184 @@
+"""
+Concurrent-connection capacity and memory per connection: ASGI mode against the
+threaded WSGI server.
+
+Each server runs in its own process on a seeded SQLite file. The benchmark opens N
+kitchen long polls (GET /kitchen/orders) that stay parked until an order arrives,
+reads the server's RSS and thread count from /proc, then creates one order and
+times how long it takes every parked connection to receive it.
+
+The threaded server gets a synchronous long poll with the same contract (a WSGI
+middleware that re-queries every KITCHEN_POLL_INTERVAL_MS), i.e. what the endpoint
+would cost without the async engine; it skips token decoding. A regular blueprint
+route is timed through both servers while the connections are held.
+
+    python -m benchmarks.bench_asgi [--connections 100,500,1000] [--hold 20]
+
+Linux only (reads /proc/<pid>/status); needs the ``asgi`` extra.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.order import Order
+from benchmarks._support import auth_headers
+from benchmarks.bench_load import build_app
+
+ORDER = {"user_id": 5, "branch_id": 1, "total_amount": 10.0,
+         "order_items": [{"item_id": 1, "quantity": 1, "unit_price": 10.0}]}
+
+
+def sync_kitchen(app):
+    """WSGI middleware: a thread-per-connection long poll for /kitchen/orders."""
+    interval = app.config["KITCHEN_POLL_INTERVAL_MS"] / 1000
+
+    def middleware(environ, start_response):
+        if environ["PATH_INFO"].rstrip("/") != "/kitchen/orders":
+            return app(environ, start_response)
+        query = {key: values[-1] for key, values in parse_qs(environ["QUERY_STRING"]).items()}
+        branch_id, after = int(query["branch_id"]), int(query.get("after", 0))
+        deadline = time.monotonic() + min(float(query.get("timeout", 25)), app.config["KITCHEN_LONG_POLL_SECONDS"])
+        with app.app_context():
+            while True:
+                rows = db.session.execute(select(Order.id, Order.status).where(
+                    Order.branch_id == branch_id, Order.id > after).order_by(Order.id).limit(100)).all()
+                db.session.remove()
+                if rows or time.monotonic() >= deadline:
+                    break
+                time.sleep(interval)
+        body = json.dumps({"orders": [{"id": row.id, "status": row.status} for row in rows]}).encode()
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+        return [body]
+
+    return middleware
+
+
+def serve(mode, port, database):
+    app = build_app(database, "small", None, 42)
+    if mode == "asgi":
+        import uvicorn
+
+        from app.asgi import AsyncAPI
+        uvicorn.run(AsyncAPI(app), host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    else:
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args):
+                pass
+
+        server = make_server("127.0.0.1", port, sync_kitchen(app), threaded=True, request_handler=QuietHandler)
+        server.socket.listen(4096)
+        server.serve_forever()
+
+
+def process_status(pid):
+    status = {}
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            key, _, value = line.partition(":")
+            status[key] = value.split()[0] if value.split() else ""
+    return int(status["VmRSS"]) * 1024, int(status["Threads"])
+
+
+async def request(port, method, path, headers, body=None):
+    """``(status, seconds)`` of one HTTP/1.1 request on a fresh connection."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+    payload = json.dumps(body).encode() if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close",
+             f"Content-Length: {len(payload)}", "Content-Type: application/json",
+             *(f"{key}: {value}" for key, value in headers.items())]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1]), time.perf_counter() - started
+
+
+async def wait_until_listening(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"server exited with status {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise SystemExit("server did not start")
+
+
+async def measure(mode, port, database, connections, hold, headers, after):
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_asgi", "--serve", mode,
+                                "--port", str(port), "--database", database])
+    try:
+        await wait_until_listening(port, process)
+        await request(port, "GET", "/branches/", headers)
+        idle_rss, idle_threads = process_status(process.pid)
+
+        path = f"/kitchen/orders?branch_id=1&after={after}&timeout={hold}"
+        started = time.perf_counter()
+        polls = [asyncio.create_task(request(port, "GET", path, headers)) for _ in range(connections)]
+        await asyncio.sleep(min(hold / 4, 3))
+        held_rss, held_threads = process_status(process.pid)
+        parked = sum(not poll.done() for poll in polls)
+        _, route_seconds = await request(port, "GET", "/branches/", headers)
+
+        await request(port, "POST", "/orders/", headers, ORDER)
+        created = time.perf_counter()
+        results = await asyncio.gather(*polls, return_exceptions=True)
+        delivered = time.perf_counter() - created
+        ok = sum(not isinstance(result, Exception) and result[0] == 200 for result in results)
+        return {
+            "mode": mode, "connections": connections, "parked": parked, "ok": ok,
+            "idle_mb": idle_rss / 2**20, "held_mb": held_rss / 2**20,
+            "kb_per_connection": (held_rss - idle_rss) / 1024 / max(parked, 1),
+            "threads": held_threads - idle_threads, "route_ms": route_seconds * 1000,
+            "fan_out_s": delivered, "total_s": time.perf_counter() - started,
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", default="100,500,1000", help="Comma-separated connection counts.")
+    parser.add_argument("--hold", type=float, default=20, help="Long-poll timeout in seconds.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database", help="SQLite file to use; seeded only if empty.")
+    parser.add_argument("--serve", choices=("asgi", "threaded"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), "asgi.db")
+    if args.serve:
+        return serve(args.serve, args.port, database)
+
+    app = build_app(database, "small", None, 42)
+    headers = auth_headers(app)
+    print(f"{'server':<10} {'conns':>6} {'parked':>6} {'ok':>6} {'idle MB':>8} {'held MB':>8} {'KB/conn':>8} "
+          f"{'+threads':>8} {'route ms':>9} {'fan-out s':>9}")
+    for connections in (int(value) for value in args.connections.split(",")):
+        for mode in ("threaded", "asgi"):
+            with app.app_context():
+                after = db.session.scalar(select(func.max(Order.id)))
+                db.session.remove()
+            row = asyncio.run(measure(mode, args.port, database, connections, args.hold, headers, after))
+            print(f"{row['mode']:<10} {row['connections']:>6} {row['parked']:>6} {row['ok']:>6} "
+                  f"{row['idle_mb']:>8.1f} {row['held_mb']:>8.1f} {row['kb_per_connection']:>8.1f} "
+                  f"{row['threads']:>8} {row['route_ms']:>9.1f} {row['fan_out_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
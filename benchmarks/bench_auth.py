@@ -0,0 +1,76 @@
+"""
+Per-request authorization overhead.
+
+Compares the old stacking (``@jwt_required()`` followed by a decorator that calls
+``verify_jwt_in_request()`` again) with the claims-cached ``role_required`` layer.
+
+    python -m benchmarks.bench_auth [iterations]
+"""
+import sys
+import timeit
+from functools import wraps
+
+from flask import Flask, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required, verify_jwt_in_request
+
+from app.extensions import jwt
+from app.utils.decorators import admin_required, role_required
+
+
+def legacy_admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        if get_jwt().get("role") != "admin":
+            return jsonify({"error": "Access Forbidden"}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "bench-secret-key-that-is-long-enough"
+    jwt.init_app(app)
+
+    @app.route("/none")
+    def no_auth():
+        return "ok"
+
+    @app.route("/legacy")
+    @jwt_required()
+    @legacy_admin_required
+    def legacy():
+        return "ok"
+
+    @app.route("/cached")
+    @admin_required
+    def cached():
+        return "ok"
+
+    @app.route("/branch/<int:branch_id>")
+    @role_required("admin", "staff", branch_arg="branch_id")
+    def scoped(branch_id):
+        return "ok"
+
+    return app
+
+
+def main(iterations=2000):
+    app = build_app()
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"role": "admin", "branch_id": 1})
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    baseline = None
+    for path in ("/none", "/legacy", "/cached", "/branch/1"):
+        assert client.get(path, headers=headers).status_code == 200, path
+        seconds = min(timeit.repeat(lambda: client.get(path, headers=headers), number=iterations, repeat=5))
+        per_request = seconds / iterations * 1e6
+        if baseline is None:
+            baseline = per_request
+        print(f"{path:<12} {per_request:8.1f} us/request   auth overhead {per_request - baseline:7.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
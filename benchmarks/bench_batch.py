@@ -0,0 +1,40 @@
+"""
+Tablet start-of-shift burst: separate requests against one ``POST /batch``.
+
+    python -m benchmarks.bench_batch [rows]
+"""
+import sys
+import timeit
+
+from app.extensions import db
+from benchmarks._support import auth_headers, make_app
+from benchmarks.bench_serialization import seed
+
+BURST = ["/auth/me", "/tables/", "/categories/", "/categories/1/items/", "/orders/", "/reservations/", "/menus/"]
+
+
+def main(rows=200, iterations=20):
+    app = make_app()
+    with app.app_context():
+        seed(rows)
+        db.session.remove()
+    client = app.test_client()
+    headers = auth_headers(app, identity="1", username="admin")
+    items = [{"path": path} for path in BURST]
+
+    def separate():
+        for path in BURST:
+            assert client.get(path, headers=headers).status_code == 200, path
+
+    def batched(parallel):
+        response = client.post("/batch", json={"requests": items, "parallel": parallel}, headers=headers)
+        assert [entry["status"] for entry in response.get_json()["responses"]] == [200] * len(BURST)
+
+    for label, fn in (("separate", separate), ("batch", lambda: batched(False)),
+                      ("batch parallel", lambda: batched(True))):
+        seconds = min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations
+        print(f"{label:<16} {seconds * 1000:7.2f} ms per burst of {len(BURST)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,55 @@
+"""
+Bytes on the wire and CPU cost of response compression.
+
+Compresses the order and table list payloads at several levels, then measures a
+versioned endpoint end to end: first request (serialize + compress) against the
+following ones served from the precompressed cache.
+
+    python -m benchmarks.bench_compression [rows]
+"""
+import sys
+import timeit
+
+from app.extensions import db
+from app.utils.compression import ENCODINGS, compress
+from benchmarks._support import auth_headers, best_of, make_app
+from benchmarks.bench_serialization import seed
+
+
+def payload_table(client, headers):
+    for path in ("/tables/", "/orders/"):
+        body = client.get(path, headers=headers).get_data()
+        print(f"{path:<10} raw={len(body):>9} B")
+        for encoding in ENCODINGS:
+            for level in (1, 6, 9):
+                seconds, packed = best_of(lambda: compress(body, encoding, level), repeat=3)
+                print(f"    {encoding:<4} level={level}  {len(packed):>8} B  ({len(packed) / len(body):5.1%})  "
+                      f"{seconds * 1000:7.2f} ms  {len(body) / seconds / 1e6:7.1f} MB/s")
+
+
+def cached_path(app, client, headers, iterations=50):
+    headers = {**headers, "Accept-Encoding": "gzip"}
+    cache = app.extensions["precompressed"]
+    cold = min(timeit.repeat(lambda: (cache.clear(), client.get("/tables/", headers=headers)), number=1, repeat=5))
+    warm = timeit.timeit(lambda: client.get("/tables/", headers=headers), number=iterations) / iterations
+    plain = timeit.timeit(lambda: client.get("/tables/", headers={**headers, "Accept-Encoding": "identity"}),
+                          number=iterations) / iterations
+    response = client.get("/tables/", headers=headers)
+    print(f"/tables/ end to end: identity={plain * 1000:6.1f} ms  gzip cold={cold * 1000:6.1f} ms  "
+          f"gzip cached={warm * 1000:6.2f} ms  wire={len(response.get_data())} B  "
+          f"cache hits={cache.hits}")
+
+
+def main(rows=10000):
+    app = make_app()
+    with app.app_context():
+        seed(rows)
+        db.session.remove()
+    client = app.test_client()
+    headers = auth_headers(app)
+    payload_table(client, headers)
+    cached_path(app, client, headers)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,89 @@
+"""
+Streaming exports: time to first byte and memory at growing row counts.
+
+Seeds N orders with three line items each, all of them invoiced, at two sizes,
+then reads every export format the way a client would (chunk by chunk) and
+reports time to first byte, total time, throughput and the peak RSS the request
+added. A streaming export should show the same peak at both sizes.
+
+Peak RSS is read from VmHWM after resetting it through /proc/self/clear_refs,
+so this needs Linux.
+
+    python -m benchmarks.bench_exports [--rows 100000 1000000]
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from app.extensions import db
+from app.utils.exports import FORMATS
+from benchmarks._support import auth_headers, make_app
+
+SEED = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+{insert} SELECT {values} FROM n
+"""
+TABLES = (
+    ("INSERT INTO orders (id, user_id, branch_id, total_amount, status, payment_status, payment_method, created_at)",
+     "i, i % 500 + 1, i % 20 + 1, round((i % 2900) + 100.25, 2), 'completed', "
+     "CASE i % 3 WHEN 0 THEN 'unpaid' ELSE 'paid' END, 'card', datetime('2025-01-01', '+' || i || ' minutes')"),
+    ("INSERT INTO order_items (order_id, item_id, quantity)", "i, i % 200 + 1, i % 4 + 1"),
+    ("INSERT INTO order_items (order_id, item_id, quantity)", "i, (i + 7) % 200 + 1, 1"),
+    ("INSERT INTO order_items (order_id, item_id, quantity)", "i, (i + 13) % 200 + 1, 2"),
+    ("INSERT INTO invoices (order_id, invoice_number, issue_date, total_amount, payment_status)",
+     "i, 'INV-' || (i % 20 + 1) || '-2025-' || printf('%06d', i), datetime('2025-01-01', '+' || i || ' minutes'), "
+     "round((i % 2900) + 100.25, 2), CASE i % 3 WHEN 0 THEN 'unpaid' ELSE 'paid' END"),
+)
+
+
+def rss_kb(field):
+    with open("/proc/self/status") as status:
+        return int(re.search(rf"{field}:\s+(\d+)", status.read()).group(1))
+
+
+def measure(client, url, headers):
+    """Time to first byte, total seconds, bytes read and the peak RSS added, in MB."""
+    with open("/proc/self/clear_refs", "w") as refs:
+        refs.write("5")
+    baseline = rss_kb("VmRSS")
+    started = time.perf_counter()
+    response = client.get(url, headers=headers)
+    first = None
+    size = 0
+    for chunk in response.response:
+        if chunk and first is None:
+            first = time.perf_counter() - started
+        size += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - started
+    return first, elapsed, size, (rss_kb("VmHWM") - baseline) / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000], help="Orders per run.")
+    args = parser.parse_args(argv)
+
+    cases = [(f"/exports/invoices?format={fmt}", f"invoices {fmt}", {}) for fmt in FORMATS]
+    cases += [(f"/exports/orders?format={fmt}", f"orders {fmt}", {}) for fmt in FORMATS]
+    cases.append(("/exports/invoices?format=csv", "invoices csv gzip", {"Accept-Encoding": "gzip"}))
+    print(f"{'orders':>9} {'export':<20} {'first byte':>10} {'total':>8} {'rows/s':>10} {'MB out':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'exports.db')}", METRICS_ENABLED=False)
+        with app.app_context():
+            for insert, values in TABLES:
+                db.session.execute(db.text(SEED.format(insert=insert, values=values)), {"rows": rows})
+            db.session.commit()
+        client = app.test_client()
+        headers = auth_headers(app)
+        for url, label, extra in cases:
+            first, elapsed, size, peak = measure(client, url, {**headers, **extra})
+            exported = rows * 3 if label.startswith("orders") and "ndjson" not in label else rows
+            print(f"{rows:>9,} {label:<20} {first * 1000:>8.1f}ms {elapsed:>7.2f}s {exported / elapsed:>10,.0f} "
+                  f"{size / 1e6:>8.1f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
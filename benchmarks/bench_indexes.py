@@ -0,0 +1,115 @@
+"""
+Per-endpoint latency before and after the hot-path index migration.
+
+Builds the schema with the migrations up to 0001b (no secondary indexes), seeds a
+realistic volume, times the endpoints whose queries filter on foreign keys and
+dates, then upgrades to 0002 and times them again on the same data.
+
+    python -m benchmarks.bench_indexes [orders]
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from flask_migrate import upgrade
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.branch import Branch
+from app.models.category import Category
+from app.models.item import Item
+from app.models.menu import Menu
+from app.models.order import Order, OrderItem
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant
+from app.models.table import Table
+from benchmarks._support import auth_headers
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+BRANCHES = 20
+TABLES_PER_BRANCH = 25
+CATEGORIES = 200
+ITEMS_PER_CATEGORY = 50
+
+
+def seed(orders):
+    rng = random.Random(7)
+    # Anchored on today so /reports/daily-sales has a day's worth of orders to sum.
+    now = datetime.combine(date.today(), time(12))
+    insert = lambda model, rows: db.session.execute(model.__table__.insert(), rows)
+    insert(Restaurant, [{"id": 1, "name": "Bench", "location": "Town", "contact_number": "1"}])
+    insert(Branch, [{"id": b, "address": f"{b} Main St", "city": "Town", "restaurant_id": 1}
+                    for b in range(1, BRANCHES + 1)])
+    insert(Menu, [{"id": m, "name": f"Menu {m}", "price": 10.0, "restaurant_id": 1} for m in range(1, 6)])
+    insert(Category, [{"id": c, "name": f"Category {c}", "menu_id": rng.randint(1, 5)}
+                      for c in range(1, CATEGORIES + 1)])
+    insert(Item, [{"name": f"Item {c}-{i}", "price": 5.0, "category_id": c}
+                  for c in range(1, CATEGORIES + 1) for i in range(ITEMS_PER_CATEGORY)])
+    insert(Table, [{"table_number": f"T{t}", "seats": 4, "is_available": True, "branch_id": b}
+                   for b in range(1, BRANCHES + 1) for t in range(1, TABLES_PER_BRANCH + 1)])
+    insert(Order, [
+        {"id": o, "user_id": rng.randint(1, 5000), "branch_id": rng.randint(1, BRANCHES),
+         "total_amount": 50.0, "status": rng.choice(("pending", "completed", "completed", "cancelled")),
+         "payment_status": "paid", "created_at": now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))}
+        for o in range(1, orders + 1)
+    ])
+    insert(OrderItem, [{"order_id": o, "item_id": rng.randint(1, CATEGORIES * ITEMS_PER_CATEGORY),
+                        "quantity": 1} for o in range(1, orders + 1) for _ in range(3)])
+    insert(Reservation, [
+        {"user_id": rng.randint(1, 5000), "table_id": rng.randint(1, BRANCHES * TABLES_PER_BRANCH),
+         "reservation_time": now + timedelta(hours=rng.randint(-2000, 2000)), "guests_count": 2,
+         "status": "booked"}
+        for _ in range(orders // 2)
+    ])
+    db.session.commit()
+
+
+def endpoints(app):
+    admin = auth_headers(app)
+    customer = auth_headers(app, role="customer", identity="42")
+    return [
+        ("GET /reservations/ (by user)", "/reservations/", customer),
+        ("GET /categories/7/items/", "/categories/7/items/", admin),
+        ("GET /reports/daily-sales", "/reports/daily-sales", None),
+        ("GET /orders/1234 (with items)", "/orders/1234", admin),
+        ("GET /menus/3 (nested)", "/menus/3", admin),
+    ]
+
+
+def measure(client, cases, iterations):
+    timings = {}
+    for label, path, headers in cases:
+        response = client.get(path, headers=headers or {})
+        assert response.status_code == 200, (path, response.status_code)
+        timings[label] = min(timeit.repeat(lambda: client.get(path, headers=headers or {}),
+                                           number=iterations, repeat=3)) / iterations
+    return timings
+
+
+def main(orders=100000, iterations=20):
+    path = os.path.join(tempfile.mkdtemp(), "indexes.db")
+    app = create_app(type("BenchConfig", (TestingConfig,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "COMPRESS_ENABLED": False,
+    }))
+    client = app.test_client()
+    cases = endpoints(app)
+    with app.app_context():
+        upgrade(MIGRATIONS, revision="0001b")
+        seed(orders)
+    before = measure(client, cases, iterations)
+    with app.app_context():
+        upgrade(MIGRATIONS, revision="0002")
+    after = measure(client, cases, iterations)
+
+    print(f"{orders} orders, {orders * 3} order items, {orders // 2} reservations")
+    for label, _, _ in cases:
+        print(f"{label:<32} before={before[label] * 1000:8.2f} ms  after={after[label] * 1000:7.2f} ms  "
+              f"speed-up={before[label] / after[label]:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,65 @@
+"""
+GET /invoices pages as the invoice history grows.
+
+Seeds N paid invoices of past orders plus a fixed backlog of unpaid ones, then
+times the pages finance uses: the first and a deep page of unpaid invoices (with
+their summary), unpaid invoices of one branch, and the newest invoices overall
+with and without the summary. The unpaid pages should cost the same at every
+history size; only the all-invoices summary grows with N.
+
+    python -m benchmarks.bench_invoice_listing [--history 100000 1000000] [--unpaid 2000]
+"""
+import argparse
+import os
+import tempfile
+
+from app.extensions import db
+from benchmarks._support import auth_headers, best_of, make_app
+
+SEED = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+{insert} SELECT {values} FROM n
+"""
+ORDERS = ("INSERT INTO orders (id, user_id, branch_id, total_amount, status, payment_status, payment_method, "
+          "created_at)",
+          "i, i % 500 + 1, i % 20 + 1, (i % 2900) + 100.25, 'completed', "
+          "CASE WHEN i > :paid THEN 'unpaid' ELSE 'paid' END, 'card', datetime('2020-01-01', '+' || i || ' minutes')")
+INVOICES = ("INSERT INTO invoices (order_id, invoice_number, issue_date, total_amount, payment_status)",
+            "i, 'INV-' || i, datetime('2020-01-01', '+' || i || ' minutes'), (i % 2900) + 100.25, "
+            "CASE WHEN i > :paid THEN 'unpaid' ELSE 'paid' END")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[100_000, 1_000_000], help="Paid invoices.")
+    parser.add_argument("--unpaid", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    print(f"{'history':>9} {'page':<34} {'ms':>8}")
+    for history in args.history:
+        rows = history + args.unpaid
+        app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'listing.db')}", METRICS_ENABLED=False)
+        with app.app_context():
+            for insert, values in (ORDERS, INVOICES):
+                db.session.execute(db.text(SEED.format(insert=insert, values=values)), {"rows": rows, "paid": history})
+            db.session.commit()
+            db.session.execute(db.text("ANALYZE"))
+        client = app.test_client()
+        headers = auth_headers(app)
+        middle = client.get(f"/invoices/?payment_status=unpaid&limit={min(args.unpaid // 2, 500)}&summary=false"
+                            "&fields=id", headers=headers).json["next_cursor"]
+        pages = {
+            "unpaid, first page": "/invoices/?payment_status=unpaid",
+            "unpaid, deep page": f"/invoices/?payment_status=unpaid&cursor={middle}",
+            "unpaid, branch 3": "/invoices/?payment_status=unpaid&branch_id=3",
+            "all, first page, no summary": "/invoices/?summary=false",
+            "all, first page, summary": "/invoices/",
+        }
+        for label, url in pages.items():
+            elapsed, response = best_of(lambda: client.get(url, headers=headers))
+            assert response.status_code == 200, response.json
+            print(f"{history:>9,} {label:<34} {elapsed * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Concurrency check for the invoice number allocator.
+
+Several app instances (separate engines and allocators, standing in for server or
+worker processes) share one SQLite file; each runs many threads that invoice
+orders one at a time through the "invoices.generate" task, while a batch invoices
+another branch in one go. Halfway through, one instance drops its cached blocks
+the way a crashed process would.
+
+Exits non-zero unless every invoice got a distinct number, every sequence's gaps
+stay within what the cached blocks explain, and the batch numbers are contiguous.
+
+    python -m benchmarks.bench_invoice_numbers [--instances 4] [--threads 8] [--orders 6000]
+"""
+import argparse
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import func, select
+
+from app import create_app
+from app.config import TestingConfig, engine_options
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.tasks import generate_invoice
+from app.utils.datagen import generate
+from app.utils.invoicing import generate_invoices
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+
+NUMBER = re.compile(r"INV-(\d+)-(\d+)-(\d+)$")
+
+
+def build(uri):
+    return create_app(type("NumbersConfig", (TestingConfig,), {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options(uri, 30000),
+        "SQLITE_PRAGMAS": PRODUCTION_PRAGMAS,
+        "METRICS_ENABLED": False,
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="Threads per instance.")
+    parser.add_argument("--orders", type=int, default=6000)
+    args = parser.parse_args(argv)
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'numbers.db')}"
+    apps = [build(uri) for _ in range(args.instances)]
+    with apps[0].app_context():
+        db.create_all()
+        generate("small", orders=args.orders, reservations=0, days=30)
+        db.session.execute(Invoice.__table__.delete())
+        db.session.commit()
+        single = db.session.scalars(select(Order.id).where(Order.status == "completed", Order.branch_id != 1)).all()
+        batch_day = db.session.scalar(select(func.max(Order.created_at))).date()
+        first_day = db.session.scalar(select(func.min(Order.created_at))).date()
+        db.session.remove()
+
+    work = queue.Queue()
+    for order_id in single:
+        work.put(order_id)
+    errors = []
+    crash_at = len(single) // 2
+
+    def issue(app):
+        with app.app_context():
+            while True:
+                try:
+                    order_id = work.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    generate_invoice(order_id)
+                    db.session.commit()
+                except Exception as error:
+                    db.session.rollback()
+                    errors.append(f"order {order_id}: {error!r}")
+                finally:
+                    db.session.remove()
+                if work.qsize() == crash_at:
+                    app.extensions["invoice_numbers"].blocks.clear()
+
+    def batch():
+        with apps[-1].app_context():
+            generate_invoices(1, first_day, batch_day)
+            db.session.commit()
+
+    threads = [threading.Thread(target=issue, args=(app,)) for app in apps for _ in range(args.threads)]
+    threads.append(threading.Thread(target=batch))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with apps[0].app_context():
+        rows = db.session.execute(
+            select(Invoice.invoice_number, Order.branch_id).join(Order, Order.id == Invoice.order_id)).all()
+    numbers = defaultdict(list)
+    for invoice_number, branch_id in rows:
+        match = NUMBER.match(invoice_number)
+        assert match and int(match.group(1)) == branch_id, invoice_number
+        numbers[int(match.group(1)), int(match.group(2))].append(int(match.group(3)))
+
+    block = apps[0].config["INVOICE_NUMBER_BLOCK"]
+    # Each instance can strand part of one block per sequence at the end, plus the block dropped by the "crash".
+    allowed_gap = (args.instances + 1) * block
+    failures = list(errors[:10])
+    print(f"{len(rows)} invoices from {len(threads) - 1} threads in {args.instances} instances + 1 batch, "
+          f"{elapsed:.2f} s ({len(rows) / elapsed:,.0f} invoices/s)")
+    print(f"{'branch':>6} {'year':>6} {'invoices':>9} {'highest':>8} {'gaps':>6}")
+    for (branch_id, year), values in sorted(numbers.items()):
+        gaps = max(values) - len(values)
+        print(f"{branch_id:>6} {year:>6} {len(values):>9} {max(values):>8} {gaps:>6}")
+        if len(set(values)) != len(values):
+            failures.append(f"branch {branch_id}: duplicate numbers")
+        if branch_id == 1 and sorted(values) != list(range(1, len(values) + 1)):
+            failures.append("batch branch: numbers are not contiguous from 1")
+        if gaps > allowed_gap:
+            failures.append(f"branch {branch_id}: {gaps} gaps exceed {allowed_gap}")
+    if len(rows) != len(single) + sum(len(values) for (branch_id, _), values in numbers.items() if branch_id == 1):
+        failures.append("some orders were not invoiced")
+    if failures:
+        raise SystemExit("FAILED:\n  " + "\n  ".join(failures))
+    print("OK: no duplicates, gaps within bounds, batch contiguous")
+
+
+if __name__ == "__main__":
+    main()
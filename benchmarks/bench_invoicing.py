@@ -0,0 +1,80 @@
+"""
+End-of-day invoicing: one invoice per request against the batch operation.
+
+Seeds one branch with a day of orders, then invoices every completed order twice:
+once per order the way POST /invoices/<order_id> used to (load the order, lazy-load
+its invoice, insert, commit) and once with app.utils.invoicing.generate_invoices
+(one anti-join, numbers for the whole block, bulk INSERTs, one commit). Also runs
+the batch through the job queue end to end.
+
+    python -m benchmarks.bench_invoicing [--orders 6000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.tasks import generate_invoice
+from app.utils.datagen import generate
+from app.utils.invoicing import generate_invoices, uninvoiced_orders
+from app.utils.jobs import Worker
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+from benchmarks._support import auth_headers, make_app
+
+
+def reset():
+    db.session.execute(Invoice.__table__.delete())
+    db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=6000)
+    args = parser.parse_args(argv)
+
+    app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'invoicing.db')}", SQLITE_PRAGMAS=PRODUCTION_PRAGMAS,
+                   METRICS_ENABLED=False, JOBS_POLL_INTERVAL_MS=10)
+    with app.app_context():
+        generate("small", orders=args.orders, reservations=0, days=0, branches_per_restaurant=1)
+        day = db.session.scalar(select(func.min(Order.created_at))).date()
+        reset()
+        completed = db.session.scalars(select(Order.id).where(Order.status == "completed")).all()
+        print(f"{len(completed)} completed orders on {day}")
+        statement = uninvoiced_orders(1, day, day).compile(db.engine, compile_kwargs={"literal_binds": True})
+        for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {statement}")):
+            print(f"  plan: {row[-1]}")
+
+        started = time.perf_counter()
+        for order_id in completed:
+            generate_invoice(order_id)
+            db.session.commit()
+        per_order = time.perf_counter() - started
+        db.session.remove()
+        reset()
+
+        started = time.perf_counter()
+        totals = generate_invoices(1, day, day)
+        db.session.commit()
+        batch = time.perf_counter() - started
+        reset()
+
+    client = app.test_client()
+    started = time.perf_counter()
+    response = client.post("/invoices/batch", json={"branch_id": 1, "date_from": day.isoformat()},
+                           headers=auth_headers(app))
+    Worker(app, {"invoices": 1}).run(burst=True)
+    queued = time.perf_counter() - started
+    result = client.get(response.headers["Location"], headers=auth_headers(app)).json
+
+    print(f"per order : {per_order:8.2f} s  ({len(completed) / per_order:,.0f} invoices/s)")
+    print(f"batch     : {batch:8.2f} s  ({totals['invoices'] / batch:,.0f} invoices/s, {per_order / batch:.0f}x)")
+    print(f"batch job : {queued:8.2f} s  status {result['status']}, {result['result']['invoices']} invoices")
+
+
+if __name__ == "__main__":
+    main()
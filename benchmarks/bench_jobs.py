@@ -0,0 +1,64 @@
+"""
+Background job queue: enqueue latency on the request path and worker throughput.
+
+Times POST /invoices/<order_id> (validate and enqueue) for every uninvoiced
+completed order, then drains the invoices queue with `Worker.run(burst=True)` at
+several concurrency limits, on a SQLite file with production pragmas.
+
+    python -m benchmarks.bench_jobs [--orders 5000] [--limits 1,2,4]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.job import Job
+from app.models.order import Order
+from app.utils.datagen import generate
+from app.utils.jobs import Worker
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+from benchmarks._support import auth_headers, make_app, percentiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--limits", default="1,2,4", help="Comma-separated concurrency limits of the queue.")
+    args = parser.parse_args(argv)
+
+    for limit in (int(value) for value in args.limits.split(",")):
+        app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'jobs.db')}", SQLITE_PRAGMAS=PRODUCTION_PRAGMAS,
+                       METRICS_ENABLED=False, JOBS_POLL_INTERVAL_MS=10)
+        with app.app_context():
+            generate("small", orders=args.orders, reservations=0)
+            db.session.execute(Invoice.__table__.delete())
+            db.session.commit()
+            order_ids = db.session.scalars(select(Order.id).where(Order.status == "completed")).all()
+            db.session.remove()
+        client = app.test_client()
+        headers = auth_headers(app)
+
+        samples = []
+        for order_id in order_ids:
+            started = time.perf_counter()
+            response = client.post(f"/invoices/{order_id}", headers=headers)
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 202, response.data
+
+        started = time.perf_counter()
+        Worker(app, {"invoices": limit}).run(burst=True)
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            done = db.session.scalar(select(db.func.count()).select_from(Job).where(Job.status == "succeeded"))
+            invoices = db.session.scalar(select(db.func.count()).select_from(Invoice))
+        points = percentiles(samples)
+        print(f"limit {limit}: enqueue p50 {points[50] * 1000:.2f} ms p99 {points[99] * 1000:.2f} ms | "
+              f"{done} jobs -> {invoices} invoices in {elapsed:.2f} s ({done / elapsed:,.0f} jobs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Load test with realistic traffic mixes against a seeded database.
+
+Seeds a SQLite file with app.utils.datagen (or reuses --database), then drives
+the app with concurrent workers through either the Flask test client or a local
+threaded WSGI server (--server), and reports throughput plus p50/p95/p99 latency
+per endpoint.
+
+    python -m benchmarks.bench_load --mix lunch --requests 2000 --workers 8
+    python -m benchmarks.bench_load --mix all --scale medium --server
+
+Mixes:
+    lunch         menu and item browsing, table lookups, order creation and updates
+    reservations  a booking spike: create/list reservations, table and branch lookups
+    reporting     daily sales, order details and invoice listings
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from app.config import TestingConfig, engine_options
+from app.extensions import db
+from app.models.category import Category
+from app.models.item import Item
+from app.models.menu import Menu
+from app.models.order import Order
+from app.models.restaurant import Restaurant
+from app.models.staff import Staff
+from app.models.table import Table
+from app.utils.datagen import SCALES, generate
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+from benchmarks._support import percentiles
+
+
+def browse_menu(rng, ctx):
+    return "GET /menus/<id>", "GET", f"/menus/{rng.randint(1, ctx['menus'])}", "staff", None
+
+
+def browse_items(rng, ctx):
+    return "GET /categories/<id>/items/", "GET", f"/categories/{rng.randint(1, ctx['categories'])}/items/", "staff", None
+
+
+def list_tables(rng, ctx):
+    return "GET /tables/", "GET", "/tables/?fields=id,table_number,is_available,branch_id", "staff", None
+
+
+def get_table(rng, ctx):
+    return "GET /tables/<id>", "GET", f"/tables/{rng.randint(1, ctx['tables'])}", "customer", None
+
+
+def list_branches(rng, ctx):
+    return "GET /branches/", "GET", "/branches/", "customer", None
+
+
+def create_order(rng, ctx):
+    lines = [{"item_id": rng.randint(1, ctx["items"]), "quantity": rng.randint(1, 3), "unit_price": 10.0}
+             for _ in range(rng.randint(1, 4))]
+    body = {"user_id": rng.choice(ctx["customers"]), "branch_id": rng.randint(1, ctx["branches"]),
+            "total_amount": sum(line["quantity"] * 10.0 for line in lines), "order_items": lines}
+    return "POST /orders/", "POST", "/orders/", "admin", body
+
+
+def update_order_status(rng, ctx):
+    body = {"status": rng.choice(("confirmed", "completed"))}
+    return "PUT /orders/<id>/status", "PUT", f"/orders/{rng.randint(1, ctx['orders'])}/status", "admin", body
+
+
+def create_reservation(rng, ctx):
+    when = datetime.combine(date.today(), datetime.min.time()) + timedelta(days=rng.randint(0, 14),
+                                                                          hours=rng.randint(12, 22))
+    body = {"table_id": rng.randint(1, ctx["tables"]), "reservation_time": when.isoformat(),
+            "guests_count": rng.randint(1, 6)}
+    return "POST /reservations/", "POST", "/reservations/", "customer", body
+
+
+def my_reservations(rng, ctx):
+    return "GET /reservations/", "GET", "/reservations/", "customer", None
+
+
+def daily_sales(rng, ctx):
+    return "GET /reports/daily-sales", "GET", "/reports/daily-sales", None, None
+
+
+def order_detail(rng, ctx):
+    return "GET /orders/<id>", "GET", f"/orders/{rng.randint(1, ctx['orders'])}", "admin", None
+
+
+def list_invoices(rng, ctx):
+    return "GET /invoices/", "GET", "/invoices/?fields=id,invoice_number,total_amount", "admin", None
+
+
+MIXES = {
+    "lunch": [(35, browse_menu), (25, browse_items), (15, list_tables), (20, create_order), (5, update_order_status)],
+    "reservations": [(40, create_reservation), (30, my_reservations), (20, get_table), (10, list_branches)],
+    "reporting": [(45, daily_sales), (45, order_detail), (10, list_invoices)],
+}
+
+
+class TestClientTarget:
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def call(method, path, headers, body):
+            return client.open(path, method=method, headers=headers, json=body).status_code
+
+        return call
+
+    def close(self):
+        pass
+
+
+class HTTPTarget:
+    """Keep-alive HTTP sessions against a server on a local port."""
+
+    def __init__(self, port):
+        self.port = port
+
+    def session(self):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+
+        def call(method, path, headers, body):
+            payload = json.dumps(body).encode() if body is not None else None
+            headers = {**headers, "Content-Type": "application/json"} if payload else headers
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+
+        return call
+
+    def close(self):
+        pass
+
+
+class ServerTarget(HTTPTarget):
+    """The app behind a threaded werkzeug server on a free local port, with keep-alive."""
+
+    def __init__(self, app):
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        super().__init__(self.server.server_port)
+
+    def close(self):
+        self.server.shutdown()
+
+
+def context(app):
+    """Id ranges of the seeded data and a pool of tokens per role."""
+    with app.app_context():
+        count = lambda model: db.session.scalar(select(func.max(model.id))) or 1
+        customers = db.session.scalars(select(Staff.id).where(Staff.role == "customer").limit(200)).all()
+        staff = db.session.execute(select(Staff.id, Staff.branch_id).where(Staff.role == "staff").limit(50)).all()
+        ctx = {
+            "menus": count(Menu), "categories": count(Category), "items": count(Item), "tables": count(Table),
+            "orders": count(Order), "branches": db.session.scalar(select(func.max(Table.branch_id))) or 1,
+            "customers": customers or [1],
+        }
+        ctx["tokens"] = {
+            "admin": [create_access_token("1", additional_claims={"role": "admin", "branch_id": None})],
+            "staff": [create_access_token(str(i), additional_claims={"role": "staff", "branch_id": b})
+                      for i, b in staff] or [create_access_token("1", additional_claims={"role": "admin"})],
+            "customer": [create_access_token(str(i), additional_claims={"role": "customer", "branch_id": None})
+                         for i in ctx["customers"]],
+        }
+    return ctx
+
+
+def run_mix(target, ctx, mix, requests, workers, seed):
+    weights, scenarios = zip(*MIXES[mix])
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        call = target.session()
+        local_samples = defaultdict(list)
+        local_statuses = defaultdict(lambda: defaultdict(int))
+        for _ in range(requests // workers):
+            name, method, path, role, body = rng.choices(scenarios, weights)[0](rng, ctx)
+            headers = {"Authorization": f"Bearer {rng.choice(ctx['tokens'][role])}"} if role else {}
+            started = time.perf_counter()
+            try:
+                status = call(method, path, headers, body)
+            except Exception:
+                status = "error"
+            local_samples[name].append(time.perf_counter() - started)
+            local_statuses[name][status] += 1
+        with lock:
+            for name, values in local_samples.items():
+                samples[name].extend(values)
+                for status, count in local_statuses[name].items():
+                    statuses[name][status] += count
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in samples.values())
+    print(f"\n{mix}: {total} requests, {workers} workers, {elapsed:.2f} s, {total / elapsed:,.0f} req/s")
+    print(f"  {'endpoint':<30} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name in sorted(samples):
+        points = percentiles(samples[name])
+        codes = " ".join(f"{status}x{count}" for status, count in sorted(statuses[name].items(), key=str))
+        print(f"  {name:<30} {len(samples[name]):>6} {len(samples[name]) / elapsed:>8.0f} "
+              f"{points[50] * 1000:>8.2f} {points[95] * 1000:>8.2f} {points[99] * 1000:>8.2f}  {codes}")
+    return samples, statuses
+
+
+def build_app(database, scale, orders, seed):
+    uri = f"sqlite:///{database}"
+    app = create_app(type("LoadConfig", (TestingConfig,), {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options(uri, 30000),
+        "SQLITE_PRAGMAS": PRODUCTION_PRAGMAS,
+    }))
+    with app.app_context():
+        db.create_all()
+        if not db.session.scalar(select(func.count()).select_from(Restaurant)):
+            started = time.perf_counter()
+            overrides = {"orders": orders, "reservations": orders // 2} if orders else {}
+            counts = generate(scale, seed=seed, **overrides)
+            print(f"seeded {counts.get('orders', 0)} orders, {counts.get('order_items', 0)} order items, "
+                  f"{counts.get('reservations', 0)} reservations in {time.perf_counter() - started:.1f} s")
+        db.session.remove()
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=[*MIXES, "all"], default="all")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mix.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--orders", type=int, help="Override the number of seeded orders.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="SQLite file to use; seeded only if empty.")
+    parser.add_argument("--server", action="store_true", help="Go through a local WSGI server over HTTP.")
+    args = parser.parse_args(argv)
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), "load.db")
+    app = build_app(database, args.scale, args.orders, args.seed)
+    ctx = context(app)
+    target = ServerTarget(app) if args.server else TestClientTarget(app)
+    try:
+        for mix in MIXES if args.mix == "all" else [args.mix]:
+            _, statuses = run_mix(target, ctx, mix, args.requests, args.workers, args.seed)
+            failures = sum(count for codes in statuses.values() for status, count in codes.items()
+                           if status == "error" or status >= 500)
+            if failures:
+                raise SystemExit(f"{mix}: {failures} requests failed with a server error")
+    finally:
+        target.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Metrics registry: write cost, thread safety, multi-worker merge and a scrape.
+
+    python -m benchmarks.bench_metrics [iterations]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import timeit
+
+from app.utils.metrics import Registry
+from benchmarks._support import auth_headers, make_app
+
+
+def write_cost(iterations):
+    registry = Registry()
+    counter = registry.counter("c", "", ("endpoint",))
+    histogram = registry.histogram("h", "", ("endpoint",))
+    for label, fn in (("counter.inc", lambda: counter.inc("tables.get_tables")),
+                      ("histogram.observe", lambda: histogram.observe(0.012, "tables.get_tables"))):
+        seconds = min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations
+        print(f"{label:<18} {seconds * 1e9:6.0f} ns")
+
+
+def thread_safety(threads=8, per_thread=50000):
+    registry = Registry()
+    counter = registry.counter("c", "")
+    histogram = registry.histogram("h", "", buckets=(1.0,))
+
+    def work():
+        for _ in range(per_thread):
+            counter.inc()
+            histogram.observe(0.5)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert counter.collect()[()] == threads * per_thread
+    assert histogram.collect()[()][0] == threads * per_thread
+    print(f"{threads} threads x {per_thread} increments: totals exact")
+
+
+def multiprocess_merge():
+    directory = tempfile.mkdtemp()
+    registry = Registry(directory)
+    registry.counter("requests_total", "", ("status",)).inc("200", amount=3)
+    registry.gauge_callback("pool", "", lambda: {(): 2})
+    # A worker that has exited: its counters still count, its gauges do not.
+    with open(os.path.join(directory, "metrics-999999999.json"), "w") as handle:
+        json.dump({
+            "requests_total": {"kind": "counter", "values": [[["200"], 4], [["500"], 1]]},
+            "pool": {"kind": "gauge", "values": [[[], 7]]},
+        }, handle)
+    merged = registry.merged()
+    assert merged["requests_total"]["values"] == {("200",): 7, ("500",): 1}, merged["requests_total"]
+    assert merged["pool"]["values"] == {(): 2}
+    # The dead worker was folded into the aggregate; scraping again counts it once.
+    assert sorted(os.listdir(directory)) == ["aggregate.json", "aggregate.lock"], os.listdir(directory)
+    assert registry.merged()["requests_total"]["values"] == {("200",): 7, ("500",): 1}
+    print("multi-worker merge: counters summed, dead worker gauges dropped, dead snapshots folded once")
+
+
+def scrape():
+    app = make_app()
+    client = app.test_client()
+    headers = auth_headers(app)
+    for _ in range(20):
+        client.get("/tables/", headers=headers)
+    client.post("/auth/login", json={"username": "nobody", "password": "x"})
+    seconds = min(timeit.repeat(lambda: client.get("/metrics"), number=20, repeat=3)) / 20
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'http_requests_total{endpoint="tables.get_tables",method="GET",status="200"} 20' in body
+    assert 'http_request_duration_seconds_count{endpoint="tables.get_tables",method="GET"} 20' in body
+    assert "auth_login_failures_total 1" in body
+    print(f"scrape: {len(body.splitlines())} lines in {seconds * 1000:.2f} ms")
+
+
+def main(iterations=200000):
+    write_cost(iterations)
+    thread_safety()
+    multiprocess_merge()
+    scrape()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
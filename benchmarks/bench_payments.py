@@ -0,0 +1,164 @@
+"""
+The payments ledger at peak checkout and at report time.
+
+Seeds N orders and a ledger of E historical payment events, folds the history
+into payment_totals, then:
+
+- runs a checkout burst: T threads each POST payments (some split in two, some
+  with a tip) to their own orders, and reports throughput and latency;
+- times the rollup of the burst's events;
+- times "revenue by method" and "outstanding orders" from the materializations
+  against the same answers aggregated from the whole ledger, and checks that
+  both agree.
+
+    python -m benchmarks.bench_payments [--orders 50000] [--events 1000000] [--threads 8] [--payments 4000]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import case, func, select
+
+from app.extensions import db
+from app.models.order import Order
+from app.models.payment_event import PaymentEvent
+from app.utils.payments import OUTSTANDING, outstanding_orders, revenue_by_method, rollup_payment_totals
+from app.utils.sqlite import PRODUCTION_PRAGMAS
+from benchmarks._support import auth_headers, best_of, make_app, percentiles
+
+SEED = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+{insert} SELECT {values} FROM n
+"""
+ORDERS = ("INSERT INTO orders (id, user_id, branch_id, total_amount, status, payment_status, created_at)",
+          "i, i % 500 + 1, i % 20 + 1, (i % 290) + 10.5, 'completed', 'unpaid', "
+          "datetime('2025-01-01', '+' || (i / 10) || ' minutes')")
+# History lives on the first half of the orders; the burst pays the second half.
+EVENTS = ("INSERT INTO payment_events (order_id, kind, method, amount, created_at)",
+          "i % (:orders / 2) + 1, CASE WHEN i % 10 = 0 THEN 'tip' ELSE 'payment' END, "
+          "CASE i % 3 WHEN 0 THEN 'cash' WHEN 1 THEN 'card' ELSE 'voucher' END, (i % 50) + 1.25, "
+          "datetime('2025-01-01', '+' || (i / 20) || ' minutes')")
+BALANCES = """
+INSERT INTO order_balances (order_id, paid_amount, refunded_amount, tip_amount, event_count, updated_at)
+SELECT order_id, SUM(CASE WHEN kind = 'payment' THEN amount ELSE 0 END), 0,
+       SUM(CASE WHEN kind = 'tip' THEN amount ELSE 0 END), COUNT(*), MAX(created_at)
+FROM payment_events GROUP BY order_id
+"""
+PENDING = "INSERT INTO pending_payment_events (event_id) SELECT id FROM payment_events"
+STATUSES = """
+UPDATE orders SET payment_status = CASE WHEN b.paid_amount >= orders.total_amount THEN 'paid' ELSE 'partially_paid' END
+FROM order_balances AS b WHERE b.order_id = orders.id
+"""
+
+
+def ledger_revenue():
+    def kind_sum(kind):
+        return func.sum(case((PaymentEvent.kind == kind, PaymentEvent.amount), else_=0))
+
+    rows = db.session.execute(select(PaymentEvent.method, kind_sum("payment"), kind_sum("refund"))
+                              .group_by(PaymentEvent.method).order_by(PaymentEvent.method)).all()
+    return {method: round(payments - refunds, 2) for method, payments, refunds in rows}
+
+
+def ledger_outstanding(limit):
+    paid = func.coalesce(func.sum(case((PaymentEvent.kind == "payment", PaymentEvent.amount),
+                                       (PaymentEvent.kind == "refund", -PaymentEvent.amount), else_=0)), 0)
+    return db.session.execute(
+        select(Order.id).outerjoin(PaymentEvent, PaymentEvent.order_id == Order.id)
+        .where(Order.status != "cancelled").group_by(Order.id)
+        .having(paid < Order.total_amount - 0.005).order_by(Order.created_at, Order.id).limit(limit)
+    ).scalars().all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--payments", type=int, default=4000, help="Orders paid during the burst.")
+    args = parser.parse_args(argv)
+
+    app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'payments.db')}", SQLITE_PRAGMAS=PRODUCTION_PRAGMAS,
+                   METRICS_ENABLED=False, PAYMENTS_ROLLUP_DELAY_SECONDS=3600)
+    with app.app_context():
+        db.session.execute(db.text(SEED.format(insert=ORDERS[0], values=ORDERS[1])), {"rows": args.orders})
+        db.session.execute(db.text(SEED.format(insert=EVENTS[0], values=EVENTS[1])),
+                           {"rows": args.events, "orders": args.orders})
+        db.session.execute(db.text(BALANCES))
+        db.session.execute(db.text(PENDING))
+        db.session.execute(db.text(STATUSES))
+        db.session.commit()
+        started = time.perf_counter()
+        folded = rollup_payment_totals()
+        history = time.perf_counter() - started
+        print(f"{args.orders:,} orders, {args.events:,} ledger events; history folded in {history:.2f} s "
+              f"({folded / history:,.0f} events/s)")
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    first_burst_order = args.orders // 2 + 1
+    totals = {order_id: total for order_id, total in _totals(app, first_burst_order, args.payments)}
+    orders = sorted(totals)
+    latencies = []
+    lock = threading.Lock()
+
+    def checkout(chunk):
+        local = []
+        for order_id in chunk:
+            total = totals[order_id]
+            # Every third bill is split over two methods, every fourth gets a tip.
+            half = round(total / 2, 2)
+            parts = [("payment", "card", half), ("payment", "cash", round(total - half, 2))] \
+                if order_id % 3 == 0 else [("payment", "card", total)]
+            if order_id % 4 == 0:
+                parts.append(("tip", "card", 2.0))
+            for index, (kind, method, amount) in enumerate(parts):
+                started = time.perf_counter()
+                response = client.post(f"/orders/{order_id}/payments", headers=headers, json={
+                    "method": method, "amount": amount, "kind": kind, "idempotency_key": f"{order_id}-{index}"})
+                local.append(time.perf_counter() - started)
+                assert response.status_code == 201, response.json
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=checkout, args=(orders[i::args.threads],)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    burst = time.perf_counter() - started
+    p = percentiles(latencies)
+    print(f"checkout burst : {len(latencies):,} events from {args.threads} threads in {burst:.2f} s "
+          f"({len(latencies) / burst:,.0f} events/s), p50 {p[50] * 1000:.1f} ms, p99 {p[99] * 1000:.1f} ms")
+
+    with app.app_context():
+        unfolded_revenue, _ = best_of(revenue_by_method, 3)
+        started = time.perf_counter()
+        folded = rollup_payment_totals()
+        print(f"burst rollup   : {folded:,} events in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        materialized, revenue = best_of(revenue_by_method, 5)
+        aggregated, expected = best_of(ledger_revenue, 3)
+        assert {row["method"]: row["revenue"] for row in revenue} == expected, (revenue, expected)
+        print(f"revenue by method: {materialized * 1000:8.2f} ms materialized ({unfolded_revenue * 1000:.2f} ms "
+              f"with the burst unfolded), {aggregated * 1000:8.2f} ms from the ledger")
+
+        materialized, outstanding = best_of(lambda: outstanding_orders(limit=100), 5)
+        aggregated, expected = best_of(lambda: ledger_outstanding(100), 3)
+        assert [row["id"] for row in outstanding] == expected
+        remaining = db.session.scalar(select(func.count()).where(Order.payment_status.in_(OUTSTANDING)))
+        print(f"outstanding    : {materialized * 1000:8.2f} ms materialized, {aggregated * 1000:8.2f} ms from the "
+              f"ledger ({remaining:,} orders outstanding)")
+
+
+def _totals(app, first_order, count):
+    with app.app_context():
+        return db.session.execute(select(Order.id, Order.total_amount)
+                                  .where(Order.id >= first_order, Order.id < first_order + count)).all()
+
+
+if __name__ == "__main__":
+    main()
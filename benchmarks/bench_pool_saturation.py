@@ -0,0 +1,89 @@
+"""
+Request latency as concurrency grows past the connection pool size.
+
+Every simulated request checks out a connection, runs a small aggregate query and
+holds the connection for ``--hold-ms`` (a stand-in for a slow query), so once the
+number of concurrent requests exceeds ``pool_size + max_overflow`` requests start
+queueing for a connection and latency climbs.
+
+    DATABASE_URL=postgresql://localhost/restaurant DB_POOL_SIZE=5 \\
+        python -m benchmarks.bench_pool_saturation --levels 1,5,10,20,40
+
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify
+from sqlalchemy import func, select
+
+from app import create_app
+from app.config import ProductionConfig, database_url, engine_options
+from app.extensions import db
+from app.models.order import Order
+
+
+def build_app(url, hold_seconds):
+    class BenchConfig(ProductionConfig):
+        SECRET_KEY = JWT_SECRET_KEY = "bench"
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(url, ProductionConfig.DB_STATEMENT_TIMEOUT_MS)
+
+    app = create_app(BenchConfig)
+
+    @app.route("/bench/pool")
+    def pool_probe():
+        total = db.session.execute(select(func.count(Order.id))).scalar()
+        time.sleep(hold_seconds)
+        return jsonify({"orders": total})
+
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run_level(app, concurrency, requests_per_worker):
+    client = app.test_client()
+
+    def one_request(_):
+        started = time.perf_counter()
+        status = client.get("/bench/pool").status_code
+        return time.perf_counter() - started, status
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one_request, range(concurrency * requests_per_worker)))
+    latencies = sorted(seconds * 1000 for seconds, status in results if status == 200)
+    failed = sum(1 for _, status in results if status != 200)
+    with app.app_context():
+        checked_out = db.engine.pool.checkedout()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+    print(f"concurrency={concurrency:4d}  p50={statistics.median(latencies):8.1f} ms  "
+          f"p95={p95:8.1f} ms  max={latencies[-1]:8.1f} ms  failed={failed}  still checked out={checked_out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,5,10,20,40")
+    parser.add_argument("--requests", type=int, default=10, help="requests per concurrent client")
+    parser.add_argument("--hold-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        app = build_app(url, args.hold_ms / 1000)
+        with app.app_context():
+            options = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+            print(f"{db.engine.url.render_as_string(hide_password=True)}  pool_size={options['pool_size']}  "
+                  f"max_overflow={options['max_overflow']}  hold={args.hold_ms} ms")
+        for level in (int(level) for level in args.levels.split(",")):
+            run_level(app, level, args.requests)
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Cost of the request instrumentation, and a check that slow requests are captured.
+
+Times the profiler's request hooks on their own (the fast path every request
+pays), then runs requests with a 0 ms threshold and checks that the slow-request
+log and a cProfile dump were written.
+
+    python -m benchmarks.bench_profiling [iterations]
+"""
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+from benchmarks._support import auth_headers, make_app
+
+
+def hook_overhead(app, iterations):
+    profiler = app.extensions["profiler"]
+    with app.test_request_context("/tables/"):
+        def cycle():
+            profiler.start()
+            profiler.finish()
+        seconds = min(timeit.repeat(cycle, number=iterations, repeat=5)) / iterations
+    print(f"hooks below threshold: {seconds * 1e6:.2f} us per request")
+
+
+def capture(iterations=3):
+    directory = tempfile.mkdtemp()
+    app = make_app(PROFILING_ENABLED=True, PROFILE_SLOW_MS=0, PROFILE_DIR=directory, PROFILE_MAX_FILES=2)
+    client = app.test_client()
+    headers = auth_headers(app)
+    for _ in range(iterations + 2):
+        client.get("/tables/", headers=headers)
+
+    with open(os.path.join(directory, "slow_requests.log")) as log:
+        entries = [json.loads(line) for line in log]
+    profiles = [name for name in os.listdir(directory) if name.endswith(".prof")]
+    timing = app.extensions["profiler"].snapshot()["tables.get_tables"]
+    assert len(entries) == iterations + 2 and entries[0]["endpoint"] == "tables.get_tables"
+    assert entries[0]["profile"] is None and entries[1]["profile"], "second slow request should be profiled"
+    assert len(profiles) == 2, profiles
+    assert timing["count"] == iterations + 2 and timing["queries"] >= timing["count"]
+    print(f"captured {len(entries)} slow requests, kept {len(profiles)} profiles, "
+          f"{timing['queries'] / timing['count']:.0f} queries per request")
+
+
+def main(iterations=100000):
+    app = make_app(PROFILING_ENABLED=True, PROFILE_DIR=tempfile.mkdtemp())
+    hook_overhead(app, iterations)
+    capture()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,111 @@
+"""
+Invoice payment-status reconciliation against fixing drift row by row.
+
+Seeds N invoiced orders, lets a share of the orders' payment statuses drift
+from their invoices, then brings them back in line twice: once the way it
+would be done by hand (load every invoice with its order, compare in Python,
+update the ones that differ through the ORM) and once with
+reconcile_invoice_payment_status (one join finds the mismatches, batched UPDATEs
+fix them). Also times a write-through payment update.
+
+    python -m benchmarks.bench_reconcile [--rows 200000] [--drift 0.02] [--batch-size 1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.utils.invoicing import mismatched_invoices, reconcile_invoice_payment_status
+from benchmarks._support import auth_headers, make_app
+
+SEED = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+{insert} SELECT {values} FROM n
+"""
+TABLES = (
+    ("INSERT INTO orders (id, user_id, branch_id, total_amount, status, payment_status, payment_method, created_at)",
+     "i, i % 500 + 1, i % 20 + 1, (i % 2900) + 100.25, 'completed', 'paid', 'card', "
+     "datetime('2024-01-01', '+' || i || ' minutes')"),
+    ("INSERT INTO invoices (order_id, invoice_number, issue_date, total_amount, payment_status)",
+     "i, 'INV-' || i, datetime('2024-01-01', '+' || i || ' minutes'), (i % 2900) + 100.25, 'paid'"),
+)
+
+
+def drift(every):
+    db.session.execute(db.text("UPDATE orders SET payment_status = 'refunded' WHERE id % :every = 0"),
+                       {"every": every})
+    db.session.commit()
+
+
+def mismatches():
+    return db.session.scalar(select(func.count()).select_from(mismatched_invoices(0, None).subquery()))
+
+
+def by_hand():
+    corrected = 0
+    for invoice, order in db.session.execute(select(Invoice, Order).join(Order, Order.id == Invoice.order_id)):
+        if invoice.payment_status != order.payment_status:
+            invoice.payment_status = order.payment_status
+            corrected += 1
+    db.session.commit()
+    return corrected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--drift", type=float, default=0.02, help="Share of orders whose status drifts.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    every = max(1, round(1 / args.drift))
+
+    app = make_app(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'reconcile.db')}", METRICS_ENABLED=False)
+    with app.app_context():
+        for insert, values in TABLES:
+            db.session.execute(db.text(SEED.format(insert=insert, values=values)), {"rows": args.rows})
+        db.session.commit()
+        statement = mismatched_invoices(0, args.batch_size).compile(db.engine, compile_kwargs={"literal_binds": True})
+        for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {statement}")):
+            print(f"  plan: {row[-1]}")
+
+        drift(every)
+        print(f"{args.rows:,} invoices, {mismatches():,} drifted")
+        started = time.perf_counter()
+        corrected = by_hand()
+        manual = time.perf_counter() - started
+        db.session.remove()
+        assert mismatches() == 0
+        db.session.execute(db.text("UPDATE invoices SET payment_status = 'paid'"))
+        db.session.commit()
+
+        drift(every)
+        started = time.perf_counter()
+        batched = reconcile_invoice_payment_status(args.batch_size)
+        reconcile = time.perf_counter() - started
+        assert mismatches() == 0 and sum(batched.values()) == corrected
+
+        started = time.perf_counter()
+        reconcile_invoice_payment_status(args.batch_size)
+        clean = time.perf_counter() - started
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    started = time.perf_counter()
+    for order_id in range(1, 501):
+        response = client.put(f"/orders/{order_id}/payment-status", json={"payment_status": "paid"}, headers=headers)
+        assert response.status_code == 200, response.json
+    write_through = (time.perf_counter() - started) / 500
+
+    print(f"row by row      : {manual:8.2f} s  ({corrected:,} corrected)")
+    print(f"reconcile       : {reconcile:8.2f} s  ({manual / reconcile:.0f}x, batches of {args.batch_size})")
+    print(f"reconcile, clean: {clean:8.2f} s  (nothing to fix)")
+    print(f"payment update  : {write_through * 1000:8.2f} ms per request with write-through")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Read-replica routing check and overhead measurement.
+
+Uses two SQLite files as primary and replica stand-ins, seeded with different menu
+rows so every response shows which engine served it, asserts the routing rules
+and then times ``RoutingSession.get_bind`` against the plain Flask-SQLAlchemy one.
+
+    python -m benchmarks.bench_replica_routing [iterations]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from flask_sqlalchemy.session import Session
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.menu import Menu
+from app.utils.replicas import PRIMARY_COOKIE, use_primary
+
+
+def build_app(tmp):
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'primary.db')}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{os.path.join(tmp, 'replica.db')}"]
+
+    app = create_app(ReplicaConfig)
+
+    @app.route("/bench/primary-menus")
+    @use_primary
+    def primary_menus():
+        return jsonify([menu.name for menu in Menu.query.all()])
+
+    @app.route("/bench/read-after-write")
+    def read_after_write():
+        db.session.add(Menu(name="fresh", price=1.0, restaurant_id=1))
+        db.session.flush()
+        names = [menu.name for menu in Menu.query.all()]
+        db.session.rollback()
+        return jsonify(names)
+
+    with app.app_context():
+        for key, name in ((None, "primary"), ("replica_0", "replica")):
+            engine = db.engines[key]
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(Menu.__table__.insert().values(name=name, price=1.0, restaurant_id=1))
+    return app
+
+
+def menu_names(response):
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return sorted(menu["name"] if isinstance(menu, dict) else menu for menu in response.get_json())
+
+
+def check_routing(app):
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    assert menu_names(client.get("/menus/", headers=headers)) == ["replica"]
+    assert menu_names(client.get("/bench/primary-menus")) == ["primary"]
+    assert menu_names(client.get("/bench/read-after-write")) == ["fresh", "primary"]
+
+    created = client.post("/menus/", json={"name": "new", "price": 2.0, "restaurant_id": 1}, headers=headers)
+    assert created.status_code == 201
+    assert PRIMARY_COOKIE in created.headers.get("Set-Cookie", "")
+    assert menu_names(client.get("/menus/", headers=headers)) == ["new", "primary"]
+
+    client.delete_cookie(PRIMARY_COOKIE)
+    assert menu_names(client.get("/menus/", headers=headers)) == ["replica"]
+    print("routing: reads -> replica, opt-out/flush/write/sticky reads -> primary  OK")
+
+
+def measure_overhead(app, iterations):
+    with app.test_request_context("/menus/"):
+        session = db.session()
+        routed = min(timeit.repeat(lambda: session.get_bind(mapper=Menu), number=iterations, repeat=5))
+        plain = min(timeit.repeat(lambda: Session.get_bind(session, mapper=Menu), number=iterations, repeat=5))
+    print(f"get_bind: plain {plain / iterations * 1e6:.2f} us  routed {routed / iterations * 1e6:.2f} us  "
+          f"overhead {(routed - plain) / iterations * 1e6:.2f} us per statement")
+
+
+def main(iterations=100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(tmp)
+        check_routing(app)
+        measure_overhead(app, iterations)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,81 @@
+"""
+Marshmallow dump + jsonify versus the compiled serializer on large lists.
+
+Seeds N orders (each with line items, half of them invoiced) and N tables, checks
+both paths produce the same JSON, then times each one end to end.
+
+    python -m benchmarks.bench_serialization [rows]
+"""
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from flask import jsonify
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.order import Order, OrderItem
+from app.models.table import Table
+from app.schemas.order_schema import OrderSchema
+from app.schemas.table_schema import TableSchema
+from app.utils.serialization import CompiledSerializer, json_response, orjson
+from benchmarks._support import best_of, make_app
+
+
+def seed(rows):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    db.session.execute(Order.__table__.insert(), [
+        {"id": i, "user_id": rng.randint(1, 500), "branch_id": rng.randint(1, 20),
+         "total_amount": round(rng.uniform(100, 3000), 2), "status": "completed",
+         "payment_status": "paid", "payment_method": "card", "created_at": start + timedelta(minutes=i)}
+        for i in range(1, rows + 1)
+    ])
+    db.session.execute(OrderItem.__table__.insert(), [
+        {"order_id": i, "item_id": rng.randint(1, 200), "quantity": rng.randint(1, 4)}
+        for i in range(1, rows + 1) for _ in range(3)
+    ])
+    db.session.execute(Invoice.__table__.insert(), [
+        {"order_id": i, "invoice_number": f"INV-{i}", "issue_date": start + timedelta(minutes=i),
+         "total_amount": 100.0, "payment_status": "paid"}
+        for i in range(1, rows + 1, 2)
+    ])
+    db.session.execute(Table.__table__.insert(), [
+        {"table_number": f"T{i}", "seats": rng.choice((2, 4, 6)), "is_available": True,
+         "location": "Window", "branch_id": rng.randint(1, 20)}
+        for i in range(1, rows + 1)
+    ])
+    db.session.commit()
+
+
+def compare(label, model, schema, rows):
+    many = type(schema)(many=True)
+    serializer = CompiledSerializer(many, model)
+
+    def marshmallow_path():
+        db.session.expunge_all()
+        return jsonify(many.dump(model.query.all())).get_data()
+
+    def compiled_path():
+        db.session.expunge_all()
+        return json_response(serializer.dump()).get_data()
+
+    slow, expected = best_of(marshmallow_path, repeat=3)
+    fast, actual = best_of(compiled_path, repeat=3)
+    assert json.loads(expected) == json.loads(actual), f"{label}: outputs differ"
+    print(f"{label:<7} rows={rows}  marshmallow={slow * 1000:8.1f} ms  compiled={fast * 1000:7.1f} ms  "
+          f"speed-up={slow / fast:5.1f}x  bytes={len(actual)}")
+
+
+def main(rows=10000):
+    app = make_app()
+    with app.test_request_context():
+        seed(rows)
+        print(f"JSON encoder: {'orjson' if orjson else 'stdlib json'}")
+        compare("tables", Table, TableSchema(), rows)
+        compare("orders", Order, OrderSchema(), rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
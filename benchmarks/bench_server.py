@@ -0,0 +1,91 @@
+"""
+Throughput of the production launcher (app.server) against the development server.
+
+Both run in a subprocess on the same seeded SQLite file: the dev server the way
+run.py starts it (``app.run(debug=True)``, minus the reloader process), the launcher
+with its automatic sizing unless --workers/--threads are given. The traffic mixes
+of bench_load are replayed against each over HTTP keep-alive connections.
+
+    python -m benchmarks.bench_server [--mix lunch] [--requests 2000] [--workers 16]
+
+Needs the ``server`` extra.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_load import MIXES, HTTPTarget, build_app, context, run_mix
+
+
+def serve(mode, port, database, workers, threads):
+    app = build_app(database, "small", None, 42)
+    if mode == "dev":
+        app.run(host="127.0.0.1", port=port, debug=True, use_reloader=False)
+    else:
+        from app.server import run
+        run(app, bind=f"127.0.0.1:{port}", workers=workers, threads=threads)
+
+
+def wait_until_listening(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=[*MIXES, "all"], default="all")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mix.")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent client connections.")
+    parser.add_argument("--server-workers", type=int, help="Launcher worker processes (default: auto).")
+    parser.add_argument("--server-threads", type=int, help="Launcher threads per worker (default: auto).")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="SQLite file to use; seeded only if empty.")
+    parser.add_argument("--serve", choices=("dev", "launcher"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), "server.db")
+    if args.serve:
+        return serve(args.serve, args.port, database, args.server_workers, args.server_threads)
+
+    ctx = context(build_app(database, "small", None, args.seed))
+    mixes = list(MIXES) if args.mix == "all" else [args.mix]
+    throughput = {}
+    for mode in ("dev", "launcher"):
+        command = [sys.executable, "-m", "benchmarks.bench_server", "--serve", mode, "--port", str(args.port),
+                   "--database", database]
+        for flag, value in (("--server-workers", args.server_workers), ("--server-threads", args.server_threads)):
+            if value:
+                command += [flag, str(value)]
+        process = subprocess.Popen(command, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_listening(args.port, process)
+            print(f"\n=== {mode} server ===")
+            for mix in mixes:
+                started = time.perf_counter()
+                samples, _ = run_mix(HTTPTarget(args.port), ctx, mix, args.requests, args.workers, args.seed)
+                throughput[mode, mix] = sum(map(len, samples.values())) / (time.perf_counter() - started)
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"\n{'mix':<14} {'dev req/s':>10} {'launcher req/s':>15} {'speed-up':>9}")
+    for mix in mixes:
+        dev, launcher = throughput["dev", mix], throughput["launcher", mix]
+        print(f"{mix:<14} {dev:>10.0f} {launcher:>15.0f} {launcher / dev:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
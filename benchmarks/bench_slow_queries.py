@@ -0,0 +1,61 @@
+"""
+Slow-query log: overhead on fast statements and the index advisor on real routes.
+
+Runs hot routes against a seeded file database with a 0 ms threshold, then checks
+that the report flags the unindexed filters they use.
+
+    python -m benchmarks.bench_slow_queries [rows]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.utils.slow_queries import build_report, read_entries
+from benchmarks._support import auth_headers, make_app
+from benchmarks.bench_serialization import seed
+
+
+def overhead(iterations=20000):
+    directory = tempfile.mkdtemp()
+    for enabled in (False, True):
+        app = make_app(f"sqlite:///{directory}/overhead-{enabled}.db", SLOW_QUERY_ENABLED=enabled,
+                       SLOW_QUERY_LOG=os.path.join(directory, "unused.log"))
+        with app.app_context():
+            connection = db.session.connection()
+            seconds = min(timeit.repeat(lambda: connection.execute(text("SELECT 1")), number=iterations,
+                                        repeat=5)) / iterations
+        print(f"SELECT 1 with slow-query log {'on ' if enabled else 'off'}: {seconds * 1e6:6.2f} us")
+
+
+def advisor(rows):
+    directory = tempfile.mkdtemp()
+    log = os.path.join(directory, "slow_queries.log")
+    app = make_app(f"sqlite:///{directory}/advisor.db", SLOW_QUERY_ENABLED=True, SLOW_QUERY_MS=0,
+                   SLOW_QUERY_LOG=log)
+    with app.app_context():
+        seed(rows)
+        db.session.remove()
+    client = app.test_client()
+    client.get("/reservations/", headers=auth_headers(app, role="customer", identity="3"))
+    for path in ("/categories/1/items/", "/reports/daily-sales"):
+        client.get(path, headers=auth_headers(app))
+
+    statements, suggestions = build_report(read_entries(log))
+    suggested = {(table, columns) for (table, columns), _ in suggestions}
+    for expected in (("reservations", ("user_id",)), ("items", ("category_id",))):
+        assert expected in suggested, (expected, suggested)
+    print(f"{len(statements)} statement shapes logged; suggestions: "
+          + ", ".join(f"{table}({', '.join(columns)})" for table, columns in sorted(suggested)))
+
+
+def main(rows=2000):
+    overhead()
+    advisor(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
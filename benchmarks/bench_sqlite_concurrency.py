@@ -0,0 +1,89 @@
+"""
+Concurrent read/write throughput of a file-backed SQLite database.
+
+Each profile runs several worker processes (like gunicorn workers) that mix
+order inserts with reporting reads against the same file for a fixed time,
+and reports completed operations and "database is locked" failures.
+
+    python -m benchmarks.bench_sqlite_concurrency [workers] [seconds]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.config import Config, ProductionConfig, engine_options
+from app.extensions import db
+from app.models.order import Order
+from app.utils.sqlite import register_sqlite_pragmas
+
+PROFILES = {"default": Config, "production": ProductionConfig}
+WRITE_RATIO = 0.3
+LUNCH = datetime(2025, 6, 25, 13, 0)
+
+
+def make_engine(path, config_class):
+    url = f"sqlite:///{path}"
+    options = engine_options(url, config_class.DB_STATEMENT_TIMEOUT_MS) if config_class.SQLITE_PRAGMAS else {}
+    engine = create_engine(url, **options)
+    register_sqlite_pragmas(engine, config_class.SQLITE_PRAGMAS)
+    return engine
+
+
+def worker(path, profile, seconds, seed):
+    engine = make_engine(path, PROFILES[profile])
+    rng = random.Random(seed)
+    reads = writes = locked = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < WRITE_RATIO:
+                with engine.begin() as conn:
+                    conn.execute(insert(Order.__table__).values(
+                        user_id=rng.randint(1, 500), branch_id=rng.randint(1, 20),
+                        total_amount=rng.uniform(100, 2000), status="pending",
+                        payment_status="unpaid", created_at=LUNCH,
+                    ))
+                writes += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(func.count(Order.id), func.sum(Order.total_amount))
+                        .where(Order.branch_id == rng.randint(1, 20))
+                    ).one()
+                reads += 1
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+    engine.dispose()
+    return reads, writes, locked
+
+
+def run_profile(profile, workers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = make_engine(path, PROFILES[profile])
+        db.metadata.create_all(engine, tables=[Order.__table__])
+        engine.dispose()
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(worker, [(path, profile, seconds, seed) for seed in range(workers)])
+    reads, writes, locked = (sum(column) for column in zip(*results))
+    print(f"{profile:<11} workers={workers}  reads/s={reads / seconds:9.0f}  "
+          f"writes/s={writes / seconds:8.0f}  locked errors={locked}")
+
+
+def main(workers=8, seconds=5.0):
+    for profile in PROFILES:
+        run_profile(profile, workers, seconds)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 8, float(args[1]) if len(args) > 1 else 5.0)
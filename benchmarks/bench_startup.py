@@ -0,0 +1,44 @@
+"""
+Cold-start cost of a worker: ``import app`` and ``create_app()`` wall time.
+
+Each sample runs in a fresh interpreter so module import caches do not hide the
+cost, once with API docs disabled and once with them enabled.
+
+    python -m benchmarks.bench_startup [samples]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported, "modules": len(__import__("sys").modules)}))
+"""
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample(docs):
+    env = dict(os.environ, APP_CONFIG="testing", API_DOCS_ENABLED="1" if docs else "0")
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(samples=10):
+    for docs in (False, True):
+        runs = [sample(docs) for _ in range(samples)]
+        import_ms = statistics.median(run["import"] for run in runs) * 1000
+        create_ms = statistics.median(run["create_app"] for run in runs) * 1000
+        print(f"api docs {'on ' if docs else 'off'}  import={import_ms:7.1f} ms  create_app={create_ms:7.1f} ms  "
+              f"total={import_ms + create_ms:7.1f} ms  modules={runs[0]['modules']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
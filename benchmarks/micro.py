@@ -0,0 +1,221 @@
+"""
+Micro-benchmarks of core code paths with a regression gate.
+
+    python -m benchmarks.micro run [--filter TEXT] [--output results.json]
+    python -m benchmarks.micro compare results.json [--baseline benchmarks/baseline.json] [--tolerance 0.25]
+    python -m benchmarks.micro run --update-baseline
+
+``run`` prints a table and writes JSON ({"meta": ..., "results": {name: {...}}}).
+``compare`` exits with status 1 when any benchmark is slower than the baseline by
+more than the tolerance (a fraction: 0.25 means 25%). Everything runs on SQLite.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+
+import sqlalchemy
+
+from app.extensions import db
+from app.models.reservation import Reservation
+from app.models.table import Table
+from app.schemas.order_schema import OrderSchema
+from app.schemas.reservation_schema import ReservationSchema
+from app.schemas.table_schema import TableSchema
+from app.utils.datagen import generate
+from app.utils.decorators import admin_required
+from app.utils.password import hash_password, verify_password
+from benchmarks._support import auth_headers, make_app
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BENCHMARKS = {}
+
+
+def benchmark(name, number=1000, repeat=5):
+    """Register ``setup() -> fn``; ``fn`` is timed ``number`` times per round, best of ``repeat`` rounds."""
+    def register(setup):
+        BENCHMARKS[name] = (setup, number, repeat)
+        return setup
+    return register
+
+
+ORDER = {
+    "id": 1, "user_id": 7, "branch_id": 2, "total_amount": 83.5, "status": "completed", "payment_status": "paid",
+    "payment_method": "card", "created_at": datetime(2025, 1, 1, 12, 30),
+    "order_items": [{"id": i, "item_id": i, "quantity": 2, "unit_price": 8.35, "total_price": 16.7} for i in range(5)],
+    "invoice": {"id": 1, "order_id": 1, "invoice_number": "INV-1", "issue_date": datetime(2025, 1, 1, 13),
+                "total_amount": 83.5, "payment_status": "paid"},
+}
+ORDER_INPUT = {"user_id": 7, "branch_id": 2, "total_amount": 83.5,
+               "order_items": [{"item_id": i, "quantity": 2, "unit_price": 8.35} for i in range(5)]}
+RESERVATION = Reservation(id=1, user_id=7, table_id=3, reservation_time=datetime(2025, 1, 1, 19), guests_count=4,
+                          special_requests="Window seat", status="booked", created_at=datetime(2024, 12, 30))
+RESERVATION_INPUT = {"user_id": 7, "table_id": 3, "reservation_time": "2025-01-01T19:00:00", "guests_count": 4}
+TABLE = Table(id=1, table_number="T1", seats=4, is_available=True, location="Window", branch_id=2)
+TABLE_INPUT = {"table_number": "T1", "seats": 4, "location": "Window", "branch_id": 2}
+
+for label, schema, obj, data in (
+    ("order", OrderSchema(), ORDER, ORDER_INPUT),
+    ("reservation", ReservationSchema(), RESERVATION, RESERVATION_INPUT),
+    ("table", TableSchema(), TABLE, TABLE_INPUT),
+):
+    benchmark(f"schema.{label}.dump", number=20000, repeat=7)(lambda schema=schema, obj=obj: lambda: schema.dump(obj))
+    benchmark(f"schema.{label}.validate", number=20000, repeat=7)(lambda schema=schema, data=data: lambda: schema.validate(data))
+
+
+def decorated_app():
+    app = make_app()
+    headers = auth_headers(app)
+    view = admin_required(lambda: "ok")
+    return app, headers, view
+
+
+@benchmark("decorator.admin_required", number=5000)
+def bench_admin_required():
+    app, headers, view = decorated_app()
+
+    def run():
+        with app.test_request_context("/", headers=headers):
+            view()
+    return run
+
+
+@benchmark("decorator.no_auth", number=5000)
+def bench_no_auth():
+    app, headers, _ = decorated_app()
+    view = lambda: "ok"
+
+    def run():
+        with app.test_request_context("/", headers=headers):
+            view()
+    return run
+
+
+for items in (1, 10, 50):
+    @benchmark(f"route.create_order.{items}_items", number=100)
+    def bench_create_order(items=items):
+        app = make_app(METRICS_ENABLED=False)
+        with app.app_context():
+            generate("small", orders=0, reservations=0)
+        client = app.test_client()
+        headers = auth_headers(app)
+        body = {"user_id": 1, "branch_id": 1, "total_amount": 10.0 * items,
+                "order_items": [{"item_id": 1 + i % 80, "quantity": 1, "unit_price": 10.0} for i in range(items)]}
+        return lambda: client.post("/orders/", json=body, headers=headers)
+
+
+for orders in (1_000, 10_000, 50_000):
+    @benchmark(f"route.daily_sales.{orders}_orders", number=50)
+    def bench_daily_sales(orders=orders):
+        app = make_app(METRICS_ENABLED=False)
+        with app.app_context():
+            generate("small", orders=orders, reservations=0, days=30)
+            db.session.remove()
+        client = app.test_client()
+        return lambda: client.get("/reports/daily-sales")
+
+
+@benchmark("password.hash", number=3, repeat=3)
+def bench_hash():
+    return lambda: hash_password("correct horse battery staple")
+
+
+@benchmark("password.verify", number=3, repeat=3)
+def bench_verify():
+    hashed = hash_password("correct horse battery staple")
+    return lambda: verify_password("correct horse battery staple", hashed)
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(BASELINE)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlalchemy": sqlalchemy.__version__,
+    }
+
+
+def run(selected):
+    results = {}
+    for name in selected:
+        setup, number, repeat = BENCHMARKS[name]
+        fn = setup()
+        fn()  # warm caches and lazy compilation outside the timed rounds
+        rounds = [seconds / number for seconds in timeit.repeat(fn, number=number, repeat=repeat)]
+        results[name] = {"seconds": min(rounds), "median": statistics.median(rounds), "number": number,
+                         "repeat": repeat}
+        print(f"{name:<40} {min(rounds) * 1e6:12.2f} us")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print current against baseline; returns the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name in sorted(set(results) | set(baseline)):
+        if name not in baseline or name not in results:
+            print(f"{name:<40} {'only in ' + ('current' if name in results else 'baseline'):>34}")
+            continue
+        before, after = baseline[name]["seconds"], results[name]["seconds"]
+        change = after / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before * 1e6:12.2f} {after * 1e6:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--filter", default="", help="Only benchmarks whose name contains this text.")
+    run_parser.add_argument("--output", help="Write the results JSON here.")
+    run_parser.add_argument("--update-baseline", action="store_true", help=f"Write the results to {BASELINE}.")
+    run_parser.add_argument("--compare", action="store_true", help="Compare against the baseline afterwards.")
+    run_parser.add_argument("--tolerance", type=float, default=0.25)
+    compare_parser = commands.add_parser("compare", help="Compare a results file against the baseline.")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--baseline", default=BASELINE)
+    compare_parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        selected = [name for name in BENCHMARKS if args.filter in name]
+        document = {"meta": metadata(), "results": run(selected)}
+        for path in filter(None, (args.output, BASELINE if args.update_baseline else None)):
+            with open(path, "w") as handle:
+                json.dump(document, handle, indent=2, sort_keys=True)
+                handle.write("\n")
+        if not args.compare:
+            return 0
+        results, baseline, tolerance = document["results"], load(BASELINE)["results"], args.tolerance
+    else:
+        results, baseline, tolerance = load(args.results)["results"], load(args.baseline)["results"], args.tolerance
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
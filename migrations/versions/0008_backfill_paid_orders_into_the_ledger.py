@@ -0,0 +1,48 @@
+"""backfill paid orders into the ledger
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 19:56:21.108386
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+# Orders marked paid before the ledger existed have no events, so their balance read as
+# zero: a refund was rejected and the next payment knocked them back to partially_paid.
+# Each gets one payment of its total. Partially paid orders are left alone, as nothing
+# recorded how much was paid; PUT /orders/<id>/payment-status or POST /payments settles them.
+BACKFILL = "payment-status backfill"
+
+
+def upgrade():
+    op.execute(
+        "INSERT INTO payment_events (order_id, kind, method, amount, reference, created_at) "
+        "SELECT id, 'payment', COALESCE(payment_method, 'manual'), total_amount, "
+        f"'{BACKFILL}', COALESCE(created_at, CURRENT_TIMESTAMP) FROM orders "
+        "WHERE payment_status = 'paid' AND total_amount > 0 "
+        "AND NOT EXISTS (SELECT 1 FROM order_balances WHERE order_balances.order_id = orders.id)"
+    )
+    op.execute(
+        "INSERT INTO order_balances (order_id, paid_amount, refunded_amount, tip_amount, event_count, updated_at) "
+        "SELECT order_id, amount, 0, 0, 1, created_at FROM payment_events "
+        f"WHERE reference = '{BACKFILL}' "
+        "AND NOT EXISTS (SELECT 1 FROM order_balances WHERE order_balances.order_id = payment_events.order_id)"
+    )
+    op.execute(
+        f"INSERT INTO pending_payment_events (event_id) SELECT id FROM payment_events WHERE reference = '{BACKFILL}'"
+    )
+
+
+def downgrade():
+    # The backfilled events record payments that did happen, and later events or the
+    # rollup may already build on them, so they stay.
+    pass
@@ -1,9 +1,8 @@
 from app import create_app
-from app.extensions import db
 
 app = create_app()
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
+    # Development server only; debug follows the config (on for APP_CONFIG=development).
+    # Production: python -m app.server
+    app.run()
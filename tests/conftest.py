@@ -0,0 +1,12 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture
+def auth_headers():
+    """Build ``Authorization`` headers for a token of ``role`` issued by ``app``."""
+    def headers(app, role="admin", identity="1", **claims):
+        with app.app_context():
+            token = create_access_token(identity=identity, additional_claims={"role": role, **claims})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
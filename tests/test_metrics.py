@@ -0,0 +1,34 @@
+"""
+Thread-sharded metrics: totals survive the threads that wrote them, and
+short-lived threads do not leave a shard behind per thread.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.metrics import Counter, Histogram
+
+BATCHES = 200
+WORKERS = 4
+
+
+def run_batches(work):
+    # One pool per batch, like /batch with "parallel".
+    for _ in range(BATCHES):
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(lambda _: work(), range(WORKERS)))
+
+
+def test_counter_shards_stay_bounded():
+    counter = Counter("test_total", "Test counter.", ("kind",))
+    run_batches(lambda: counter.inc("a"))
+    counter.inc("b", amount=2)
+    assert len(counter._shards) <= WORKERS + 1
+    assert counter.collect() == {("a",): BATCHES * WORKERS, ("b",): 2}
+
+
+def test_histogram_shards_stay_bounded():
+    histogram = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+    run_batches(lambda: histogram.observe(0.5))
+    histogram.observe(5.0)
+    assert len(histogram._shards) <= WORKERS + 1
+    count = BATCHES * WORKERS
+    assert histogram.collect() == {(): [0, count, 1, count * 0.5 + 5.0]}
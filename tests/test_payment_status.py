@@ -0,0 +1,90 @@
+"""
+PUT /orders/<id>/payment-status goes through the ledger, so the status it sets
+is the one the order's balance, its later payments and refunds agree with.
+"""
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.branch import Branch
+from app.models.order import Order
+from app.models.restaurant import Restaurant
+
+
+@pytest.fixture
+def app(tmp_path):
+    class PaymentsConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'payments.db'}"
+        METRICS_ENABLED = False
+
+    app = create_app(PaymentsConfig)
+    with app.app_context():
+        db.metadata.create_all(db.engine)
+        restaurant = Restaurant(name="r", location="here", contact_number="1")
+        restaurant.branches = [Branch(address="1 Main St", city="c")]
+        db.session.add(restaurant)
+        db.session.flush()
+        db.session.add(Order(id=1, user_id=1, branch_id=restaurant.branches[0].id, total_amount=30.0,
+                             status="completed", payment_method="card"))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def headers(app, auth_headers):
+    return auth_headers(app)
+
+
+def set_status(client, headers, status, **body):
+    return client.put("/orders/1/payment-status", json={"payment_status": status, **body}, headers=headers)
+
+
+def ledger(client, headers):
+    response = client.get("/orders/1/payments", headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_marking_paid_records_the_balance_due(client, headers):
+    client.post("/orders/1/payments", json={"method": "cash", "amount": 10.0}, headers=headers)
+    response = set_status(client, headers, "paid")
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()["order"]["payment_status"] == "paid"
+    body = ledger(client, headers)
+    assert [(e["kind"], e["method"], e["amount"]) for e in body["events"]] == [
+        ("payment", "cash", 10.0), ("payment", "cash", 20.0)]
+    assert body["balance"]["paid_amount"] == 30.0
+
+
+def test_an_order_marked_paid_can_be_refunded_and_tipped(client, headers):
+    assert set_status(client, headers, "paid").status_code == 200
+    tip = client.post("/orders/1/payments", json={"kind": "tip", "method": "card", "amount": 2.0}, headers=headers)
+    assert tip.get_json()["payment_status"] == "paid"
+    refund = client.post("/orders/1/payments", json={"kind": "refund", "method": "card", "amount": 5.0},
+                         headers=headers)
+    assert refund.status_code == 201, refund.get_json()
+    assert refund.get_json()["payment_status"] == "partially_paid"
+
+
+def test_marking_refunded_refunds_what_was_paid(client, headers):
+    assert set_status(client, headers, "paid", payment_method="voucher").status_code == 200
+    assert set_status(client, headers, "refunded").status_code == 200
+    body = ledger(client, headers)
+    assert body["balance"] == {"paid_amount": 0.0, "refunded_amount": 30.0, "tip_amount": 0.0}
+    assert body["payment_status"] == "refunded"
+
+
+@pytest.mark.parametrize("status", ["partially_paid", "refunded", "settled"])
+def test_statuses_the_ledger_cannot_reach_are_rejected(client, headers, status):
+    response = set_status(client, headers, status)
+    assert response.status_code == 400
+    body = ledger(client, headers)
+    assert body["events"] == [] and body["payment_status"] == "unpaid"
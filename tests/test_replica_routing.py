@@ -0,0 +1,83 @@
+"""
+Read-replica routing: two SQLite files stand in for the primary and a replica,
+seeded with different menu rows so every response shows which engine served it.
+"""
+import pytest
+from flask import jsonify
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.menu import Menu
+from app.utils.replicas import PRIMARY_COOKIE, use_primary
+
+
+@pytest.fixture
+def app(tmp_path):
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        METRICS_ENABLED = False
+
+    app = create_app(ReplicaConfig)
+
+    @app.route("/test/primary-menus")
+    @use_primary
+    def primary_menus():
+        return jsonify([menu.name for menu in Menu.query.all()])
+
+    @app.route("/test/read-after-write")
+    def read_after_write():
+        db.session.add(Menu(name="fresh", price=1.0, restaurant_id=1))
+        db.session.flush()
+        names = [menu.name for menu in Menu.query.all()]
+        db.session.rollback()
+        return jsonify(names)
+
+    with app.app_context():
+        for key, name in ((None, "primary"), ("replica_0", "replica")):
+            engine = db.engines[key]
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(Menu.__table__.insert().values(name=name, price=1.0, restaurant_id=1))
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def headers(app, auth_headers):
+    return auth_headers(app)
+
+
+def menu_names(response):
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return sorted(menu["name"] if isinstance(menu, dict) else menu for menu in response.get_json())
+
+
+def test_reads_go_to_the_replica(client, headers):
+    assert menu_names(client.get("/menus/", headers=headers)) == ["replica"]
+
+
+def test_use_primary_opts_out(client):
+    assert menu_names(client.get("/test/primary-menus")) == ["primary"]
+
+
+def test_reads_after_a_flush_stay_on_the_primary(client):
+    assert menu_names(client.get("/test/read-after-write")) == ["fresh", "primary"]
+
+
+def test_writes_make_later_reads_sticky(client, headers):
+    created = client.post("/menus/", json={"name": "new", "price": 2.0, "restaurant_id": 1}, headers=headers)
+    assert created.status_code == 201
+    assert PRIMARY_COOKIE in created.headers.get("Set-Cookie", "")
+    assert menu_names(client.get("/menus/", headers=headers)) == ["new", "primary"]
+
+    client.delete_cookie(PRIMARY_COOKIE)
+    assert menu_names(client.get("/menus/", headers=headers)) == ["replica"]
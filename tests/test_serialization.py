@@ -0,0 +1,81 @@
+"""
+CompiledSerializer: compiled output matches the marshmallow schema, also when
+several threads race to compile the same serializer on its first dump.
+"""
+import sys
+import threading
+
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.branch import Branch
+from app.models.restaurant import Restaurant
+from app.schemas.restaurant_schema import RestaurantSchema
+from app.utils.serialization import CompiledSerializer
+
+THREADS = 8
+TRIALS = 50
+
+
+@pytest.fixture
+def app(tmp_path):
+    class SerializationConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'serialization.db'}"
+        METRICS_ENABLED = False
+
+    app = create_app(SerializationConfig)
+    with app.app_context():
+        db.metadata.create_all(db.engine)
+        for number in range(1, 4):
+            restaurant = Restaurant(name=f"r{number}", location="here", contact_number=str(number))
+            restaurant.branches = [Branch(address=f"{i} Main St", city=f"c{number}") for i in range(number)]
+            db.session.add(restaurant)
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def race(serializer):
+    barrier = threading.Barrier(THREADS)
+    selected = []
+
+    def first_use():
+        barrier.wait()
+        selected.append([str(column) for column in serializer.select().selected_columns])
+
+    threads = [threading.Thread(target=first_use) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return selected
+
+
+def test_dump_matches_the_schema(app):
+    schema = RestaurantSchema(many=True)
+    with app.app_context():
+        expected = schema.dump(Restaurant.query.order_by(Restaurant.id).all())
+        assert CompiledSerializer(schema, Restaurant).dump() == expected
+
+
+def test_concurrent_first_use_compiles_one_consistent_serializer(app, fast_switching):
+    schema = RestaurantSchema(many=True)
+    reference = [str(column) for column in CompiledSerializer(schema, Restaurant).select().selected_columns]
+    with app.app_context():
+        expected = schema.dump(Restaurant.query.order_by(Restaurant.id).all())
+    for _ in range(TRIALS):
+        serializer = CompiledSerializer(schema, Restaurant)
+        assert race(serializer) == [reference] * THREADS
+        with app.app_context():
+            assert serializer.dump() == expected